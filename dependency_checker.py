@@ -104,8 +104,11 @@ class DependencyChecker:
         """Run all dependency checks"""
         print("Running dependency checks...")
         
-        # Check Node.js
-        node_ok, node_version = self.check_nodejs()
+        # Check Node.js, the local Python server doesn't need it
+        if os.environ.get('ROOM_DESIGNER_SERVER') == 'local':
+            node_ok = True
+        else:
+            node_ok, node_version = self.check_nodejs()
         if not node_ok:
             self.missing_deps.append({
                 'name': 'Node.js',
@@ -54,7 +54,7 @@ class Object(pygame.sprite.Sprite):
         self.rect.x = screen_x - self.iso_utils.half_tile_width + self.camera_offset_x
         
         # Apply z-positioning
-        tile_spacing = 1.3
+        tile_spacing = self.iso_utils.object_z_spacing
         base_y = screen_y - self.iso_utils.tile_height + self.camera_offset_y
         z_offset = self.grid_z * self.iso_utils.tile_height * tile_spacing
         self.rect.y = base_y - z_offset
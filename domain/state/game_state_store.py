@@ -0,0 +1,217 @@
+import copy
+import json
+
+from domain.state.inventory import Inventory
+import storage.inventory_abl as inventory_abl
+import storage.selection_abl as selection_abl
+import storage.stats_abl as stats_abl
+import storage.tile_abl as tile_abl
+
+class GameStateStore:
+    """
+    Single in-memory copy of the local game data: inventory, selection, stats and tiles.
+
+    Everything is read from storage once per session. Changes go through the mutation
+    methods, which write through to storage and notify the subscribers of the changed
+    part, so panels and render caches update without re-reading any file.
+    """
+    INVENTORY = 'inventory'
+    SELECTION = 'selection'
+    STATS = 'stats'
+    TILES = 'tiles'
+
+    def __init__(self):
+        self.inventory = None
+        self.selection = None
+        self.stats = None
+        self.tiles = None
+
+        # event -> list of callbacks taking (event, details)
+        self.listeners = {}
+
+    def load(self):
+        """Reads the local data from storage, only the first call does any work"""
+        if self.inventory is not None:
+            return
+
+        self.inventory = Inventory.from_dict(inventory_abl.load_inventory())
+        self.selection = selection_abl.load_selected_assets()
+        self.stats = dict(stats_abl.default_stats, **stats_abl.load_stats())
+
+        try:
+            tiles = tile_abl.load_tiles()
+        except (FileNotFoundError, json.JSONDecodeError):
+            tiles = []
+        self.tiles = {self._position(tile): tile for tile in tiles}
+
+    def subscribe(self, event, callback):
+        """
+        Calls back on every change of one part of the state
+
+        Parameters:
+        -----------
+        event : str
+            INVENTORY, SELECTION, STATS or TILES
+        callback : function
+            called with the event and a dict describing the change
+        """
+        self.listeners.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event, callback):
+        callbacks = self.listeners.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def emit(self, event, **details):
+        for callback in list(self.listeners.get(event, [])):
+            callback(event, details)
+
+    # Inventory
+    def get_inventory(self):
+        """Returns the live inventory, UI panels show its entry lists directly"""
+        self.load()
+        return self.inventory
+
+    def get_item_count(self, asset_id):
+        return self.get_inventory().count('item', asset_id)
+
+    def change_item_count(self, asset, delta):
+        """Adds delta to the count of an item and returns the new count, 0 when it is gone"""
+        count = self.get_inventory().add('item', asset['id'], delta, asset)
+
+        # One entry changes, the stored entry gets the catalog fields the asset may lack
+        entry = self.inventory.get_entry('item', asset['id']) or asset
+        inventory_abl.change_item_count(dict(entry), delta)
+
+        self.emit(self.INVENTORY, category='item', id=asset['id'], count=count)
+        return count
+
+    def owns_asset(self, category, asset_id):
+        return self.get_inventory().owns(category, asset_id)
+
+    def add_asset(self, category, asset):
+        """Adds a floor or wall, returns False when it is owned already"""
+        if self.owns_asset(category, asset.get('id')):
+            return False
+
+        self.inventory.add(category, asset.get('id'), 1, asset)
+        inventory_abl.add_asset(category, self.inventory.get_entry(category, asset.get('id')).to_dict())
+
+        self.emit(self.INVENTORY, category=category, id=asset.get('id'), count=1)
+        return True
+
+    def remove_asset(self, category, asset_id):
+        """Removes a floor or wall, returns False when it is not owned"""
+        if not self.get_inventory().discard(category, asset_id):
+            return False
+
+        inventory_abl.remove_asset(category, asset_id)
+
+        self.emit(self.INVENTORY, category=category, id=asset_id, count=0)
+        return True
+
+    # Selection
+    def get_selection(self):
+        self.load()
+        return self.selection
+
+    def set_selection(self, floor, wall):
+        self.load()
+
+        # Inventory entries are live views, the selection keeps plain copies
+        floor = dict(floor) if floor else floor
+        wall = dict(wall) if wall else wall
+        self.selection = {"floor": floor, "wall": wall}
+        selection_abl.save_selected_assets(floor, wall)
+
+        self.emit(self.SELECTION, floor=floor, wall=wall)
+
+    # Stats
+    def get_stats(self):
+        self.load()
+        return self.stats
+
+    def update_stats(self, **values):
+        """Changes stats by name, writes only when a value differs"""
+        stats = self.get_stats()
+        changed = {key: value for key, value in values.items() if stats.get(key) != value}
+
+        if changed:
+            stats.update(changed)
+            stats_abl.save_stats(stats)
+            self.emit(self.STATS, **changed)
+
+    # Tiles
+    def get_tiles(self):
+        """Returns the placed objects in placement order"""
+        self.load()
+        return list(self.tiles.values())
+
+    def place_tile(self, tile):
+        self.load()
+        position = self._position(tile)
+
+        # Placing moves the object to the end, like the storage does
+        self.tiles.pop(position, None)
+        self.tiles[position] = tile
+        tile_abl.place_tile(tile)
+
+        self.emit(self.TILES, position=position, tile=tile)
+
+    def remove_tile(self, x, y, z):
+        self.load()
+        self.tiles.pop((x, y, z), None)
+        tile_abl.remove_tile(x, y, z)
+
+        self.emit(self.TILES, position=(x, y, z), tile=None)
+
+    def rotate_tile(self, x, y, z, col, row):
+        self.load()
+        tile = self.tiles.get((x, y, z))
+
+        if tile:
+            tile['col'] = col
+            tile['row'] = row
+            tile_abl.rotate_tile(x, y, z, col, row)
+
+            self.emit(self.TILES, position=(x, y, z), tile=tile)
+
+    # Whole state, used by cloud sync
+    def export(self):
+        """Returns a copy of the local data in the cloud save format"""
+        return copy.deepcopy({
+            "inventory": self.get_inventory().to_dict(),
+            "selection": self.get_selection(),
+            "stats": self.get_stats(),
+            "tiles": self.get_tiles()
+        })
+
+    def replace(self, game_data):
+        """Replaces the parts present in game_data and notifies their subscribers"""
+        self.load()
+
+        if "inventory" in game_data:
+            self.inventory = Inventory.from_dict(game_data["inventory"])
+            inventory_abl.save_inventory(self.inventory.to_dict())
+            self.emit(self.INVENTORY)
+
+        if "selection" in game_data:
+            selection = game_data["selection"]
+            self.set_selection(selection.get("floor"), selection.get("wall"))
+
+        if "stats" in game_data:
+            self.stats = dict(stats_abl.default_stats, **game_data["stats"])
+            stats_abl.save_stats(self.stats)
+            self.emit(self.STATS, **self.stats)
+
+        if "tiles" in game_data:
+            self.tiles = {self._position(tile): tile for tile in game_data["tiles"]}
+            tile_abl.save_tiles(game_data["tiles"])
+            self.emit(self.TILES)
+
+    @staticmethod
+    def _position(tile):
+        return (tile['grid_x'], tile['grid_y'], tile['grid_z'])
+
+# Global instance
+game_state_store = GameStateStore()
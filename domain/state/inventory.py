@@ -0,0 +1,218 @@
+from collections.abc import Mapping, Sequence
+
+from storage.asset_catalog import asset_catalog
+
+class InventoryEntry(Mapping):
+    """
+    Read-only entry in the inventory_data.json format
+
+    Holds only the asset id, fields are looked up on access: stored extras first,
+    then the catalog, and the live count for items.
+    """
+    __slots__ = ('inventory', 'category', 'asset_id')
+
+    def __init__(self, inventory, category, asset_id):
+        self.inventory = inventory
+        self.category = category
+        self.asset_id = asset_id
+
+    def __getitem__(self, key):
+        # Only items are counted in the stored format
+        if key == 'count' and self.category == 'item':
+            return self.inventory.count(self.category, self.asset_id)
+
+        extras = self.inventory.extras[self.category].get(self.asset_id, {})
+        if key in extras:
+            return extras[key]
+
+        return self._catalog_fields()[key]
+
+    def __iter__(self):
+        catalog_fields = self._catalog_fields()
+        yield from catalog_fields
+
+        for key in self.inventory.extras[self.category].get(self.asset_id, {}):
+            if key not in catalog_fields:
+                yield key
+
+        if self.category == 'item':
+            yield 'count'
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def to_dict(self):
+        """Returns a plain dict copy, for storage and sync"""
+        return dict(self)
+
+    def _catalog_fields(self):
+        return self.inventory.catalog.get(self.asset_id) or {'id': self.asset_id}
+
+class InventoryView(Sequence):
+    """
+    Entry list of one category, the same object for the whole lifetime
+
+    Panels hold on to it, the list is rebuilt on the next read after an asset
+    type appears or goes.
+    """
+    def __init__(self, inventory, category):
+        self.inventory = inventory
+        self.category = category
+        self.entries = []
+        self.stale = True
+
+    def invalidate(self):
+        self.stale = True
+
+    def __getitem__(self, index):
+        return self._get_entries()[index]
+
+    def __len__(self):
+        return len(self._get_entries())
+
+    def __iter__(self):
+        return iter(self._get_entries())
+
+    def _get_entries(self):
+        if self.stale:
+            self.entries = [
+                InventoryEntry(self.inventory, self.category, asset_id)
+                for asset_id in self.inventory.counts[self.category]
+            ]
+            self.stale = False
+        return self.entries
+
+class Inventory:
+    """
+    Owned assets as id -> count maps per category
+
+    Asset metadata comes from the catalog, an entry only keeps the fields the catalog
+    does not have (like the server _id). Counting up or down is a dict update, the
+    entry lists shown by the panels change only when an asset type appears or goes.
+    """
+    CATEGORIES = ('item', 'floor', 'wall')
+
+    def __init__(self, catalog=asset_catalog):
+        self.catalog = catalog
+
+        # category -> asset id -> count, in the order the assets were added
+        self.counts = {category: {} for category in self.CATEGORIES}
+
+        # category -> asset id -> stored fields that differ from the catalog
+        self.extras = {category: {} for category in self.CATEGORIES}
+
+        # category -> lazily rebuilt entry list
+        self.views = {category: InventoryView(self, category) for category in self.CATEGORIES}
+
+    @classmethod
+    def from_dict(cls, data, catalog=asset_catalog):
+        """Builds the inventory from the inventory_data.json format"""
+        inventory = cls(catalog)
+
+        for category, entries in data.items():
+            for entry in entries:
+                inventory.add(category, entry['id'], entry.get('count', 1), entry)
+
+        return inventory
+
+    def to_dict(self):
+        """Returns the inventory in the inventory_data.json format"""
+        return {
+            category: [entry.to_dict() for entry in self.views[category]]
+            for category in self.counts
+        }
+
+    def __getitem__(self, category):
+        return self.get_entries(category)
+
+    def get_entries(self, category):
+        """Returns the entry list of a category, it stays up to date"""
+        self._ensure_category(category)
+        return self.views[category]
+
+    def get_entry(self, category, asset_id):
+        if not self.owns(category, asset_id):
+            return None
+        return InventoryEntry(self, category, asset_id)
+
+    def count(self, category, asset_id):
+        return self.counts.get(category, {}).get(asset_id, 0)
+
+    def owns(self, category, asset_id):
+        return asset_id in self.counts.get(category, {})
+
+    def add(self, category, asset_id, amount=1, asset=None):
+        """
+        Adds to the count of an asset and returns the new count
+
+        Parameters:
+        -----------
+        category : str
+            'item', 'floor' or 'wall'
+        asset_id : str
+            id of the asset
+        amount : int
+            how many to add
+        asset : dict
+            stored entry or shop asset, only fields missing from the catalog are kept
+        """
+        if amount < 0:
+            return self.remove(category, asset_id, -amount)
+
+        self._ensure_category(category)
+        counts = self.counts[category]
+
+        if asset_id in counts:
+            counts[asset_id] += amount
+            return counts[asset_id]
+
+        if amount <= 0:
+            return 0
+
+        counts[asset_id] = amount
+        self.extras[category][asset_id] = self._get_extras(asset_id, asset)
+        self.views[category].invalidate()
+        return amount
+
+    def remove(self, category, asset_id, amount=1):
+        """Subtracts from the count of an asset and returns the new count, 0 when it is gone"""
+        counts = self.counts.get(category, {})
+
+        if asset_id not in counts:
+            return 0
+
+        counts[asset_id] -= amount
+        if counts[asset_id] > 0:
+            return counts[asset_id]
+
+        del counts[asset_id]
+        del self.extras[category][asset_id]
+        self.views[category].invalidate()
+        return 0
+
+    def discard(self, category, asset_id):
+        """Removes an asset whatever its count, returns False when it was not owned"""
+        if not self.owns(category, asset_id):
+            return False
+
+        self.remove(category, asset_id, self.counts[category][asset_id])
+        return True
+
+    def _ensure_category(self, category):
+        if category not in self.counts:
+            self.counts[category] = {}
+            self.extras[category] = {}
+            self.views[category] = InventoryView(self, category)
+
+    def _get_extras(self, asset_id, asset):
+        if not asset:
+            return {}
+
+        known = self.catalog.get(asset_id) or {}
+        return {
+            key: value for key, value in asset.items()
+            if key != 'count' and known.get(key) != value
+        }
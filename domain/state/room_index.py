@@ -0,0 +1,132 @@
+from storage.asset_catalog import asset_catalog
+
+class RoomIndex:
+    """
+    In-memory index of the placed objects
+
+    objects are keyed by their grid position and by their asset id,
+    every change is written through to the game map
+    """
+    def __init__(self, game_map, empty_space=0, top_surface=2, non_top_surface=3):
+        self.game_map = game_map
+        self.EMPTY_SPACE = empty_space
+        self.TOP_SURFACE = top_surface
+        self.NON_TOP_SURFACE = non_top_surface
+
+        # (x, y, z) -> placed object record and its sprite
+        self.records = {}
+        self.sprites = {}
+
+        # asset id -> set of (x, y, z)
+        self.positions_by_id = {}
+
+        # Bumped on every change so caches can tell the room changed
+        self.version = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, position):
+        return position in self.records
+
+    def get(self, x, y, z):
+        """Returns the record placed at the position"""
+        return self.records.get((x, y, z))
+
+    def get_sprite(self, x, y, z):
+        """Returns the sprite of the object placed at the position"""
+        return self.sprites.get((x, y, z))
+
+    def get_type(self, x, y, z):
+        """Returns the asset type of the object placed at the position"""
+        record = self.records.get((x, y, z))
+        return asset_catalog.get_type(record['id']) if record else None
+
+    def is_occupied(self, x, y, z):
+        return (x, y, z) in self.records
+
+    def positions_of(self, asset_id):
+        """Returns all positions where the asset is placed"""
+        return self.positions_by_id.get(asset_id, set())
+
+    def occupied_positions(self):
+        """Returns positions of objects that occupy their cell in the game map"""
+        return [
+            position for position in self.records
+            if self.game_map[position] in (self.TOP_SURFACE, self.NON_TOP_SURFACE)
+        ]
+
+    def add(self, record, sprite=None):
+        """
+        Adds a placed object and marks its cell in the game map
+
+        Parameters:
+        -----------
+        record : dict
+            placed object as stored in tile_data.json
+        sprite : Object
+            static sprite of the placed object
+        """
+        position = (record['grid_x'], record['grid_y'], record['grid_z'])
+
+        if position in self.records:
+            self.remove(*position)
+
+        self.records[position] = record
+        self.positions_by_id.setdefault(record['id'], set()).add(position)
+
+        if sprite is not None:
+            self.sprites[position] = sprite
+
+        # Update map
+        asset_type = asset_catalog.get_type(record['id'])
+
+        if asset_type == 'floor item':
+            self.game_map[position] = self.TOP_SURFACE
+        elif asset_type is not None:
+            self.game_map[position] = self.NON_TOP_SURFACE
+
+        self.version += 1
+
+    def remove(self, x, y, z):
+        """
+        Removes the object placed at the position and frees its cell
+
+        Returns the removed record and sprite
+        """
+        position = (x, y, z)
+        record = self.records.pop(position, None)
+        sprite = self.sprites.pop(position, None)
+
+        if record is None:
+            return None, None
+
+        positions = self.positions_by_id.get(record['id'])
+        if positions is not None:
+            positions.discard(position)
+            if not positions:
+                del self.positions_by_id[record['id']]
+
+        if self.game_map[position] in (self.TOP_SURFACE, self.NON_TOP_SURFACE):
+            self.game_map[position] = self.EMPTY_SPACE
+
+        self.version += 1
+        return record, sprite
+
+    def clear(self, game_map=None):
+        """Forgets all placed objects, optionally switching to a new game map"""
+        if game_map is not None:
+            self.game_map = game_map
+        else:
+            for position in self.records:
+                if self.game_map[position] in (self.TOP_SURFACE, self.NON_TOP_SURFACE):
+                    self.game_map[position] = self.EMPTY_SPACE
+
+        self.records.clear()
+        self.sprites.clear()
+        self.positions_by_id.clear()
+        self.version += 1
+
+    def to_tiles(self):
+        """Returns the placed objects in the tile_data.json format"""
+        return list(self.records.values())
@@ -1,23 +1,40 @@
-import pygame, time, random, json, os
+import pygame, time, random
+from collections.abc import Mapping
 
 from domain.entity.object import Object
 from ui_components import Button, InventoryUI, MinigameUI, ShopUI
 from domain.state.states import GameState
+from domain.state.room_index import RoomIndex
+from domain.state.game_state_store import GameStateStore, game_state_store
 from utils.isometric_utils import IsometricUtils
+from utils.dirty_rect_tracker import DirtyRectTracker
+from utils.id_buffer import IdBuffer
 from game_logic import (create_game_map, create_isometric_sprites, create_sounds, create_background, create_graphics)
-import storage.inventory_abl as inventory_abl
-from storage.shop_data import shop_assets
-import storage.selection_abl as selection_abl
+from storage.asset_catalog import asset_catalog
 import storage.tile_abl as tile_abl
+from storage.persistence import persistence
+from storage.sync_worker import sync_worker
+from storage.cloud_sync import cloud_sync, KEPT_LOCAL_MESSAGE
+from storage.sync_delta import content_hash
 
 class RoomDesignerGame:
     """
     Main class containing the game
     """
-    def __init__(self):
+    def __init__(self, dirty_rendering=False, picking_mode='analytic', autosave_interval=120):
         """
         Initializes the game
         prepares menu screen and game map
+
+        Parameters:
+        -----------
+        dirty_rendering : bool
+            push only changed screen regions instead of flipping the whole display
+        picking_mode : str
+            'analytic' resolves clicks by inverse projection,
+            'id_buffer' reads them from an off-screen ID buffer
+        autosave_interval : float
+            seconds between cloud saves of changed data while playing, 0 turns them off
         """
         pygame.init()
         # Set up fullscreen dimensions
@@ -31,6 +48,17 @@ class RoomDesignerGame:
         pygame.display.set_caption("Room Designer Simulator")
         self.clock = pygame.time.Clock()
 
+        # Changed screen regions for the dirty-rect rendering mode
+        self.dirty_rects = DirtyRectTracker(enabled=dirty_rendering)
+
+        # Cloud saves run on the sync worker, the loop only queues a snapshot
+        self.autosave_interval = autosave_interval
+        self.last_autosave_time = time.time()
+        self.cloud_changes = False
+
+        # Content hash of the snapshot a background reconcile works on
+        self.reconcile_hash = None
+
         # Set up tile types
         self.EMPTY_SPACE = 0
         self.WALL_TILE = 1
@@ -99,12 +127,12 @@ class RoomDesignerGame:
 
         # Inventory
         self.show_inventory = False
-        inventory = inventory_abl.load_inventory()
+        inventory = game_state_store.get_inventory()
 
         self.selected_item_data = None
         self.selected_tab = 0
         
-        selected_assets = selection_abl.load_selected_assets()
+        selected_assets = game_state_store.get_selection()
         self.selected_floor_data = selected_assets['floor']
         self.selected_wall_data = selected_assets['wall']
 
@@ -135,7 +163,7 @@ class RoomDesignerGame:
         
         # Shop
         self.show_shop = False
-        self.shop_ui = ShopUI(shop_assets,
+        self.shop_ui = ShopUI(asset_catalog,
                               thumbnail_size=128, 
                               x=517,
                               y=105,
@@ -146,6 +174,14 @@ class RoomDesignerGame:
         
         self.hovered_asset = None
 
+        # Click area offsets of placed objects
+        self.object_click_offsets = {
+            'east wall item': (14, 23),
+            'north wall item': (-6, 20),
+            'surface item': (2, 50),
+            'default': (2, 35)
+        }
+
         # Determine asset type based on selected tab
         if self.selected_tab == self.FLOOR_TAB:
             self.sprites_collection = create_isometric_sprites(self.iso_utils, self.FLOOR_TAB)
@@ -160,8 +196,27 @@ class RoomDesignerGame:
         self.bg_surface_collection = create_background(self.WIDTH, self.HEIGHT)
         self.ui_graphics_collection = create_graphics()
         self.sounds = create_sounds()
+
+        # Pre-rendered background, floors and walls
+        self.room_layer = None
+        self.room_layer_key = None
+
+        # Off-screen picking surface
+        self.picking_mode = picking_mode
+        self.id_buffer = IdBuffer(self.WIDTH, self.HEIGHT)
+        self.id_buffer_key = None
+
         self.init_game_world()
 
+        # Panels and caches follow the stored state
+        game_state_store.subscribe(GameStateStore.INVENTORY, self.on_inventory_changed)
+        game_state_store.subscribe(GameStateStore.STATS, self.on_stats_changed)
+        game_state_store.subscribe(GameStateStore.TILES, self.on_tiles_changed)
+        game_state_store.subscribe(GameStateStore.SELECTION, self.on_selection_changed)
+
+        for event in (GameStateStore.INVENTORY, GameStateStore.SELECTION, GameStateStore.STATS, GameStateStore.TILES):
+            game_state_store.subscribe(event, self.on_state_changed)
+
         self.inventory_border = self.ui_graphics_collection[0]
         self.minigames_border = self.ui_graphics_collection[1]
         self.balance_border = self.ui_graphics_collection[22]
@@ -170,6 +225,13 @@ class RoomDesignerGame:
         self.sounds['background'].play(loops=-1).set_volume(0.8)
         self.sounds['object_rotate'].set_volume(0.6)
         self.sounds['ui_click'].set_volume(0.6)
+
+        # Logged in from local data, newer cloud changes arrive while playing
+        if cloud_sync.reconcile_pending:
+            cloud_sync.reconcile_pending = False
+            snapshot = game_state_store.export()
+            self.reconcile_hash = content_hash(snapshot)
+            sync_worker.reconcile(snapshot, callback=self.on_reconciled)
     
     def init_game_world(self):
         """
@@ -179,11 +241,17 @@ class RoomDesignerGame:
         self.grid_height = 12
         self.grid_depth = 5
         
-        # Create game map
-        self.game_map = create_game_map(self.grid_width, self.grid_height, self.grid_depth)
+        # Create game map, the binary storage maps it from the room file
+        self.game_map = tile_abl.load_game_map(
+            (self.grid_width, self.grid_height, self.grid_depth), create_game_map
+        )
+
+        # Placed objects by position, kept in sync with the game map
+        self.room_index = RoomIndex(self.game_map, self.EMPTY_SPACE, self.TOP_SURFACE, self.NON_TOP_SURFACE)
     
     def init_snake_game(self):
         self.game_state = GameState.SNAKE
+        persistence.request_flush()
         self.sounds = create_sounds()
         self.sounds['minigame'].play(loops=-1).set_volume(0.4)
         self.sounds['score'].set_volume(1)
@@ -284,24 +352,19 @@ class RoomDesignerGame:
             show_coins()
 
             self.total_balance += self.coins
-            self.save_stats_data(
-                                    balance=self.total_balance,
-                                    snake_hs=self.snake_hi_score,
-                                    fruit_hs=self.fruit_hi_score,
-                                    bullet_hs=self.bullet_hi_score
-                                )
 
             # Handle new hi-score
             if self.score > self.snake_hi_score:
                 self.snake_hi_score = self.score
-                self.save_stats_data(
+
+            self.save_stats_data(
                                     balance=self.total_balance,
                                     snake_hs=self.snake_hi_score,
                                     fruit_hs=self.fruit_hi_score,
                                     bullet_hs=self.bullet_hi_score
                                 )
             
-            selection_abl.save_selected_assets(
+            game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -338,7 +401,7 @@ class RoomDesignerGame:
                                     bullet_hs=self.bullet_hi_score
                                 )
                         
-                        selection_abl.save_selected_assets(
+                        game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -459,6 +522,7 @@ class RoomDesignerGame:
         
     def init_catch_the_fruit(self):
         self.game_state = GameState.CATCH_THE_FRUIT
+        persistence.request_flush()
         self.sounds = create_sounds()
         self.sounds['minigame'].play(loops=-1).set_volume(0.4)
         self.sounds['score'].set_volume(1)
@@ -576,7 +640,7 @@ class RoomDesignerGame:
                                     bullet_hs=self.bullet_hi_score
                                 )
                         
-                        selection_abl.save_selected_assets(
+                        game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -690,24 +754,19 @@ class RoomDesignerGame:
                     self.screen.blit(score_text, score_rect)
 
                     self.total_balance += self.coin_count
-                    self.save_stats_data(
-                                            balance=self.total_balance,
-                                            snake_hs=self.snake_hi_score,
-                                            fruit_hs=self.fruit_hi_score,
-                                            bullet_hs=self.bullet_hi_score
-                                        )
 
                     # Handle new hi-score
                     if self.score > self.fruit_hi_score:
                         self.fruit_hi_score = self.score
-                        self.save_stats_data(
+
+                    self.save_stats_data(
                                             balance=self.total_balance,
                                             snake_hs=self.snake_hi_score,
                                             fruit_hs=self.fruit_hi_score,
                                             bullet_hs=self.bullet_hi_score
                                         )
                     
-                    selection_abl.save_selected_assets(
+                    game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -769,6 +828,7 @@ class RoomDesignerGame:
     
     def init_bullet_hell(self):
         self.game_state = GameState.BULLET_HELL
+        persistence.request_flush()
         self.sounds = create_sounds()
         self.sounds['minigame'].play(loops=-1).set_volume(0.4)
         self.sounds['score'].set_volume(1.5)
@@ -924,7 +984,7 @@ class RoomDesignerGame:
                                     bullet_hs=self.bullet_hi_score
                                 )
                         
-                        selection_abl.save_selected_assets(
+                        game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -1130,6 +1190,11 @@ class RoomDesignerGame:
                 self.screen.blit(score_text, score_rect)
 
                 self.total_balance += self.coin_count
+                
+                # Handle new hi-score
+                if self.score > self.bullet_hi_score:
+                    self.bullet_hi_score = self.score
+
                 self.save_stats_data(
                                         balance=self.total_balance,
                                         snake_hs=self.snake_hi_score,
@@ -1137,17 +1202,7 @@ class RoomDesignerGame:
                                         bullet_hs=self.bullet_hi_score
                                     )
                 
-                # Handle new hi-score
-                if self.score > self.bullet_hi_score:
-                    self.bullet_hi_score = self.score
-                    self.save_stats_data(
-                                            balance=self.total_balance,
-                                            snake_hs=self.snake_hi_score,
-                                            fruit_hs=self.fruit_hi_score,
-                                            bullet_hs=self.bullet_hi_score
-                                        )
-                
-                selection_abl.save_selected_assets(
+                game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -1263,13 +1318,16 @@ class RoomDesignerGame:
     
     def handle_events(self):
         for event in pygame.event.get():
+            # Any input might change what is on the screen
+            self.dirty_rects.request_redraw()
+
             if event.type == pygame.QUIT:
                 self.running = False
 
             elif event.type == pygame.KEYDOWN:
                 if self.game_state == GameState.MENU:
                     if event.key == pygame.K_ESCAPE:
-                        selection_abl.save_selected_assets(
+                        game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -1279,12 +1337,13 @@ class RoomDesignerGame:
                     if event.key == pygame.K_SPACE:
                         self.place_object()
                     elif event.key == pygame.K_ESCAPE:
-                        selection_abl.save_selected_assets(
+                        game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
 
                         self.game_state = GameState.MENU
+                        persistence.request_flush()
 
             elif event.type == pygame.KEYUP:
                 if event.key == pygame.K_r:
@@ -1302,7 +1361,7 @@ class RoomDesignerGame:
                         self.sounds['ui_click'].play()
                         self.restart_game()
                     elif self.quit_button.handle_event(event):
-                        selection_abl.save_selected_assets(
+                        game_state_store.set_selection(
                                 self.selected_floor_data,
                                 self.selected_wall_data
                             )
@@ -1391,7 +1450,7 @@ class RoomDesignerGame:
 
                             # Item selection
                             if selected_tab == self.ITEM_TAB:
-                                if isinstance(selected, dict):
+                                if isinstance(selected, Mapping):
                                     if selected != self.selected_item_data:
                                         self.iso_utils.load_sprite_sheets(selected, selected_tab)
 
@@ -1549,91 +1608,23 @@ class RoomDesignerGame:
                             item_type = self.selected_item_data.get('type')
 
                             if item_type == 'floor item' or item_type == 'non top floor item':
-                                def get_floor_surface(px, py, cx, cy, w, h):
-                                    """Check if click point is on floor."""
-                                    dx = abs(px - cx)
-                                    dy = abs(py - cy)
-                                    return (dx / (w / 2) + dy / (h / 2)) <= 1
-                                
-                                # Prepare clickable floor
-                                for x in range(self.grid_width):
-                                    for y in range(self.grid_height):
-                                        screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
-                                        screen_x += self.camera_offset_x
-                                        screen_y += self.camera_offset_y
-                                        
-                                        # Handle floor click
-                                        if self.game_map[x, y, 0] == self.EMPTY_SPACE:
-                                            floor_rect = self.sprites['floor'].get_rect()
-                                            floor_rect.x = screen_x - self.iso_utils.half_tile_width
-                                            floor_rect.y = screen_y - self.iso_utils.half_tile_height
-
-                                            tile_width = self.iso_utils.tile_width
-                                            tile_height = self.iso_utils.tile_height
-
-                                            center_x = screen_x
-                                            y_offset = 35
-                                            center_y = screen_y + y_offset
-
-                                            if get_floor_surface(mx, my, center_x, center_y, tile_width, tile_height):
-                                                # Prevent duplicit sprites
-                                                if self.object:
-                                                    self.objects.remove(self.object)
-                                                    self.all_sprites.remove(self.object)
-                                                    self.object = None
-
-                                                # Create ghost object at clicked position
-                                                self.object = Object(x=x, y=y, z=0, c=0, r=0, iso_utils=self.iso_utils, asset=self.selected_item_data)
-                                                self.objects.add(self.object)
-                                                self.all_sprites.add(self.object)
-                                        # Handle object pickup
-                                        else:
-                                            if self.pickup_object():
-                                                return
-                            
-                            elif item_type == 'wall item':
-                                def point_in_polygon(px, py, polygon):
-                                    """Check if point is inside a polygon by using ray casting."""
-                                    inside = False
-                                    n = len(polygon)
-                                    
-                                    for i in range(n):
-                                        x1, y1 = polygon[i]
-                                        x2, y2 = polygon[(i + 1) % n]
-                                        
-                                        if ((y1 > py) != (y2 > py)) and \
-                                        (px < (x2 - x1) * (py - y1) / (y2 - y1 + 1e-9) + x1):
-                                            inside = not inside
-                                    
-                                    return inside
-
-                                def build_wall_quads(cx, cy, half_w, half_h, z, tile_height, tile_spacing):
-                                    """
-                                    Precise wall quad calculation that matches rendering exactly.
-                                    """
-                                    
-                                    wall_render_y = cy - (z * tile_height * tile_spacing + half_h)
-                                    
-                                    # Top seam of the wal
-                                    seam = (cx, wall_render_y)
-                                    
-                                    # Bottom of the wall
-                                    wall_bottom_y = wall_render_y + tile_height * tile_spacing
-                                    bottom_center = (cx, wall_bottom_y)
-
-                                    # Left sides of wall tiles
-                                    top_left = (seam[0] - half_w, seam[1] + half_h)
-                                    bottom_left = (bottom_center[0] - half_w, bottom_center[1] + half_h)
-                                    east_quad = [seam, top_left, bottom_left, bottom_center]
-                                    
-                                    # Right sides of wall tiles
-                                    top_right = (seam[0] + half_w, seam[1] + half_h)
-                                    bottom_right = (bottom_center[0] + half_w, bottom_center[1] + half_h)
-                                    north_quad = [seam, top_right, bottom_right, bottom_center]
+                                # Handle object pickup
+                                if self.pickup_object():
+                                    return
 
-                                    return east_quad, north_quad
+                                # Handle floor click
+                                tile = self.pick_floor_tile(mx, my, 35,
+                                    lambda x, y: self.game_map[x, y, 0] == self.EMPTY_SPACE, last=True
+                                )
 
-                                def find_adjacent_floor_position(wall_x, wall_y, wall_z, side, game_map, grid_width, grid_height, grid_depth, objects, EMPTY_SPACE):
+                                if tile:
+                                    # Create ghost object at clicked position
+                                    self.object = Object(x=tile[0], y=tile[1], z=0, c=0, r=0, iso_utils=self.iso_utils, asset=self.selected_item_data)
+                                    self.objects.add(self.object)
+                                    self.all_sprites.add(self.object)
+                            
+                            elif item_type == 'wall item':
+                                def find_adjacent_floor_position(wall_x, wall_y, wall_z, side, game_map, grid_width, grid_height, grid_depth, room_index, EMPTY_SPACE):
                                     """
                                     Adjacent floor position calculation.
                                     """
@@ -1665,152 +1656,70 @@ class RoomDesignerGame:
                                         return None
                                     
                                     # Check for existing objects at this position
-                                    for obj in objects:
-                                        if obj.grid_x == adj_x and obj.grid_y == adj_y and obj.grid_z == target_z:
-                                            return None
+                                    if room_index.is_occupied(adj_x, adj_y, target_z):
+                                        return None
                                     
                                     return (adj_x, adj_y, target_z)
 
-                                object_placed = False
-                                wall_candidates = []
-
-                                # Collect all walls
-                                for x in range(self.grid_width):
-                                    for y in range(self.grid_height):
-                                        for z in range(self.grid_depth):
-                                            if self.game_map[x, y, z] == self.WALL_TILE:
-                                                screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
-                                                screen_x += self.camera_offset_x
-                                                screen_y += self.camera_offset_y
-
-                                                tile_spacing = 1.375
-                                                wall_screen_y = screen_y - self.iso_utils.half_tile_height - (z * self.iso_utils.tile_height * tile_spacing + self.iso_utils.half_tile_height)
-
-                                                wall_candidates.append({
-                                                    'x': x, 'y': y, 'z': z,
-                                                    'screen_x': screen_x, 'screen_y': screen_y,
-                                                    'wall_screen_y': wall_screen_y,
-                                                    'sort_key': (wall_screen_y, screen_x, z)
-                                                })
-
-                                # Sort walls front to back
-                                wall_candidates.sort(key=lambda w: w['sort_key'])
-
-                                # Test each wall for clicks
-                                clicked_walls = []
-                                for idx, wall in enumerate(wall_candidates):
-                                    cx, cy = wall['screen_x'], wall['screen_y']
-                                    x, y, z = wall['x'], wall['y'], wall['z']
-                                    
-                                    half_w = self.iso_utils.half_tile_width
-                                    half_h = self.iso_utils.half_tile_height
-                                    tile_h = self.iso_utils.tile_height
-                                    tile_spacing = 1.375
-
-                                    east_quad, north_quad = build_wall_quads(cx, cy, half_w, half_h, z, tile_h, tile_spacing)
-
-                                    # Check click detection
-                                    side = None
-                                    if point_in_polygon(mx, my, east_quad):
-                                        side = "east"
-                                    elif point_in_polygon(mx, my, north_quad):
-                                        side = "north"
-
-                                    if side:
-                                        clicked_walls.append((x, y, z, side))
+                                # Test clicked walls front to back
+                                for x, y, z, side in self.pick_wall_faces(mx, my):
+                                    placement_pos = find_adjacent_floor_position(
+                                        x, y, z, side,
+                                        self.game_map, self.grid_width, self.grid_height, self.grid_depth,
+                                        self.room_index, self.EMPTY_SPACE
+                                    )
+
+                                    # Only place object for the first valid wall
+                                    if placement_pos:
+                                        obj_x, obj_y, obj_z = placement_pos
                                         
-                                        # Only place object for the first valid wall
-                                        if not object_placed:
-                                            placement_pos = find_adjacent_floor_position(
-                                                x, y, z, side,
-                                                self.game_map, self.grid_width, self.grid_height, self.grid_depth,
-                                                self.objects, self.EMPTY_SPACE
-                                            )
-
-                                            if placement_pos:
-                                                obj_x, obj_y, obj_z = placement_pos
-                                                
-                                                # Initial facing direction
-                                                if side == "east":
-                                                    obj_c = 0
-                                                else:
-                                                    obj_c = 1
-
-                                                # Create and place the object
-                                                self.object = Object(
-                                                    x=obj_x, y=obj_y, z=obj_z,
-                                                    c=obj_c, r=0,
-                                                    iso_utils=self.iso_utils,
-                                                    asset=self.selected_item_data
-                                                )
-
-                                                self.object.update_position(self.camera_offset_x, self.camera_offset_y)
-                                                self.objects.add(self.object)
-                                                self.all_sprites.add(self.object)
-                                                object_placed = True
-                                            else:
-                                                if self.pickup_object():
-                                                    return
+                                        # Initial facing direction
+                                        if side == "east":
+                                            obj_c = 0
+                                        else:
+                                            obj_c = 1
+
+                                        # Create and place the object
+                                        self.object = Object(
+                                            x=obj_x, y=obj_y, z=obj_z,
+                                            c=obj_c, r=0,
+                                            iso_utils=self.iso_utils,
+                                            asset=self.selected_item_data
+                                        )
+
+                                        self.object.update_position(self.camera_offset_x, self.camera_offset_y)
+                                        self.objects.add(self.object)
+                                        self.all_sprites.add(self.object)
+                                        break
+                                    elif self.pickup_object():
+                                        return
                             
                             else:
-                                def get_floor_surface(px, py, cx, cy, w, h):
-                                    """Check if click point is on floor."""
-                                    dx = abs(px - cx)
-                                    dy = abs(py - cy)
-                                    return (dx / (w / 2) + dy / (h / 2)) <= 1
-
-                                for x in range(self.grid_width):
-                                    for y in range(self.grid_height):
-                                        screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
-                                        screen_x += self.camera_offset_x
-                                        screen_y += self.camera_offset_y
-
-                                        # Check top surface placement
-                                        if self.game_map[x, y, 0] == self.TOP_SURFACE and self.game_map[x, y, 1] == self.EMPTY_SPACE:
-                                            tile_width = self.iso_utils.tile_width
-                                            tile_height = self.iso_utils.tile_height
-                                            center_x = screen_x
-                                            center_y = screen_y
-
-                                            if get_floor_surface(mx, my, center_x, center_y, tile_width, tile_height):
-                                                # Prevent duplicit sprites
-                                                if self.object:
-                                                    self.objects.remove(self.object)
-                                                    self.all_sprites.remove(self.object)
-                                                    self.object = None
-
-                                                self.object = Object(x=x, y=y, z=1, c=0, r=0, iso_utils=self.iso_utils, asset=self.selected_item_data)
-                                                self.objects.add(self.object)
-                                                self.all_sprites.add(self.object)
-                                                return
+                                # Check top surface placement
+                                tile = self.pick_floor_tile(mx, my, 0,
+                                    lambda x, y: self.game_map[x, y, 0] == self.TOP_SURFACE and self.game_map[x, y, 1] == self.EMPTY_SPACE
+                                )
+
+                                if tile:
+                                    self.object = Object(x=tile[0], y=tile[1], z=1, c=0, r=0, iso_utils=self.iso_utils, asset=self.selected_item_data)
+                                    self.objects.add(self.object)
+                                    self.all_sprites.add(self.object)
+                                    return
 
                                 # Attempt pickup before floor placement
                                 if self.pickup_object():
                                     return
 
-                                for x in range(self.grid_width):
-                                    for y in range(self.grid_height):
-                                        screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
-                                        screen_x += self.camera_offset_x
-                                        screen_y += self.camera_offset_y
-
-                                        # ALlow floor placement
-                                        if self.game_map[x, y, 0] == self.EMPTY_SPACE:
-                                            tile_width = self.iso_utils.tile_width
-                                            tile_height = self.iso_utils.tile_height
-                                            center_x = screen_x
-                                            center_y = screen_y + tile_height
-
-                                            if get_floor_surface(mx, my, center_x, center_y, tile_width, tile_height):
-                                                if self.object:
-                                                    self.objects.remove(self.object)
-                                                    self.all_sprites.remove(self.object)
-                                                    self.object = None
-
-                                                self.object = Object(x=x, y=y, z=0, c=0, r=0, iso_utils=self.iso_utils, asset=self.selected_item_data)
-                                                self.objects.add(self.object)
-                                                self.all_sprites.add(self.object)
-                                                return
+                                # ALlow floor placement
+                                tile = self.pick_floor_tile(mx, my, self.iso_utils.tile_height,
+                                    lambda x, y: self.game_map[x, y, 0] == self.EMPTY_SPACE
+                                )
+
+                                if tile:
+                                    self.object = Object(x=tile[0], y=tile[1], z=0, c=0, r=0, iso_utils=self.iso_utils, asset=self.selected_item_data)
+                                    self.objects.add(self.object)
+                                    self.all_sprites.add(self.object)
+                                    return
 
                     elif self.show_minigames:
                         selected = self.minigame_ui.handle_click(pygame.mouse.get_pos())
@@ -1888,6 +1797,9 @@ class RoomDesignerGame:
     def update(self):
         if self.game_state == GameState.PLAYING:
             self.update_object_movement()
+
+        self.autosave_to_cloud()
+        sync_worker.dispatch()
     
     def update_object_movement(self):
         """
@@ -2018,38 +1930,20 @@ class RoomDesignerGame:
                 
                 self.sounds['object_place'].play()
 
-                item_type = self.selected_item_data.get('type')
-
-                # Mark the position in the game map as occupied
-                if item_type == 'floor item':
-                    self.game_map[current_x, current_y, current_z] = self.TOP_SURFACE
-                else:
-                    self.game_map[current_x, current_y, current_z] = self.NON_TOP_SURFACE
-                    
+                # Index the object and mark its position in the game map as occupied
                 self.save_placed_object(
                     self.object.asset['id'],
                     current_x,
                     current_y,
                     current_z,
                     current_c,
-                    current_r
+                    current_r,
+                    sprite=static_object
                 )
 
-                # Load inventory and subtract count
-                inventory = inventory_abl.load_inventory()
-
                 selected_id = self.selected_item_data.get('id') if self.selected_item_data else None
 
-                # Subtract or remove from inventory
-                for existing in inventory['item']:
-                    if existing.get('id') == static_object.obj_id:
-                        if existing.get('count') > 1:
-                            existing['count'] -= 1
-                        elif existing.get('count') == 1:
-                            inventory['item'].remove(existing)
-                        break
-
-                # Update selection state
+                # Update selection state, before the count changes
                 for item in self.inventory_ui.items:
                     if item.get('id') == selected_id:
                         if item.get('count') == 1:
@@ -2060,10 +1954,9 @@ class RoomDesignerGame:
                             self.selected_item_data = item
                             self.inventory_ui.selected_item = item
                         break
-                
-                # Save inventory
-                inventory_abl.save_inventory(inventory)
-                self.reload_inventory()
+
+                # Subtract or remove from inventory, the panel shows the same list
+                game_state_store.change_item_count({'id': static_object.obj_id}, -1)
 
                 # Remove ghost object
                 if self.object:
@@ -2076,130 +1969,162 @@ class RoomDesignerGame:
         Processes the object pickup. Removes a static object from the game map
         and adds it back to the inventory.
         """
-        def get_object_surface(px, py, cx, cy, w, h):
-            """Check if click point is on any object surface."""
-            dx = abs(px - cx)
-            dy = abs(py - cy)
-            return (dx / (w / 2) + dy / h) <= 1
-        
         mx, my = pygame.mouse.get_pos()
-        
-        # Prepare clickable objects
-        for x in reversed(range(self.grid_width)):
-            for y in reversed(range(self.grid_height)):
-                for z in reversed(range(self.grid_depth)):
-                    screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
-                    screen_x += self.camera_offset_x
-                    screen_y += self.camera_offset_y
 
-                    # Adjust vertical screen position based on z-level
-                    tile_spacing = 1.375
-                    screen_y = screen_y - (z * self.iso_utils.tile_height * tile_spacing + self.iso_utils.half_tile_height)
-
-                    if self.game_map[x, y, z] == self.TOP_SURFACE or self.game_map[x, y, z] == self.NON_TOP_SURFACE:
-                        object_rect = self.sprites['floor'].get_rect()
-                        object_rect.x = screen_x - self.iso_utils.half_tile_width
-                        object_rect.y = screen_y - self.iso_utils.half_tile_height
-
-                        tile_width = self.iso_utils.tile_width
-                        tile_height = self.iso_utils.tile_height
-
-                        objects = tile_abl.load_tiles()
-
-                        # Adjust offset based on item type
-                        for object in objects:
-                            if object.get('grid_x') == x and object.get('grid_y') == y and object.get('grid_z') == z:
-                                obj_id = object.get('id')
-
-                                for asset in shop_assets:
-                                    if asset.get('id') == obj_id:
-                                        if asset.get('type') == 'wall item' and object.get('col') == 0:
-                                            x_offset = 14
-                                            y_offset = 23
-                                        elif asset.get('type') == 'wall item' and object.get('col') == 1:
-                                            x_offset = -6
-                                            y_offset = 20
-                                        elif asset.get('type') == 'surface item':
-                                            x_offset = 2
-                                            y_offset = 50
-                                        else:
-                                            x_offset = 2
-                                            y_offset = 35
-
-                        center_x = screen_x + x_offset
-                        center_y = screen_y + y_offset
-
-                        # Handle object click
-                        if get_object_surface(mx, my, center_x, center_y, tile_width, tile_height):
-                            objects = tile_abl.load_tiles()
-                            inventory = inventory_abl.load_inventory()
-                            objects_to_remove = []  
-
-                            for object in objects:
-                                if object.get('grid_x') == x and object.get('grid_y') == y and object.get('grid_z') == z:
-                                    obj_id = object.get('id')
-                                    added = False
-
-                                    for item in inventory['item']:
-                                        if item.get('id') == obj_id:
-                                            item['count'] = item.get('count', 1) + 1
-                                            added = True
-                                            break
-
-                                    if not added:
-                                        # Get full item data from shop assets
-                                        for item in shop_assets:
-                                            if item.get('id') == obj_id:
-                                                item_copy = item.copy()
-                                                item_copy['count'] = 1
-                                                inventory['item'].append(item_copy)
-                                                break
-
-                                    objects_to_remove.append(object)
-
-                            # Check for surface objects on top of floor tile
-                            for object in objects:
-                                if object.get('grid_x') == x and object.get('grid_y') == y and object.get('grid_z') == z + 1:
-                                    for asset in shop_assets:
-                                        if asset.get('id') == object.get('id'):
-                                            item_type = asset.get('type')
-                                            break
-
-                                    if item_type == 'surface item':
-                                        obj_id = object.get('id')
-                                        added = False
-
-                                        for item in inventory['item']:
-                                            if item.get('id') == obj_id:
-                                                item['count'] = item.get('count', 1) + 1
-                                                added = True
-                                                break
-
-                                        if not added:
-                                            # Get full item data from shop assets
-                                            for item in shop_assets:
-                                                if item.get('id') == obj_id:
-                                                    item_copy = item.copy()
-                                                    item_copy['count'] = 1
-                                                    inventory['item'].append(item_copy)
-                                                    break
-
-                                        objects_to_remove.append(object)
-
-                            # Remove all collected objects
-                            for removable in objects_to_remove:
-                                if removable in objects:
-                                    objects.remove(removable)
-
-                            tile_abl.save_tiles(objects)
-                            inventory_abl.save_inventory(inventory)
-                            
-                            self.clear_sprites()
-                            self.init_game_world()
-                            self.load_placed_objects()
-                            self.reload_inventory()
-                            return True
+        position = self.pick_object(mx, my)
+
+        if position:
+            x, y, z = position
+            positions_to_remove = [(x, y, z)]
+
+            # Check for surface objects on top of floor tile
+            if self.room_index.get_type(x, y, z + 1) == 'surface item':
+                positions_to_remove.append((x, y, z + 1))
+
+            self.remove_placed_objects(positions_to_remove)
+            return True
         return False
+
+    def remove_placed_objects(self, positions):
+        """
+        Moves placed objects back to the inventory. Only their sprites and
+        game_map cells change, the rest of the room is left as it is.
+
+        Parameters:
+        -----------
+        positions : list
+            (x, y, z) of the objects to remove
+        """
+        for position in positions:
+            obj_id = self.room_index.get(*position).get('id')
+
+            # Full item data from shop assets for new inventory entries
+            asset = asset_catalog.get(obj_id)
+            if asset:
+                game_state_store.change_item_count(asset, 1)
+
+        # Remove all collected objects
+        for position in positions:
+            _, sprite = self.room_index.remove(*position)
+            if sprite:
+                self.all_sprites.remove(sprite)
+
+            # Store the pickup
+            game_state_store.remove_tile(*position)
+
+    def get_object_click_offset(self, x, y, z):
+        """Offset of the clickable area of a placed object based on its type"""
+        asset_type = self.room_index.get_type(x, y, z)
+        col = self.room_index.get(x, y, z).get('col')
+
+        if asset_type == 'wall item' and col == 0:
+            return self.object_click_offsets['east wall item']
+        elif asset_type == 'wall item' and col == 1:
+            return self.object_click_offsets['north wall item']
+        elif asset_type == 'surface item':
+            return self.object_click_offsets['surface item']
+        return self.object_click_offsets['default']
+
+    def pick_floor_tile(self, mx, my, y_offset, is_free, last=False):
+        """
+        Returns (x, y) of the floor tile under the mouse
+
+        Parameters:
+        -----------
+        y_offset : float
+            vertical offset of the clickable diamonds
+        is_free : function
+            tells if an object can be placed at (x, y)
+        last : bool
+            prefer the last matching tile in grid order instead of the first
+        """
+        if self.picking_mode == 'id_buffer':
+            picked = self.get_id_buffer().pick(mx, my)
+
+            # Objects standing on the floor stand for their tile
+            if picked and (picked[0] == IdBuffer.FLOOR or (picked[0] == IdBuffer.OBJECT and picked[3] == 0)):
+                return (picked[1], picked[2]) if is_free(picked[1], picked[2]) else None
+            return None
+
+        tiles = [
+            tile for tile in self.iso_utils.pick_tiles(mx, my, self.camera_offset_x, self.camera_offset_y,
+                                                      self.grid_width, self.grid_height, offset_y=y_offset)
+            if is_free(*tile)
+        ]
+
+        if not tiles:
+            return None
+        return tiles[-1] if last else tiles[0]
+
+    def pick_wall_faces(self, mx, my):
+        """Returns (x, y, z, side) of the wall faces under the mouse, front to back"""
+        if self.picking_mode == 'id_buffer':
+            picked = self.get_id_buffer().pick(mx, my)
+
+            if picked and picked[0] == IdBuffer.WALL:
+                kind, x, y, z, face = picked
+                return [(x, y, z, "east" if face == IdBuffer.EAST else "north")]
+            return []
+
+        return self.iso_utils.pick_wall_faces(
+            mx, my, self.camera_offset_x, self.camera_offset_y,
+            lambda x, y, z: self.game_map[x, y, z] == self.WALL_TILE,
+            self.grid_width, self.grid_height, self.grid_depth
+        )
+
+    def pick_object(self, mx, my):
+        """Returns (x, y, z) of the placed object under the mouse, topmost and frontmost first"""
+        if self.picking_mode == 'id_buffer':
+            picked = self.get_id_buffer().pick(mx, my)
+
+            if picked and picked[0] == IdBuffer.OBJECT and self.room_index.is_occupied(*picked[1:4]):
+                return picked[1:4]
+            return None
+
+        tile_width = self.iso_utils.tile_width
+        tile_height = self.iso_utils.tile_height
+
+        # Clickable areas are diamonds around the offset object position
+        offsets = self.object_click_offsets.values()
+        min_x_offset = min(offset[0] for offset in offsets)
+        max_x_offset = max(offset[0] for offset in offsets)
+        min_y_offset = min(offset[1] for offset in offsets)
+        max_y_offset = max(offset[1] for offset in offsets)
+
+        reach_x = tile_width / 2 + (max_x_offset - min_x_offset) / 2
+        reach_y = tile_height + (max_y_offset - min_y_offset) / 2
+
+        hits = []
+
+        for z in range(self.grid_depth):
+            z_offset = self.iso_utils.get_z_offset(z, self.iso_utils.pick_z_spacing) + self.iso_utils.half_tile_height
+            px = mx - self.camera_offset_x - (min_x_offset + max_x_offset) / 2
+            py = my - self.camera_offset_y + z_offset - (min_y_offset + max_y_offset) / 2
+
+            for x, y in self.iso_utils.get_cells_near(px, py, reach_x, reach_y):
+                if not (0 <= x < self.grid_width and 0 <= y < self.grid_height):
+                    continue
+
+                if not (self.game_map[x, y, z] == self.TOP_SURFACE or self.game_map[x, y, z] == self.NON_TOP_SURFACE):
+                    continue
+
+                if not self.room_index.is_occupied(x, y, z):
+                    continue
+
+                screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
+                screen_x += self.camera_offset_x
+                screen_y += self.camera_offset_y
+
+                # Adjust vertical screen position based on z-level
+                screen_y = screen_y - z_offset
+
+                x_offset, y_offset = self.get_object_click_offset(x, y, z)
+
+                if self.iso_utils.is_point_in_diamond(mx, my, screen_x + x_offset, screen_y + y_offset,
+                                                      tile_width, tile_height * 2):
+                    hits.append((x, y, z))
+
+        return max(hits) if hits else None
     
     def is_position_available_for_pickup(self, x, y, z):
         """Check if position is available for object pickup"""
@@ -2216,13 +2141,12 @@ class RoomDesignerGame:
         return False
     
     def reload_inventory(self):
-        inventory = inventory_abl.load_inventory()
+        inventory = game_state_store.get_inventory()
         # Update selected item if it exists in the new inventory
         if self.selected_item_data:
-            for item in inventory['item']:
-                if item.get('id') == self.selected_item_data.get('id'):
-                    self.selected_item_data = item
-                    break
+            item = inventory.get_entry('item', self.selected_item_data.get('id'))
+            if item:
+                self.selected_item_data = item
 
         self.inventory_ui = InventoryUI(
             inventory['item'],
@@ -2252,43 +2176,95 @@ class RoomDesignerGame:
                 self.iso_utils, self.WALL_TAB, self.selected_wall_data
             )[0]['wall']
     
-    def load_stats_data(self):
-            file_path = os.path.join('storage', 'stats_data.json')
-
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    balance = data.get('total_balance', 0)
-                    snake_hs = data.get('snake_hi_score', 0)
-                    fruit_hs = data.get('fruit_hi_score', 0)
-                    bullet_hs = data.get('bullet_hi_score', 0)
-                    return balance, snake_hs, fruit_hs, bullet_hs
-            except FileNotFoundError:
-                return 0
-    
-    def save_stats_data(self, balance, snake_hs, fruit_hs, bullet_hs):
-        file_path = os.path.join('storage', 'stats_data.json')
+    def on_inventory_changed(self, event, details):
+        # The whole inventory was replaced, the panel holds the old lists
+        if not details:
+            self.reload_inventory()
+
+        self.dirty_rects.request_redraw()
+
+    def on_stats_changed(self, event, details):
+        # Every panel shows the stored balance
+        if 'total_balance' in details:
+            self.total_balance = details['total_balance']
+            self.inventory_ui.total_balance = self.total_balance
+            self.shop_ui.total_balance = self.total_balance
+
+        self.dirty_rects.request_redraw()
+
+    def on_tiles_changed(self, event, details):
+        # Single edits are applied to the room index by the caller
+        if not details:
+            self.clear_sprites()
+            self.load_placed_objects()
+
+        self.dirty_rects.request_redraw()
+
+    def on_selection_changed(self, event, details):
+        # The game picks its own selection first, only downloaded data differs
+        if details.get('floor') != self.selected_floor_data or details.get('wall') != self.selected_wall_data:
+            self.selected_floor_data = details.get('floor')
+            self.selected_wall_data = details.get('wall')
+            self.apply_selected_assets()
+
+        self.dirty_rects.request_redraw()
+
+    def on_state_changed(self, event, details):
+        self.cloud_changes = True
+
+    def autosave_to_cloud(self):
+        """Queues an upload of the changed data once per autosave interval"""
+        if not self.autosave_interval or not self.cloud_changes:
+            return
+
+        if time.time() - self.last_autosave_time < self.autosave_interval:
+            return
+
+        self.last_autosave_time = time.time()
+        if not cloud_sync.is_logged_in():
+            return
+
+        # Snapshot on this thread, the store is not shared with the worker
+        self.cloud_changes = False
+        sync_worker.upload(game_state_store.export(), callback=self.on_autosave_done)
+
+    def on_reconciled(self, success, message, cloud_data=None):
+        # Applied here on the game thread, only when the cloud revision is newer and
+        # nothing was edited meanwhile, otherwise the next autosave uploads the edits
+        if cloud_data is not None:
+            if cloud_sync.apply_cloud_data(cloud_data, base_hash=self.reconcile_hash):
+                self.cloud_changes = False
+                message = "Downloaded newer data from cloud!"
+            else:
+                message = KEPT_LOCAL_MESSAGE
 
-        data = {
-            "total_balance": balance,
-            "snake_hi_score": snake_hs,
-            "fruit_hi_score": fruit_hs,
-            "bullet_hi_score": bullet_hs
-        }
+        print(f"Background sync: {message}")
 
-        with open(file_path, 'w') as f:
-            json.dump(data, f)
-    
-    def save_placed_object(self, obj_id, grid_x, grid_y, grid_z, col, row):
-        file_path = os.path.join('storage', 'tile_data.json')
+    def on_autosave_done(self, success, message):
+        print(f"Autosave: {message}")
+
+        # Try again on the next interval
+        if not success:
+            self.cloud_changes = True
 
-        # Load existing placed objects
-        try:
-            with open(file_path, 'r') as f:
-                placed_objects = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            placed_objects = []
+    def load_stats_data(self):
+        data = game_state_store.get_stats()
 
+        balance = data.get('total_balance', 0)
+        snake_hs = data.get('snake_hi_score', 0)
+        fruit_hs = data.get('fruit_hi_score', 0)
+        bullet_hs = data.get('bullet_hi_score', 0)
+        return balance, snake_hs, fruit_hs, bullet_hs
+    
+    def save_stats_data(self, balance, snake_hs, fruit_hs, bullet_hs):
+        game_state_store.update_stats(
+            total_balance=balance,
+            snake_hi_score=snake_hs,
+            fruit_hi_score=fruit_hs,
+            bullet_hi_score=bullet_hs
+        )
+    
+    def save_placed_object(self, obj_id, grid_x, grid_y, grid_z, col, row, sprite=None):
         data = {
             "grid_x": grid_x,
             "grid_y": grid_y,
@@ -2299,45 +2275,28 @@ class RoomDesignerGame:
         }
 
         # Add the new object
-        placed_objects.append(data)
+        self.room_index.add(data, sprite)
 
-        # Save back to file
-        with open(file_path, 'w') as f:
-            json.dump(placed_objects, f, indent=4)
+        # Store the placement
+        game_state_store.place_tile(data)
     
     def load_placed_objects(self):
-        file_path = os.path.join('storage', 'tile_data.json')
+        placed_objects = game_state_store.get_tiles()
 
-        try:
-            with open(file_path, 'r') as f:
-                placed_objects = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            placed_objects = []
+        self.room_index.clear()
 
         for obj in placed_objects:
-            grid_x = obj["grid_x"]
-            grid_y = obj["grid_y"]
-            grid_z = obj["grid_z"]
-            col = obj["col"]
-            row = obj["row"]
-            obj_id = obj["id"]
-
-            # Find item type from shop assets
-            for asset in shop_assets:
-                if asset.get("id") == obj_id:
-                    # Update map
-                    if asset.get("type") == 'floor item':
-                        self.game_map[grid_x, grid_y, grid_z] = self.TOP_SURFACE
-                    else:
-                        self.game_map[grid_x, grid_y, grid_z] = self.NON_TOP_SURFACE
-
             # Recreate the static object
-            static_object = Object(grid_x, grid_y, grid_z, col, row, self.iso_utils, obj_id=obj_id,
+            static_object = Object(obj["grid_x"], obj["grid_y"], obj["grid_z"], obj["col"], obj["row"],
+                                        self.iso_utils, obj_id=obj["id"],
                                         asset=self.selected_item_data
                                     )
             static_object.create_sprite()
             self.all_sprites.add(static_object)
 
+            # Index the object and update map
+            self.room_index.add(obj, static_object)
+
     def apply_selected_assets(self):
         if self.selected_floor_data:
             self.sprites['floor'] = create_isometric_sprites(
@@ -2351,6 +2310,13 @@ class RoomDesignerGame:
     
     def draw(self):
         """Function drawing screen content according to the state of the game"""
+        if self.dirty_rects.enabled:
+            self.dirty_rects.check_scene(self.get_scene_signature())
+
+            # Nothing changed since the last frame, keep the current display
+            if not self.dirty_rects.redraw_requested and not self.object:
+                return
+
         self.screen.fill((0, 0, 0))
         
         if self.game_state == GameState.MENU:
@@ -2364,6 +2330,8 @@ class RoomDesignerGame:
             elif self.show_shop:
                 self.shop_ui.draw(self.screen)
 
+                tooltip_rect = None
+
                 # Asset hover
                 if self.hovered_asset:
                     mx, my = pygame.mouse.get_pos()
@@ -2399,7 +2367,23 @@ class RoomDesignerGame:
                     self.screen.blit(price, price_rect)
                     self.screen.blit(currency, currency_rect)
 
-        pygame.display.flip()
+                    tooltip_rect = bg_rect.union(currency_rect)
+
+                self.dirty_rects.track('tooltip', tooltip_rect, self.hovered_asset and self.hovered_asset['id'])
+
+        if self.dirty_rects.enabled:
+            self.dirty_rects.update_display()
+        else:
+            pygame.display.flip()
+
+    def get_scene_signature(self):
+        """Returns values whose change requires redrawing the whole screen"""
+        return (
+            self.game_state,
+            len(self.all_sprites),
+            self.sprites['floor'],
+            self.sprites['wall']
+        )
 
     def change_used_sprites(self, is_menu=False):
         """Changes the sprite collection based on game state"""
@@ -2424,6 +2408,9 @@ class RoomDesignerGame:
         
         self.play_button.draw(self.screen)
         self.quit_button.draw(self.screen)
+
+        self.dirty_rects.track(self.play_button, self.play_button.rect, self.play_button.is_hovered)
+        self.dirty_rects.track(self.quit_button, self.quit_button.rect, self.quit_button.is_hovered)
         
         authors = [
             ("Thysis", "Game Development & Game Design"),
@@ -2462,7 +2449,8 @@ class RoomDesignerGame:
         """Draws room."""
         self.change_used_sprites()
         
-        self.screen.blit(self.bg_surface, (0, 0))
+        # Background, floors and walls are static, draw them from the cached room layer
+        self.screen.blit(self.get_room_layer(), (0, 0))
         
         self.inventory_button.draw(self.screen)
         self.minigame_button.draw(self.screen)
@@ -2473,6 +2461,15 @@ class RoomDesignerGame:
         elif self.show_sell_button == True:
             self.sell_button.draw(self.screen)
 
+        for button in (self.inventory_button, self.minigame_button, self.shop_button):
+            self.dirty_rects.track(button, button.rect, button.is_hovered)
+
+        # Buy and sell buttons share the same place
+        shown_button = self.buy_button if self.show_buy_button == True else \
+            self.sell_button if self.show_sell_button == True else None
+        self.dirty_rects.track('trade_button', shown_button and shown_button.rect,
+                               shown_button and (shown_button.text, shown_button.is_hovered))
+
         self.screen.blit(self.balance_border, (20, 20))
 
         font = pygame.font.Font('ithaca.ttf', 30)
@@ -2481,39 +2478,23 @@ class RoomDesignerGame:
         balance_rect = balance_text.get_rect()
         balance_rect.bottomleft = (65, 53)
         self.screen.blit(balance_text, balance_rect)
-        
-        render_list = []
 
-        # Collect all tiles and objects for proper depth sorting
-        for x in range(self.grid_width):
-            for y in range(self.grid_height):
-                for z in range(self.grid_depth):
-                    
-                    # Calculate base position for the tile
-                    screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
-                    screen_x += self.camera_offset_x
-                    screen_y += self.camera_offset_y
+        self.dirty_rects.track('balance', balance_rect, self.total_balance)
 
-                    # Floors - render for empty spaces and spaces with objects
-                    if self.game_map[x, y, 0] == self.EMPTY_SPACE or self.game_map[x, y, 0] == self.TOP_SURFACE \
-                    or self.game_map[x, y, 0] == self.NON_TOP_SURFACE:
-                        floor_rect = self.sprites['floor'].get_rect()
-                        floor_rect.x = screen_x - self.iso_utils.half_tile_width
-                        y_offset = 30
-                        floor_rect.y = screen_y - self.iso_utils.half_tile_height + y_offset
-                        render_offset = 2
-                        render_list.append((x + y - render_offset, 'floor', floor_rect))
+        # Cloud save in progress
+        sync_label = sync_worker.get_progress()['label']
+        sync_rect = None
+        if sync_label:
+            sync_text = pygame.font.Font('ithaca.ttf', 24).render(f"{sync_label}...", True, 'white')
+            sync_rect = sync_text.get_rect()
+            sync_rect.topleft = (25, 65)
+            self.screen.blit(sync_text, sync_rect)
 
-                    # Walls - render each layer
-                    if self.game_map[x, y, z] == self.WALL_TILE:
-                        wall_rect = self.sprites['wall'].get_rect()
-                        wall_rect.x = screen_x - self.iso_utils.half_tile_width
-                        tile_spacing = 1.5
-                        y_offset = 3
-                        wall_rect.y = screen_y - self.iso_utils.half_tile_height - (z * self.iso_utils.tile_height
-                                        * tile_spacing + self.iso_utils.half_tile_height - y_offset)
-                        render_list.append((x + y + z, 'wall', wall_rect))
+        self.dirty_rects.track('sync_status', sync_rect, sync_label)
+        
+        render_list = []
 
+        # Only dynamic sprites need depth sorting each frame
         all_entities = list(self.all_sprites)
 
         if self.object:
@@ -2522,34 +2503,36 @@ class RoomDesignerGame:
         sorted_entities = self.iso_utils.get_render_order(all_entities)
 
         for sprite in sorted_entities:
-            adjusted_rect = sprite.rect.copy()
-            screen_x, screen_y = self.iso_utils.grid_to_screen(sprite.grid_x, sprite.grid_y)
-            adjusted_rect.x = screen_x - self.iso_utils.half_tile_width + self.camera_offset_x
-
-            y_offset = 10
-            base_y = screen_y - self.iso_utils.half_tile_height + self.camera_offset_y + y_offset
-            tile_spacing = 1.5
-            z_offset = sprite.grid_z * self.iso_utils.tile_height * tile_spacing + self.iso_utils.half_tile_height
-            adjusted_rect.y = base_y - z_offset
+            adjusted_rect = self.get_sprite_render_rect(sprite)
 
             render_depth = sprite.grid_x + sprite.grid_y + sprite.grid_z
             render_list.append((render_depth, 'sprite', sprite, adjusted_rect))
 
+            # Ghost object moves, rotates and flickers
+            if sprite is self.object:
+                self.dirty_rects.track('ghost', adjusted_rect, (sprite.col, sprite.row, sprite.image.get_alpha()))
+
+        if not self.object:
+            self.dirty_rects.track('ghost', None)
+
         # Sort and render everything
         render_list.sort(key=lambda item: item[0])
 
         for item in render_list:
-            if item[1] == 'sprite':
-                sprite, rect = item[2], item[3]
-                self.screen.blit(sprite.image, rect)
-            else:
-                sprite_type, rect = item[1], item[2]
-                self.screen.blit(self.sprites[sprite_type], rect)
+            sprite, rect = item[2], item[3]
+            self.screen.blit(sprite.image, rect)
         
+        panel_rect = None
+        panel_state = None
+        info_rect = None
+
         if self.show_inventory:
             self.screen.blit(self.inventory_border, (371, 172))
             
             selected_tab = self.inventory_ui.selected_tab
+
+            panel_rect = self.inventory_border.get_rect(topleft=(371, 172))
+            panel_state = self.get_inventory_panel_state()
             
             # Show info
             if selected_tab == self.ITEM_TAB:
@@ -2567,12 +2550,187 @@ class RoomDesignerGame:
                 for row in info:
                     info_text = font.render(f"{row}", True, (255, 255, 255))
                     self.screen.blit(info_text, (20, y_offset))
+
+                    info_line_rect = info_text.get_rect(topleft=(20, y_offset))
+                    info_rect = info_rect.union(info_line_rect) if info_rect else info_line_rect
                     y_offset += 20
         elif self.show_minigames:
             self.screen.blit(self.minigames_border, (371, 172))
+
+            panel_rect = self.minigames_border.get_rect(topleft=(371, 172))
+            panel_state = 'minigames'
         elif self.show_shop:
             self.screen.blit(self.shop_border, (504, 91))
+
+            # Include the page arrows next to the shop
+            panel_rect = self.shop_border.get_rect(topleft=(504, 91)).union(
+                pygame.Rect(self.shop_ui.left_arrow_x, self.shop_ui.left_arrow_y,
+                            self.shop_ui.right_arrow_x + self.shop_ui.arrow_width - self.shop_ui.left_arrow_x,
+                            self.shop_ui.arrow_height)
+            )
+            panel_state = ('shop', self.shop_ui.page, self.shop_ui.selected_asset and self.shop_ui.selected_asset['id'])
+
+        self.dirty_rects.track('panel', panel_rect, panel_state)
+        self.dirty_rects.track('info', info_rect)
+
+    def get_inventory_panel_state(self):
+        """Returns values whose change alters the look of the inventory panel"""
+        selected_item = self.inventory_ui.selected_item
+        selected_floor = self.inventory_ui.selected_floor
+        selected_wall = self.inventory_ui.selected_wall
+
+        return (
+            'inventory',
+            self.inventory_ui.selected_tab,
+            selected_item and (selected_item['id'], selected_item['count']),
+            selected_floor and selected_floor['id'],
+            selected_wall and selected_wall['id'],
+            tuple((item['id'], item['count']) for item in self.inventory_ui.items),
+            len(self.inventory_ui.floors),
+            len(self.inventory_ui.walls)
+        )
     
+    def get_sprite_render_rect(self, sprite):
+        """Screen rect of an object sprite as drawn in the room"""
+        adjusted_rect = sprite.rect.copy()
+        screen_x, screen_y = self.iso_utils.grid_to_screen(sprite.grid_x, sprite.grid_y)
+        adjusted_rect.x = screen_x - self.iso_utils.half_tile_width + self.camera_offset_x
+
+        y_offset = 10
+        base_y = screen_y - self.iso_utils.half_tile_height + self.camera_offset_y + y_offset
+        tile_spacing = self.iso_utils.render_z_spacing
+        z_offset = sprite.grid_z * self.iso_utils.tile_height * tile_spacing + self.iso_utils.half_tile_height
+        adjusted_rect.y = base_y - z_offset
+
+        return adjusted_rect
+
+    def get_room_layer_key(self):
+        """Everything the look of the room layer depends on"""
+        # Floor and wall sprites are replaced whenever the selection changes
+        return (
+            self.bg_surface, self.sprites['floor'], self.sprites['wall'],
+            self.grid_width, self.grid_height, self.grid_depth,
+            self.camera_offset_x, self.camera_offset_y
+        )
+
+    def get_room_layer(self):
+        """
+        Returns the pre-rendered room layer.
+        The layer is rebuilt only when floor/wall sprites, grid size or camera change.
+        """
+        layer_key = self.get_room_layer_key()
+
+        if self.room_layer is None or self.room_layer_key != layer_key:
+            self.build_room_layer()
+            self.room_layer_key = layer_key
+
+        return self.room_layer
+
+    def build_room_layer(self):
+        """Renders background, floors and walls of the room into a single surface."""
+        self.room_layer = pygame.Surface((self.WIDTH, self.HEIGHT)).convert()
+        self.room_layer.blit(self.bg_surface, (0, 0))
+
+        render_list = []
+
+        # Collect all tiles for proper depth sorting
+        for x in range(self.grid_width):
+            for y in range(self.grid_height):
+                for z in range(self.grid_depth):
+                    
+                    # Calculate base position for the tile
+                    screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
+                    screen_x += self.camera_offset_x
+                    screen_y += self.camera_offset_y
+
+                    # Floors - render for empty spaces and spaces with objects
+                    if self.game_map[x, y, 0] != self.WALL_TILE:
+                        floor_rect = self.sprites['floor'].get_rect()
+                        floor_rect.x = screen_x - self.iso_utils.half_tile_width
+                        y_offset = 30
+                        floor_rect.y = screen_y - self.iso_utils.half_tile_height + y_offset
+                        render_offset = 2
+                        render_list.append((x + y - render_offset, 'floor', floor_rect))
+
+                    # Walls - render each layer
+                    if self.game_map[x, y, z] == self.WALL_TILE:
+                        wall_rect = self.sprites['wall'].get_rect()
+                        wall_rect.x = screen_x - self.iso_utils.half_tile_width
+                        tile_spacing = self.iso_utils.render_z_spacing
+                        y_offset = 3
+                        wall_rect.y = screen_y - self.iso_utils.half_tile_height - (z * self.iso_utils.tile_height
+                                        * tile_spacing + self.iso_utils.half_tile_height - y_offset)
+                        render_list.append((x + y + z, 'wall', wall_rect))
+
+        # Sort and render all tiles
+        render_list.sort(key=lambda item: item[0])
+
+        for _, sprite_type, rect in render_list:
+            self.room_layer.blit(self.sprites[sprite_type], rect)
+
+    def get_id_buffer(self):
+        """
+        Returns the ID buffer for picking.
+        The buffer is rebuilt only when the room layer or the placed objects change.
+        """
+        buffer_key = (self.get_room_layer_key(), self.room_index, self.room_index.version)
+
+        if self.id_buffer_key != buffer_key:
+            self.build_id_buffer()
+            self.id_buffer_key = buffer_key
+
+        return self.id_buffer
+
+    def build_id_buffer(self):
+        """Draws floors, wall faces and placed objects into the ID buffer in render order."""
+        self.id_buffer.clear()
+
+        floor = self.sprites['floor']
+        wall = self.sprites['wall']
+        render_list = []
+
+        for x in range(self.grid_width):
+            for y in range(self.grid_height):
+                screen_x, screen_y = self.iso_utils.grid_to_screen(x, y)
+                screen_x += self.camera_offset_x
+                screen_y += self.camera_offset_y
+
+                if self.game_map[x, y, 0] != self.WALL_TILE:
+                    floor_rect = floor.get_rect()
+                    floor_rect.x = screen_x - self.iso_utils.half_tile_width
+                    floor_rect.y = screen_y - self.iso_utils.half_tile_height + 30
+                    render_list.append((x + y - 2, floor, floor_rect, None,
+                                        IdBuffer.encode(IdBuffer.FLOOR, x, y, 0)))
+
+                for z in range(self.grid_depth):
+                    if self.game_map[x, y, z] == self.WALL_TILE:
+                        wall_rect = wall.get_rect()
+                        wall_rect.x = screen_x - self.iso_utils.half_tile_width
+                        wall_rect.y = screen_y - self.iso_utils.half_tile_height - (
+                            self.iso_utils.get_z_offset(z, self.iso_utils.render_z_spacing)
+                            + self.iso_utils.half_tile_height - 3)
+
+                        # Left half of the wall sprite is the east face, right half the north face
+                        half_width = wall_rect.width // 2
+                        east_area = pygame.Rect(0, 0, half_width, wall_rect.height)
+                        north_area = pygame.Rect(half_width, 0, wall_rect.width - half_width, wall_rect.height)
+                        render_list.append((x + y + z, wall, wall_rect, east_area,
+                                            IdBuffer.encode(IdBuffer.WALL, x, y, z, IdBuffer.EAST)))
+                        render_list.append((x + y + z, wall, wall_rect, north_area,
+                                            IdBuffer.encode(IdBuffer.WALL, x, y, z, IdBuffer.NORTH)))
+
+        # Room layer first, objects on top of it
+        render_list.sort(key=lambda item: item[0])
+
+        object_list = []
+        for (x, y, z), sprite in self.room_index.sprites.items():
+            object_list.append((x + y + z, sprite.image, self.get_sprite_render_rect(sprite), None,
+                                IdBuffer.encode(IdBuffer.OBJECT, x, y, z)))
+        object_list.sort(key=lambda item: item[0])
+
+        for _, image, rect, area, color in render_list + object_list:
+            self.id_buffer.draw(image, rect, color, area)
+
     def clear_sprites(self):
         """Deletes all sprite groups"""
         self.all_sprites.empty()
@@ -2588,6 +2746,12 @@ class RoomDesignerGame:
             self.sounds['ui_click'].set_volume(0.6)
         
         pygame.mouse.set_visible(True)
+
+        # Minigames draw over the whole screen
+        self.dirty_rects.mark_full()
+
+        # Write pending changes while the scene changes
+        persistence.request_flush()
         
         self.clear_sprites()
         
@@ -2601,7 +2765,7 @@ class RoomDesignerGame:
             self.object = None
 
         # Load existing selections
-        selected_assets = selection_abl.load_selected_assets()
+        selected_assets = game_state_store.get_selection()
         selected_floor = selected_assets['floor']
         selected_wall = selected_assets['wall']
             
@@ -2626,4 +2790,7 @@ class RoomDesignerGame:
             self.draw()
             self.clock.tick(self.FPS)
 
+        # Make sure every change is on disk before leaving
+        persistence.flush()
+        tile_abl.compact_tiles()
         pygame.quit()
\ No newline at end of file
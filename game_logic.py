@@ -1,11 +1,12 @@
 import numpy as np
 import pygame
 import os
+from collections.abc import Mapping
 from utils.path_utils import get_asset_path, get_spritesheet_path, debug_paths
 
 def create_game_map(grid_width, grid_height, grid_depth):
-    """Creates a 3D game map with walls"""
-    game_map = np.zeros((grid_width, grid_height, grid_depth), dtype=int)
+    """Creates a 3D game map with walls, one byte per cell"""
+    game_map = np.zeros((grid_width, grid_height, grid_depth), dtype=np.uint8)
 
     # Create walls along the edges
     for z in range(grid_depth):
@@ -27,7 +28,7 @@ def create_isometric_sprites(iso_utils, type, selected=None):
         default_file = "stone_wall.png"
 
     # Determine sprite file
-    if selected and isinstance(selected, dict):
+    if selected and isinstance(selected, Mapping):
         sprite_file = selected.get("spritesheet", default_file)
     else:
         sprite_file = default_file
@@ -0,0 +1,422 @@
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import traceback
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from storage.sync_delta import apply_delta
+
+# Same document the Node server creates for a user without saved data
+DEFAULT_SELECTION = {
+    "floor": {"id": "", "name": "", "spritesheet": "", "type": "", "description": "", "price": 0},
+    "wall": {"id": "", "name": "", "spritesheet": "", "type": "", "description": "", "price": 0}
+}
+DEFAULT_STATS = {"total_balance": 0, "snake_hi_score": 0, "fruit_hi_score": 0, "bullet_hi_score": 0}
+
+class LocalStoreError(Exception):
+    """Request the store refuses, carries the HTTP status and the message for the client"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class LocalStore:
+    """
+    Users and game data of the local server in one SQLite database.
+
+    Game data is kept as one JSON document per user with its revision, the way the
+    Node server keeps it in MongoDB. ":memory:" keeps everything in memory.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL UNIQUE,
+            email TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            salt TEXT NOT NULL,
+            reset_code TEXT,
+            reset_code_expires TEXT,
+            created_at TEXT NOT NULL,
+            last_login TEXT
+        );
+        CREATE TABLE IF NOT EXISTS game_data (
+            user_id TEXT PRIMARY KEY,
+            document TEXT NOT NULL,
+            revision INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """
+    HASH_ITERATIONS = 100000
+
+    def __init__(self, path=":memory:"):
+        """
+        Parameters:
+        -----------
+        path : str
+            database file, ":memory:" for a store that lives as long as the server
+        """
+        self.path = path
+
+        directory = os.path.dirname(path) if path != ":memory:" else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Requests arrive on several threads, the lock keeps one statement sequence at a time
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+    # Users
+    def register(self, username, email, password):
+        user_id = secrets.token_hex(12)
+        salt = secrets.token_hex(16)
+
+        try:
+            with self.lock, self.connection:
+                self.connection.execute(
+                    "INSERT INTO users (id, username, email, password_hash, salt, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, username, email, self._hash_password(password, salt), salt, datetime.now().isoformat())
+                )
+        except sqlite3.IntegrityError:
+            raise LocalStoreError(400, "Username or email already exists")
+
+        return {"success": True, "userId": user_id}
+
+    def login(self, username, password):
+        # Login credential is a username or an email
+        column = "email" if "@" in username else "username"
+
+        with self.lock, self.connection:
+            user = self.connection.execute(
+                f"SELECT id, username, password_hash, salt FROM users WHERE {column} = ?", (username,)
+            ).fetchone()
+
+            if not user:
+                raise LocalStoreError(401, "Username or email doesn't exist")
+
+            user_id, username, password_hash, salt = user
+            if not hmac.compare_digest(password_hash, self._hash_password(password, salt)):
+                raise LocalStoreError(401, "Invalid password")
+
+            self.connection.execute("UPDATE users SET last_login = ? WHERE id = ?", (datetime.now().isoformat(), user_id))
+
+        return {"success": True, "userId": user_id, "username": username}
+
+    def create_reset_code(self, email):
+        """Returns a 6-digit code valid for 15 minutes, there is no mail server to send it"""
+        code = str(random.randint(100000, 999999))
+        expires = (datetime.now() + timedelta(minutes=15)).isoformat()
+
+        with self.lock, self.connection:
+            updated = self.connection.execute(
+                "UPDATE users SET reset_code = ?, reset_code_expires = ? WHERE email = ?", (code, expires, email)
+            ).rowcount
+
+        if not updated:
+            raise LocalStoreError(400, "No account found with this email address")
+        return code
+
+    def reset_password(self, email, reset_code, new_password):
+        with self.lock, self.connection:
+            user = self.connection.execute(
+                "SELECT id, reset_code, reset_code_expires FROM users WHERE email = ?", (email,)
+            ).fetchone()
+
+            if not user:
+                raise LocalStoreError(400, "No account found with this email address")
+
+            user_id, code, expires = user
+            if not code or code != reset_code or expires < datetime.now().isoformat():
+                raise LocalStoreError(400, "Invalid or expired reset code")
+
+            salt = secrets.token_hex(16)
+            self.connection.execute(
+                "UPDATE users SET password_hash = ?, salt = ?, reset_code = NULL, reset_code_expires = NULL WHERE id = ?",
+                (self._hash_password(new_password, salt), salt, user_id)
+            )
+
+        return {"success": True, "message": "Password reset successfully"}
+
+    # Game data
+    def load_game_data(self, user_id):
+        """Returns the stored document, or the default one without storing it"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT document, revision, updated_at FROM game_data WHERE user_id = ?", (user_id,)
+            ).fetchone()
+
+        if not row:
+            return self._build_document(user_id, {}, 0, datetime.now().isoformat())
+
+        document, revision, updated_at = row
+        return dict(json.loads(document), user_id=user_id, revision=revision, updated_at=updated_at)
+
+    def load_revision(self, user_id):
+        """Returns the revision of the stored document, None when there is none"""
+        with self.lock:
+            row = self.connection.execute("SELECT revision FROM game_data WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else None
+
+    def save_game_data(self, user_id, game_data):
+        """Replaces the document and returns it with the next revision"""
+        with self.lock, self.connection:
+            revision = (self.load_revision(user_id) or 0) + 1
+            document = self._build_document(user_id, game_data, revision, datetime.now().isoformat())
+            self._write(document)
+        return document
+
+    def sync_game_data(self, user_id, game_data, last_sync_time):
+        """Saves when the local data is newer, returns (action, document)"""
+        with self.lock:
+            existing = self.load_game_data(user_id) if self.load_revision(user_id) is not None else None
+
+            try:
+                last_sync = datetime.fromisoformat(last_sync_time)
+            except (TypeError, ValueError):
+                last_sync = None
+
+            # An unknown sync time never wins, like an invalid date on the Node server
+            if existing is None or (last_sync is not None and datetime.fromisoformat(existing["updated_at"]) <= last_sync):
+                return "upload", self.save_game_data(user_id, game_data)
+            return "download", existing
+
+    def apply_changes(self, user_id, base_revision, changes):
+        """Applies a delta on top of base_revision, returns (conflict, revision)"""
+        with self.lock, self.connection:
+            revision = self.load_revision(user_id)
+
+            # Changes were made on top of an older document, client has to do a full sync
+            if revision is None or revision != base_revision:
+                return True, revision or 0
+
+            if not changes:
+                return False, revision
+
+            document = apply_delta(self.load_game_data(user_id), changes)
+            document.update(revision=revision + 1, updated_at=datetime.now().isoformat())
+            self._write(document)
+            return False, revision + 1
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _build_document(self, user_id, game_data, revision, updated_at):
+        return {
+            "user_id": user_id,
+            "inventory": game_data.get("inventory") or {"item": [], "floor": [], "wall": []},
+            "selection": game_data.get("selection") or DEFAULT_SELECTION,
+            "stats": game_data.get("stats") or DEFAULT_STATS,
+            "tiles": game_data.get("tiles") or [],
+            "revision": revision,
+            "updated_at": updated_at
+        }
+
+    def _write(self, document):
+        content = {key: document[key] for key in ("inventory", "selection", "stats", "tiles")}
+        self.connection.execute(
+            "INSERT INTO game_data (user_id, document, revision, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET document = excluded.document, "
+            "revision = excluded.revision, updated_at = excluded.updated_at",
+            (document["user_id"], json.dumps(content), document["revision"], document["updated_at"])
+        )
+
+    def _hash_password(self, password, salt):
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), self.HASH_ITERATIONS).hex()
+
+class LocalRequestHandler(BaseHTTPRequestHandler):
+    """Routes of server/routes/routes.js, answered from the LocalStore of the server"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self.send_json(200, {"status": "ok"})
+
+        user_id = self.match("/gamedata/load/")
+        if user_id is None:
+            return self.send_json(404, {"message": "Not found."})
+
+        # Documents are tagged with their revision, like on the Node server
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            revision = self.store.load_revision(user_id)
+            if revision is not None and if_none_match == revision_tag(revision):
+                return self.send_json(304, None, {"ETag": revision_tag(revision)})
+
+        game_data = self.store.load_game_data(user_id)
+        self.send_json(200, {"status": True, "data": game_data}, {"ETag": revision_tag(game_data["revision"])})
+
+    def do_POST(self):
+        body = self.read_json()
+        if body is None:
+            return
+
+        try:
+            if self.path == "/auth/register":
+                result = self.store.register(body.get("username"), body.get("email"), body.get("password"))
+                return self.send_json(201, {"status": True, "message": "User registered successfully.", "data": result})
+
+            if self.path == "/auth/login":
+                result = self.store.login(body.get("username", ""), body.get("password", ""))
+                return self.send_json(200, {"status": True, "message": "Login successful.", "data": result})
+
+            if self.path == "/auth/forgot-password":
+                code = self.store.create_reset_code(body.get("email"))
+                print(f"Local server: reset code for {body.get('email')} is {code}")
+                result = {"success": True, "message": "Reset code sent to your email"}
+                return self.send_json(200, {"status": True, "message": "Reset code sent to your email.", "data": result})
+
+            if self.path == "/auth/reset-password":
+                result = self.store.reset_password(body.get("email"), body.get("resetCode"), body.get("newPassword", ""))
+                return self.send_json(200, {"status": True, "message": "Password reset successfully.", "data": result})
+
+            user_id = self.match("/gamedata/save/")
+            if user_id is not None:
+                result = self.store.save_game_data(user_id, body)
+                return self.send_json(200, {"status": True, "message": "Game data saved successfully.", "data": result})
+
+            self.send_json(404, {"message": "Not found."})
+        except LocalStoreError as e:
+            self.send_json(e.status, {"status": False, "message": e.message})
+
+    def do_PATCH(self):
+        body = self.read_json()
+        if body is None:
+            return
+
+        user_id = self.match("/gamedata/sync/")
+        if user_id is not None:
+            action, data = self.store.sync_game_data(user_id, body.get("gameData") or {}, body.get("lastSyncTime"))
+            return self.send_json(200, {
+                "status": True,
+                "message": f"Game data {action}ed successfully.",
+                "action": action,
+                "data": data
+            })
+
+        user_id = self.match("/gamedata/delta/")
+        if user_id is not None:
+            conflict, revision = self.store.apply_changes(user_id, body.get("baseRevision"), body.get("changes") or {})
+            if conflict:
+                return self.send_json(409, {"status": False, "message": "Revision mismatch, full sync required.", "revision": revision})
+            return self.send_json(200, {"status": True, "message": "Game data changes applied.", "revision": revision})
+
+        self.send_json(404, {"message": "Not found."})
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def match(self, prefix):
+        """Returns the user id of a /prefix/:userId path, None for other paths"""
+        if self.path.startswith(prefix) and "/" not in self.path[len(prefix):]:
+            return self.path[len(prefix):] or None
+        return None
+
+    def read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_json(400, {"status": False, "message": "Invalid JSON body."})
+            return None
+
+    def send_json(self, status, body, headers=None):
+        content = b"" if body is None else json.dumps(body).encode("utf-8")
+
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        except Exception as e:
+            # A broken request must not take the server down
+            print(f"Local server error: {e}")
+            traceback.print_exc()
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+def revision_tag(revision):
+    return f'"{revision or 0}"'
+
+class LocalServer:
+    """
+    Pure-Python stand-in for the Node server with the same routes, for offline
+    sessions and machines without database access.
+
+    It runs in the game process on a background thread, ServerLauncher starts it
+    instead of Node when ROOM_DESIGNER_SERVER is "local".
+    """
+
+    def __init__(self, host="127.0.0.1", port=8000, db_path=":memory:"):
+        """
+        Parameters:
+        -----------
+        host : str
+            address to listen on
+        port : int
+            port to listen on, 0 picks a free one
+        db_path : str
+            SQLite database file, ":memory:" keeps the data only while the server runs
+        """
+        self.host = host
+        self.port = port
+        self.db_path = db_path
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        """Starts listening, requests are answered as soon as this returns"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), LocalRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = LocalStore(self.db_path)
+        self.port = self.httpd.server_address[1]
+
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="local-server", daemon=True)
+        self.thread.start()
+        print(f"Local server is running on port http://{self.host}:{self.port}.")
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd.store.close()
+            self.httpd = None
+            self.thread = None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Room Designer game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", default="storage/local_server.db", help='database file, ":memory:" for no file')
+    args = parser.parse_args()
+
+    server = LocalServer(args.host, args.port, args.db)
+    server.start()
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
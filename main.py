@@ -9,6 +9,7 @@ import os
 import signal
 import time
 import traceback
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 # Check dependencies before any other imports
 def check_dependencies_first():
@@ -37,6 +38,11 @@ def check_dependencies_first():
 def basic_dependency_check():
     """Basic fallback dependency check"""
     import subprocess
+    
+    # The local Python server doesn't need Node.js
+    if os.environ.get('ROOM_DESIGNER_SERVER') == 'local':
+        return True
+    
     try:
         # Just check Node.js quickly
         result = subprocess.run(['node', '--version'], 
@@ -71,7 +77,9 @@ def show_basic_error():
 # Now we can safely import other modules
 from game import RoomDesignerGame
 from screens.auth_screen import AuthScreen
-from storage.cloud_sync import (is_logged_in, get_current_user, sync_to_cloud, upload_to_cloud, wait_for_server_ready)
+from storage.cloud_sync import (is_logged_in, get_current_user, sync_to_cloud)
+from storage.sync_worker import sync_worker
+from domain.state.game_state_store import game_state_store
 from server_launcher import ServerLauncher
 from utils.path_utils import init_path_system
 import pygame
@@ -92,6 +100,22 @@ def game_startup():
         traceback.print_exc()
         return False
 
+def get_autosave_interval(default=120):
+    """Seconds between cloud saves while playing, 0 saves only at exit"""
+    value = os.environ.get('ROOM_DESIGNER_AUTOSAVE_SECONDS')
+    if value is None:
+        return default
+    
+    try:
+        interval = float(value)
+    except ValueError:
+        interval = -1
+    
+    if not 0 <= interval < float('inf'):
+        print(f"Invalid ROOM_DESIGNER_AUTOSAVE_SECONDS value '{value}', saving every {default}s")
+        return default
+    return interval
+
 def show_auth_screen():
     """Show the combined login/register screen"""
     try:
@@ -116,14 +140,9 @@ def show_auth_screen():
             font = pygame.font.Font(font_path, 24)
         
         auth_screen = AuthScreen(screen, font)
-        logged_in = auth_screen.run()
-        
-        if logged_in:
-            # Try to sync after successful login
-            success, message = sync_to_cloud()
-            print(f"Sync: {message}")
         
-        return logged_in
+        # Login already brought the data, or the game syncs it in the background
+        return auth_screen.run()
     except Exception as e:
         print(f"Error in show_auth_screen: {e}")
         traceback.print_exc()
@@ -160,12 +179,21 @@ class GameManager:
                 return None
             print("Server started successfully")
             
+            # Sends changes left from an earlier session once a user is logged in
+            sync_worker.start()
+            
             # Then handle authentication
             print("Showing auth screen...")
             authenticated = show_auth_screen()
             if authenticated:
                 print("Authentication successful, initializing game...")
-                self.game = RoomDesignerGame()
+                # Dirty-rect rendering is opt-in, e.g. for low-end kiosks
+                dirty_rendering = os.environ.get('ROOM_DESIGNER_DIRTY_RENDERING') == '1'
+                # Pixel-exact picking for rooms with dense, overlapping furniture
+                picking_mode = os.environ.get('ROOM_DESIGNER_PICKING_MODE', 'analytic')
+                autosave_interval = get_autosave_interval()
+                self.game = RoomDesignerGame(dirty_rendering=dirty_rendering, picking_mode=picking_mode,
+                                             autosave_interval=autosave_interval)
             else:
                 print("Authentication failed or cancelled")
             return self.game
@@ -188,9 +216,10 @@ class GameManager:
         print("Starting cleanup...")
         self._cleanup_done = True
         
-        # Give any ongoing uploads a moment to complete
+        # Give a running upload a moment, an unfinished one is still in the outbox
         print("Waiting for any ongoing operations to complete...")
-        time.sleep(3)
+        if not sync_worker.wait_idle(timeout=3):
+            print("Sync still running, leaving it to the next launch")
         
         # Stop server after ensuring uploads are done
         try:
@@ -213,6 +242,9 @@ def signal_handler(signum, frame):
     pygame.quit()
     sys.exit(0)
 
+# Longest wait for the final upload at exit
+UPLOAD_ON_EXIT_TIMEOUT = 10
+
 def upload_on_game_end():
     """Upload data immediately after game ends, while server is still running"""
     print("Attempting to upload game data...")
@@ -220,16 +252,15 @@ def upload_on_game_end():
         if is_logged_in():
             print(f"User is logged in as: {get_current_user()}")
             
-            # Enhanced server readiness check before upload
-            print("Ensuring server is ready for upload...")
-            if not wait_for_server_ready(timeout=20, check_interval=0.5):
-                print("Server is not ready for upload")
+            # Written to the outbox first, so quitting early loses nothing;
+            # it fails fast by itself when the server is known to be down
+            print("Queueing final upload...")
+            future = sync_worker.upload(game_state_store.export(), durable=True)
+            try:
+                success, message = future.result(timeout=UPLOAD_ON_EXIT_TIMEOUT)
+            except FutureTimeoutError:
+                print("Upload is taking too long, it will be sent on the next launch")
                 return False
-            
-            print("Server is ready, proceeding with upload...")
-            
-            print("Calling upload_to_cloud()...")
-            success, message = upload_to_cloud()
             print(f"Upload result - Success: {success}, Message: {message}")
             
             if success:
@@ -292,36 +323,9 @@ if __name__ == "__main__":
                 game.run()
                 print("Game ended, uploading data...")
                 
-                # Enhanced upload retry logic with better server readiness checks
-                upload_success = False
-                max_retries = 5 
-                
-                for attempt in range(max_retries):
-                    print(f"Upload attempt {attempt + 1}/{max_retries}")
-                    
-                    # Wait longer between attempts for exe mode
-                    if attempt > 0:
-                        wait_time = min(5, 2 + attempt)  # Progressive delay: 2,3,4,5,5 seconds
-                        print(f"Waiting {wait_time}s before retry...")
-                        time.sleep(wait_time)
-                    
-                    upload_success = upload_on_game_end()
-                    
-                    if upload_success:
-                        print("Upload successful!")
-                        break
-                    else:
-                        print(f"Upload attempt {attempt + 1} failed")
-                        
-                        # For exe mode, give the server more time to stabilize
-                        if getattr(sys, 'frozen', False) and attempt < max_retries - 1:
-                            print("Running as exe, giving server extra time to stabilize...")
-                            time.sleep(2)
-                
+                # Unsent changes stay in the outbox and go up on the next launch
+                upload_success = upload_on_game_end()
                 print(f"Upload completed with success: {upload_success}")
-                
-                # Give more time for server operations to complete before cleanup
-                time.sleep(3)
             else:
                 print("Failed to initialize game")
     except Exception as e:
@@ -1,6 +1,6 @@
 import pygame
 import sys
-from storage.cloud_sync import login_user, register_user, request_password_reset, reset_password
+from storage.sync_worker import sync_worker
 from game_logic import create_background, create_sounds
 
 class AuthScreen:
@@ -42,6 +42,12 @@ class AuthScreen:
         self.message_color = self.BLACK
         self.reset_email = ""
         
+        # Set by the login or register callback, the screen closes on the next frame
+        self.logged_in = False
+        
+        # A request of this screen is queued or running, its callback clears it
+        self.request_pending = False
+        
         # Input field rects - will be repositioned based on mode
         self.username_or_email_rect = pygame.Rect(self.screen_width // 2 - 165, 270, 300, 40)
         self.password_rect = pygame.Rect(self.screen_width // 2 - 165, 330, 300, 40)
@@ -232,14 +238,34 @@ class AuthScreen:
             self.message_color = self.RED
             return None
         
-        # Try login with username or email
-        success, message = login_user(self.username_or_email, self.password)
+        if not self.can_send_request():
+            return None
+        
+        self.request_pending = True
+        # Try login with username or email, the result arrives in on_auth_done
+        sync_worker.login(self.username_or_email, self.password, callback=self.on_auth_done)
+        return None
+
+    def can_send_request(self):
+        """
+        False with a message while a request of this screen is on its way.
+        Other work of the sync worker doesn't block, the request waits in its queue.
+        """
+        if not self.request_pending:
+            return True
+        
+        self.message = "Please wait, the last request is not finished yet"
+        self.message_color = self.ORANGE
+        return False
+
+    def on_auth_done(self, success, message):
+        """Called on the main thread when a login or registration finished"""
+        self.request_pending = False
         self.message = message
         self.message_color = self.GREEN if success else self.RED
         
         if success:
-            return "success"
-        return None
+            self.logged_in = True
 
     def attempt_register(self):
         """Attempt to register"""
@@ -258,12 +284,11 @@ class AuthScreen:
             self.message_color = self.RED
             return None
         
-        success, message = register_user(self.username_or_email, self.email, self.password)
-        self.message = message
-        self.message_color = self.GREEN if success else self.RED
+        if not self.can_send_request():
+            return None
         
-        if success:
-            return "success"
+        self.request_pending = True
+        sync_worker.register(self.username_or_email, self.email, self.password, callback=self.on_auth_done)
         return None
 
     def request_reset_code(self):
@@ -278,18 +303,26 @@ class AuthScreen:
             self.message_color = self.RED
             return None
         
-        success, message = request_password_reset(self.username_or_email)
+        if not self.can_send_request():
+            return None
+        
+        self.request_pending = True
+        email = self.username_or_email
+        sync_worker.request_password_reset(email, callback=lambda success, message: self.on_reset_code_sent(email, success, message))
+        return None
+
+    def on_reset_code_sent(self, email, success, message):
+        """Called on the main thread when the reset code request finished"""
+        self.request_pending = False
         self.message = message
         self.message_color = self.GREEN if success else self.RED
         
         if success:
-            self.reset_email = self.username_or_email
+            self.reset_email = email
             self.mode = "reset_password"
             self.active_field = None
             self.reset_code = ""
             self.new_password = ""
-        
-        return None
 
     def attempt_password_reset(self):
         """Attempt to reset password with code"""
@@ -303,7 +336,16 @@ class AuthScreen:
             self.message_color = self.RED
             return None
         
-        success, message = reset_password(self.reset_email, self.reset_code, self.new_password)
+        if not self.can_send_request():
+            return None
+        
+        self.request_pending = True
+        sync_worker.reset_password(self.reset_email, self.reset_code, self.new_password, callback=self.on_password_reset)
+        return None
+
+    def on_password_reset(self, success, message):
+        """Called on the main thread when the password reset finished"""
+        self.request_pending = False
         self.message = message
         self.message_color = self.GREEN if success else self.RED
         
@@ -316,8 +358,6 @@ class AuthScreen:
             self.reset_code = ""
             self.new_password = ""
             self.reset_email = ""
-        
-        return None
 
     def draw_input_field(self, rect, text, placeholder, is_active, hide_text=False):
         """Draw an input field"""
@@ -402,8 +442,18 @@ class AuthScreen:
         else:  # reset_password
             self.draw_reset_password_ui()
         
-        # Message
-        if self.message:
+        # Progress of a running request replaces the message
+        progress = sync_worker.get_progress()
+        if progress["label"]:
+            dots = "." * (int(progress["elapsed"] * 2) % 4)
+            label = progress["label"]
+            if self.request_pending and progress["queued"]:
+                # The request of this screen waits behind other sync work
+                label += ", request queued"
+            message_surface = self.font.render(f"{label}{dots}", True, self.WHITE)
+            message_rect = message_surface.get_rect(center=(self.screen_width // 2 - 7, 550))
+            self.screen.blit(message_surface, message_rect)
+        elif self.message:
             message_surface = self.font.render(self.message, True, self.message_color)
             message_rect = message_surface.get_rect(center=(self.screen_width // 2 - 7, 550))
             self.screen.blit(message_surface, message_rect)
@@ -500,7 +550,10 @@ class AuthScreen:
             if result == "quit":
                 pygame.quit()
                 sys.exit()
-            elif result == "success":
+            
+            # Results of requests made on the sync worker
+            sync_worker.dispatch()
+            if self.logged_in:
                 return True  # Logged in successfully
             
             self.draw()
@@ -16,6 +16,7 @@ router.route('/auth/reset-password').post(authController.resetPasswordController
 router.route('/gamedata/save/:userId').post(gameDataController.saveGameDataController);
 router.route('/gamedata/load/:userId').get(gameDataController.loadGameDataController);
 router.route('/gamedata/sync/:userId').patch(gameDataController.syncGameDataController);
+router.route('/gamedata/delta/:userId').patch(gameDataController.deltaGameDataController);
 
 //export router
 module.exports = router;
\ No newline at end of file
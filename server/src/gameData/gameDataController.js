@@ -29,12 +29,28 @@ async function saveGameDataController(req, res) {
     }
 }
 
+//documents are tagged with their revision, every write increments it
+function revisionTag(revision) {
+    return `"${revision || 0}"`;
+}
+
 async function loadGameDataController(req, res) {
     try {
         const userId = req.params.userId;
+
+        //client already has the current revision, answer without loading the document
+        const ifNoneMatch = req.get('If-None-Match');
+        if (ifNoneMatch) {
+            const revision = await gameDataService.loadRevisionService(userId);
+            if (revision !== null && ifNoneMatch === revisionTag(revision)) {
+                return res.status(304).set('ETag', revisionTag(revision)).end();
+            }
+        }
+
         const gameData = await gameDataService.loadGameDataService(userId);
 
         if (gameData) {
+            res.set('ETag', revisionTag(gameData.revision));
             res.status(200).send({ "status": true, "data": gameData });
         } else {
             res.status(404).send({ message: 'Game data not found.' });
@@ -69,8 +85,28 @@ async function syncGameDataController(req, res) {
     }
 }
 
+async function deltaGameDataController(req, res) {
+    try {
+        const userId = req.params.userId;
+        const baseRevision = req.body.baseRevision;
+        const changes = req.body.changes || {};
+
+        const result = await gameDataService.applyDeltaService(userId, baseRevision, changes);
+
+        if (result.conflict) {
+            res.status(409).send({ "status": false, "message": "Revision mismatch, full sync required.", "revision": result.revision });
+        } else {
+            res.send({ "status": true, "message": "Game data changes applied.", "revision": result.revision });
+        }
+    } catch (e) {
+        console.error('Delta sync error:', e);
+        res.status(500).send({ message: 'Server error.', error: e.message });
+    }
+}
+
 module.exports = {
     saveGameDataController,
     loadGameDataController,
-    syncGameDataController
+    syncGameDataController,
+    deltaGameDataController
 }
\ No newline at end of file
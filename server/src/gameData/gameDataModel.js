@@ -80,6 +80,11 @@ const gameDataSchema = new Schema({
         "row": Number,
         "id": String
     }],
+    //bumped on every change, delta sync applies changes only on top of the revision the client knows
+    revision: {
+        type: Number,
+        default: 0
+    },
     updated_at: {
         type: Date,
         default: Date.now
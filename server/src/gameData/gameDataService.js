@@ -26,7 +26,7 @@ module.exports.saveGameDataService = (userId, gameData) => {
 
         gameDataModel.findOneAndUpdate(
             { user_id: userId },
-            { $set: updateData },
+            { $set: updateData, $inc: { revision: 1 } },
             { new: true, upsert: true }
         )
             .then((result) => {
@@ -57,6 +57,7 @@ module.exports.loadGameDataService = (userId) => {
                         },
                         stats: { total_balance: 0, snake_hi_score: 0, fruit_hi_score: 0, bullet_hi_score: 0 },
                         tiles: [],
+                        revision: 0,
                         updated_at: new Date()
                     };
                     resolve(defaultData);
@@ -68,6 +69,13 @@ module.exports.loadGameDataService = (userId) => {
     });
 }
 
+module.exports.loadRevisionService = async (userId) => {
+    const result = await gameDataModel.findOne({ user_id: userId }, { revision: 1 });
+
+    //no document yet, nothing the client could have
+    return result ? result.revision || 0 : null;
+}
+
 module.exports.syncGameDataService = (userId, gameData, lastSyncTime) => {
     return new Promise((resolve, reject) => {
         gameDataModel.findOne({ user_id: userId })
@@ -90,4 +98,111 @@ module.exports.syncGameDataService = (userId, gameData, lastSyncTime) => {
                 reject(false);
             });
     });
+}
+
+module.exports.applyDeltaService = async (userId, baseRevision, changes) => {
+    const existingData = await gameDataModel.findOne({ user_id: userId }, { revision: 1 });
+    const currentRevision = existingData ? existingData.revision || 0 : 0;
+
+    //changes were made on top of an older document, client has to do a full sync
+    if (!existingData || currentRevision !== baseRevision) {
+        return { conflict: true, revision: currentRevision };
+    }
+
+    const tiles = changes.tiles || {};
+    const inventory = changes.inventory || {};
+    const hasChanges = Object.keys(changes).length > 0;
+
+    if (!hasChanges) {
+        return { conflict: false, revision: currentRevision };
+    }
+
+    //one pipeline update applies the whole delta, a failure leaves the document untouched;
+    //values are cast by the schema first, pipeline updates bypass casting
+    const casted = new gameDataModel({
+        tiles: tiles.put || [],
+        inventory: Object.fromEntries(
+            Object.entries(inventory).map(([category, categoryChanges]) => [category, categoryChanges.put || []])
+        ),
+        stats: changes.stats,
+        selection: changes.selection
+    }).toObject();
+
+    const tilePositions = [...(tiles.remove || []), ...(tiles.put || [])].map(tile => ({
+        grid_x: tile.grid_x, grid_y: tile.grid_y, grid_z: tile.grid_z
+    }));
+
+    const set = {
+        updated_at: new Date(),
+        revision: { $add: [{ $ifNull: ['$revision', 0] }, 1] }
+    };
+
+    //changed and deleted entries are filtered out, changed and new ones appended
+    if (tilePositions.length > 0 || casted.tiles.length > 0) {
+        set.tiles = {
+            $concatArrays: [
+                {
+                    $filter: {
+                        input: { $ifNull: ['$tiles', []] },
+                        as: 'tile',
+                        cond: {
+                            $not: [{
+                                $in: [
+                                    { grid_x: '$$tile.grid_x', grid_y: '$$tile.grid_y', grid_z: '$$tile.grid_z' },
+                                    { $literal: tilePositions }
+                                ]
+                            }]
+                        }
+                    }
+                },
+                { $literal: casted.tiles }
+            ]
+        };
+    }
+
+    const inventorySet = {};
+    for (const [category, categoryChanges] of Object.entries(inventory)) {
+        const ids = [...(categoryChanges.remove || []), ...(categoryChanges.put || []).map(entry => entry.id)];
+
+        inventorySet[category] = {
+            $concatArrays: [
+                {
+                    $filter: {
+                        input: { $ifNull: [`$inventory.${category}`, []] },
+                        as: 'entry',
+                        cond: { $not: [{ $in: ['$$entry.id', { $literal: ids }] }] }
+                    }
+                },
+                { $literal: casted.inventory[category] || [] }
+            ]
+        };
+    }
+    if (Object.keys(inventorySet).length > 0) {
+        //dotted paths are not allowed in pipeline stages
+        set.inventory = { $mergeObjects: [{ $ifNull: ['$inventory', {}] }, inventorySet] };
+    }
+
+    if (changes.stats) {
+        set.stats = { $literal: casted.stats };
+    }
+    if (changes.selection) {
+        set.selection = { $literal: casted.selection };
+    }
+
+    //documents saved before revisions existed have no revision field
+    const revisionFilter = baseRevision === 0 ? { $in: [0, null] } : baseRevision;
+
+    const updated = await gameDataModel.findOneAndUpdate(
+        { user_id: userId, revision: revisionFilter },
+        [{ $set: set }],
+        { new: true }
+    );
+
+    //another client changed the document in the meantime
+    if (!updated) {
+        return { conflict: true, revision: currentRevision };
+    }
+
+    console.log('Delta applied for user:', userId, 'revision:', baseRevision + 1);
+    return { conflict: false, revision: baseRevision + 1 };
 }
\ No newline at end of file
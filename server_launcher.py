@@ -1,19 +1,30 @@
 import subprocess
 import sys
 import os
+import socket
 import time
 import psutil
 import threading
-import requests
 import traceback
+from urllib.parse import urlparse
+
+from local_server import LocalServer
+from storage.server_health import server_health
 
 class ServerLauncher:
     def __init__(self):
         self.server_process = None
-        self.server_port = 8000
+        self.server_port = urlparse(server_health.base_url).port or 8000
         self.server_start_timeout = 45  # Increased timeout for exe mode
         self.stdout_thread = None
         self.stderr_thread = None
+        
+        # Set by the output reader once the server reports that it is listening
+        self.server_ready = threading.Event()
+        
+        # "node" runs server/app.js, "local" the Python stand-in without database access
+        self.server_kind = os.environ.get('ROOM_DESIGNER_SERVER', 'node')
+        self.local_server = None
 
     def find_node_executable(self):
         """Find the Node.js executable"""
@@ -62,46 +73,43 @@ class ServerLauncher:
                     # Look for server ready indicators
                     if "Server is running on port" in decoded_line or "listening" in decoded_line.lower():
                         print("Server startup message detected!")
+                        self.server_ready.set()
                         
         except Exception as e:
             print(f"Error reading {pipe_name}: {e}")
 
-    def wait_for_server_health(self, max_attempts=15, initial_delay=2):
-        """Enhanced server health checking with progressive delays"""
-        print(f"Starting server health checks (max attempts: {max_attempts})...")
-        
-        # Give server initial time to start
-        print(f"Initial delay: {initial_delay}s")
-        time.sleep(initial_delay)
-        
-        for attempt in range(max_attempts):
-            # Check if process is still running
-            if self.server_process and self.server_process.poll() is not None:
-                print(f"Server process died with return code: {self.server_process.poll()}")
-                return False
+    def start_local_server(self):
+        """Starts the Python stand-in server inside the game process"""
+        try:
+            if getattr(sys, 'frozen', False):
+                base_path = os.path.dirname(sys.executable)
+            else:
+                base_path = os.path.dirname(os.path.abspath(__file__))
             
-            try:
-                print(f"Health check attempt {attempt + 1}/{max_attempts}...")
-                response = requests.get(f'http://localhost:{self.server_port}/health', timeout=3)
-                if response.status_code == 200:
-                    print("Server health check passed!")
-                    # Give it a moment to fully stabilize
-                    time.sleep(1)
-                    return True
-                else:
-                    print(f"Server responded with status code: {response.status_code}")
-            except requests.exceptions.RequestException as e:
-                print(f"Health check failed: {e}")
+            # ":memory:" keeps nothing after the game closes
+            db_path = os.environ.get('ROOM_DESIGNER_LOCAL_DB', os.path.join(base_path, 'storage', 'local_server.db'))
+            print(f"Starting local server on port {self.server_port} with database: {db_path}")
             
-            # Progressive delay: start with 1s, then 2s, then 3s, max 4s
-            delay = min(4, 1 + (attempt // 3))
-            print(f"Waiting {delay}s before next attempt...")
-            time.sleep(delay)
-        
-        print("Server health checks exhausted")
-        return False
+            self.local_server = LocalServer(port=self.server_port, db_path=db_path)
+            self.local_server.start()
+            
+            # Listening already, one probe fills the shared health state
+            if not server_health.probe():
+                print("Local server is not responding")
+                self.stop_server()
+                return False
+            
+            print("Local server started and ready!")
+            return True
+        except Exception as e:
+            print(f"Error starting local server: {e}")
+            traceback.print_exc()
+            return False
 
     def start_server(self):
+        if self.server_kind == 'local':
+            return self.start_local_server()
+        
         try:
             print("Starting server...")
             
@@ -189,8 +197,10 @@ class ServerLauncher:
             # Enhanced environment setup for server process
             env = os.environ.copy()
             env['NODE_ENV'] = 'production'  # Ensure production mode
+            env['PORT'] = str(self.server_port)  # Listen where the game expects the server
             
             # Start server with enhanced configuration
+            self.server_ready.clear()
             self.server_process = subprocess.Popen(
                 [node_path, app_path],
                 cwd=server_dir,
@@ -241,96 +251,82 @@ class ServerLauncher:
             traceback.print_exc()
             return False
 
-    def wait_for_server_health(self):
-        """Wait for server to become healthy with enhanced logic"""
+    def is_port_open(self):
+        """True when something accepts connections on the server port"""
+        host = urlparse(server_health.base_url).hostname or 'localhost'
+        try:
+            with socket.create_connection((host, self.server_port), timeout=0.2):
+                return True
+        except OSError:
+            return False
+
+    def wait_for_server_health(self, initial_delay=0.005, max_delay=0.25):
+        """
+        Wait for server to become healthy, as soon as it is listening
+
+        The server listens only after connecting to the database, so the startup line
+        on stdout or an open port means it can answer. Until then the port is checked
+        with gaps growing from initial_delay to max_delay, the startup line ends a gap early.
+        """
         print("Waiting for server to become healthy...")
-        start_time = time.time()
+        start_time = time.monotonic()
         
         # Adaptive timeout based on execution mode
         if getattr(sys, 'frozen', False):
             # Running as exe - give more time
             timeout = self.server_start_timeout
-            initial_delay = 3  # Extra initial delay for exe
         else:
             # Running as script
             timeout = 20
-            initial_delay = 1
-        
-        print(f"Using timeout: {timeout}s, initial delay: {initial_delay}s")
-        time.sleep(initial_delay)
         
+        deadline = start_time + timeout
+        delay = initial_delay
         attempts = 0
-        consecutive_failures = 0
-        max_consecutive_failures = 3
         
-        while time.time() - start_time < timeout:
-            attempts += 1
-            
+        while True:
             # Check if process is still running
             if self.server_process.poll() is not None:
                 print(f"Server process died with return code: {self.server_process.poll()}")
+                server_health.mark_down()
                 return False
             
-            try:
-                print(f"Health check attempt {attempts} (elapsed: {time.time() - start_time:.1f}s)")
-                response = requests.get(f'http://localhost:{self.server_port}/health', timeout=4)
-                
-                if response.status_code == 200:
-                    print(f"Server health check passed after {attempts} attempts!")
-                    
-                    # Do a few more quick checks to ensure stability
-                    print("Performing stability verification...")
-                    stable = True
-                    for i in range(3):
-                        time.sleep(0.5)
-                        try:
-                            verify_response = requests.get(f'http://localhost:{self.server_port}/health', timeout=2)
-                            if verify_response.status_code != 200:
-                                stable = False
-                                break
-                        except:
-                            stable = False
-                            break
-                    
-                    if stable:
-                        print("Server is stable and ready!")
-                        return True
-                    else:
-                        print("Server stability check failed, continuing to wait...")
-                        consecutive_failures += 1
-                else:
-                    print(f"Health check failed with status code: {response.status_code}")
-                    consecutive_failures += 1
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"Health check attempt failed: {e}")
-                consecutive_failures += 1
+            if self.server_ready.is_set() or self.is_port_open():
+                attempts += 1
+                print(f"Health check attempt {attempts} (elapsed: {time.monotonic() - start_time:.2f}s)")
                 
-            # If we have too many consecutive failures, something might be wrong
-            if consecutive_failures >= max_consecutive_failures:
-                print(f"Too many consecutive failures ({consecutive_failures}), resetting counter")
-                consecutive_failures = 0
-                # Give a longer pause
-                time.sleep(2)
+                # Probes go to the shared monitor, cloud sync trusts the result without checking again
+                if server_health.probe(timeout=4):
+                    print(f"Server is ready after {time.monotonic() - start_time:.2f}s")
+                    return True
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Server health check timed out after {timeout} seconds")
+                return False
+            
+            if self.server_ready.is_set():
+                time.sleep(min(delay, remaining))
             else:
-                # Standard retry delay
-                time.sleep(1.5)
-        
-        print(f"Server health check timed out after {timeout} seconds")
-        return False
+                self.server_ready.wait(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
 
     def is_server_responsive(self):
-        """Check if server is currently responsive"""
-        try:
-            response = requests.get(f'http://localhost:{self.server_port}/health', timeout=2)
-            return response.status_code == 200
-        except:
-            return False
+        """Check if server is currently responsive, a recent answer counts without probing"""
+        return server_health.is_healthy() or server_health.probe(timeout=2)
             
     def stop_server(self):
         """Enhanced server stop with better process cleanup"""
-        if self.server_process:
+        if self.local_server:
+            print("Stopping local server...")
+            server_health.mark_down()
+            self.local_server.stop()
+            self.local_server = None
+            print("Server stopped successfully")
+        elif self.server_process:
             print(f"Stopping server process (PID: {self.server_process.pid})")
+            
+            # Cloud sync fails fast from now on instead of waiting for a stopped server
+            server_health.mark_down()
             try:
                 # First, try graceful shutdown
                 parent = psutil.Process(self.server_process.pid)
@@ -0,0 +1,49 @@
+from storage.shop_data import shop_assets
+
+class AssetCatalog:
+    """
+    Indexed view of the shop assets, built once.
+    Offers lookups by id and groupings by asset type.
+    """
+    ASSET_TYPES = ('floor', 'wall', 'floor item', 'surface item', 'wall item', 'non top floor item')
+
+    def __init__(self, assets):
+        self.assets = list(assets)
+
+        self.assets_by_id = {}
+        self.asset_indexes = {}
+        self.assets_by_type = {asset_type: [] for asset_type in self.ASSET_TYPES}
+
+        for index, asset in enumerate(self.assets):
+            self.assets_by_id[asset['id']] = asset
+            self.asset_indexes[asset['id']] = index
+            self.assets_by_type.setdefault(asset['type'], []).append(asset)
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __iter__(self):
+        return iter(self.assets)
+
+    def __contains__(self, asset_id):
+        return asset_id in self.assets_by_id
+
+    def get(self, asset_id, default=None):
+        """Returns the asset with the given id"""
+        return self.assets_by_id.get(asset_id, default)
+
+    def get_type(self, asset_id):
+        """Returns the type of the asset with the given id"""
+        asset = self.assets_by_id.get(asset_id)
+        return asset['type'] if asset else None
+
+    def get_index(self, asset_id):
+        """Returns the position of the asset in the catalog"""
+        return self.asset_indexes.get(asset_id)
+
+    def of_type(self, asset_type):
+        """Returns all assets of the given type in catalog order"""
+        return self.assets_by_type.get(asset_type, [])
+
+# Global instance
+asset_catalog = AssetCatalog(shop_assets)
@@ -2,18 +2,25 @@ import requests
 import json
 import os
 import sys
-import time
+import threading
 import traceback
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
-# Import existing storage modules
-from storage.inventory_abl import load_inventory, save_inventory
-from storage.selection_abl import load_selected_assets, save_selected_assets
-from storage.tile_abl import load_tiles, save_tiles
+# Local data goes through the shared game state
+from domain.state.game_state_store import game_state_store
+from storage.http_transport import HttpTransport
+from storage.persistence import write_atomic
+from storage.server_health import server_health
+from storage.storage_backend import storage_backend
+from storage.sync_outbox import SyncOutbox
+from storage.sync_delta import content_hash, diff_game_data, normalize
 
-# API Configuration
-API_BASE_URL = "http://localhost:8000"
+# API Configuration, set by ROOM_DESIGNER_API_URL
+API_BASE_URL = server_health.base_url
+
+# Result message when downloaded cloud data was not applied
+KEPT_LOCAL_MESSAGE = "Kept local changes, cloud data was not applied"
 
 def get_storage_path():
     """Get the correct storage path for both script and executable modes"""
@@ -38,6 +45,9 @@ def get_storage_path():
 def get_sync_file():
     return os.path.join(get_storage_path(), "last_sync.json")
 
+def get_outbox_file():
+    return os.path.join(get_storage_path(), "sync_outbox.json")
+
 def get_user_file():
     return os.path.join(get_storage_path(), "user_session.json")
 
@@ -53,33 +63,32 @@ def get_selection_file():
 def get_tile_file():
     return os.path.join(get_storage_path(), "tile_data.json")
 
-def wait_for_server_ready(timeout=30, check_interval=1):
-    """Wait for server to be fully ready with proper retry logic"""
-    print(f"Waiting for server to be ready (timeout: {timeout}s)...")
-    start_time = time.time()
-    attempts = 0
-    
-    while time.time() - start_time < timeout:
-        attempts += 1
-        try:
-            print(f"Server readiness check attempt {attempts}...")
-            response = requests.get(f"{API_BASE_URL}/health", timeout=3)
-            if response.status_code == 200:
-                print("Server is ready!")
-                return True
-        except requests.exceptions.RequestException as e:
-            print(f"Server not ready yet: {e}")
-        
-        time.sleep(check_interval)
-    
-    print(f"Server failed to become ready within {timeout} seconds")
-    return False
+def revision_etag(revision):
+    """ETag of a cloud document, the server tags it with its revision"""
+    return f'"{revision}"'
+
+# Shared pooled connection to the game server, its results keep the health state current
+transport = HttpTransport(API_BASE_URL, health_monitor=server_health)
 
 class CloudSyncManager:
     def __init__(self):
         self.api_base = API_BASE_URL
+        self.transport = transport
+        self.health = server_health
         self.user_id = None
         self.username = None
+
+        # Send only the changes since the last acknowledged revision when possible
+        self.delta_sync = True
+
+        # Uploads the server has not confirmed yet, kept across restarts
+        self.outbox = SyncOutbox(get_outbox_file())
+
+        # The worker and the game thread both record syncs, write_atomic shares one temp file
+        self.sync_state_lock = threading.Lock()
+
+        # Set by a login that kept the local data, the game syncs it in the background
+        self.reconcile_pending = False
         print("Initializing CloudSyncManager...")
         self.load_user_session()
 
@@ -176,44 +185,33 @@ class CloudSyncManager:
         }
 
         default_tile_file = []
-        
-        files_to_clear = [
-            get_stats_file(),
-            get_inventory_file(),
-            get_selection_file(),
-            get_tile_file()
-        ]
-
-        default_files = [
-            default_stats_file,
-            default_inventory_file,
-            default_selection_file,
-            default_tile_file
-        ]
-        
-        # Clear all local data files
-        for current, default in zip(files_to_clear, default_files):
-            if os.path.exists(current):
-                try:
-                    with open(current, "w") as f:
-                        json.dump(default, f, indent=4)
-                    print(f"Cleared file: {current}")
-                except Exception as e:
-                    print(f"Error clearing file {current}: {e}")
+
+        # Reset every part of the local data in the selected storage backend
+        try:
+            game_state_store.replace({
+                "inventory": default_inventory_file,
+                "selection": default_selection_file,
+                "stats": default_stats_file,
+                "tiles": default_tile_file
+            })
+            storage_backend.flush()
+            print(f"Cleared local data ({storage_backend.name})")
+        except Exception as e:
+            print(f"Error clearing local data: {e}")
 
     def register_user(self, username: str, email: str, password: str) -> Tuple[bool, str]:
         """Register new user"""
         try:
             print(f"Registering user: {username}")
-            # Wait for server to be ready before attempting registration
-            if not wait_for_server_ready(timeout=15):
+            # Fails fast when the server is known to be down, the request itself is the health check
+            if not self.health.is_available():
                 return False, "Server is not responding"
                 
-            response = requests.post(f"{self.api_base}/auth/register", json={
+            response = self.transport.post("/auth/register", json={
                 "username": username,
                 "email": email,
                 "password": password
-            }, timeout=15)
+            })
             
             if response.status_code == 201:
                 data = response.json()
@@ -239,21 +237,37 @@ class CloudSyncManager:
         """Login user and load their data"""
         try:
             print(f"Logging in user: {username}")
-            # Wait for server to be ready before attempting login
-            if not wait_for_server_ready(timeout=15):
+            if not self.health.is_available():
                 return False, "Server is not responding"
                 
-            response = requests.post(f"{self.api_base}/auth/login", json={
+            response = self.transport.post("/auth/login", json={
                 "username": username,
                 "password": password
-            }, timeout=15)
+            })
             
             if response.status_code == 200:
                 data = response.json()
                 user_id = data["data"]["userId"]
                 username = data["data"]["username"]
+
+                # Local data synced by this user before can be played right away
+                local_is_users = self.load_sync_state().get("user_id") == user_id
                 self.save_user_session(user_id, username)
                 print("Login successful")
+
+                if local_is_users:
+                    print("Local data belongs to this user, syncing in the background")
+                    self.reconcile_pending = True
+                    return True, "Login successful!"
+
+                # Changes left from an earlier session go up before the cloud copy comes down,
+                # while they are unsent the local data is the newest copy
+                success, msg = self.send_outbox()
+                if not success:
+                    # The local data is not this player's, their newest unsent copy is
+                    print(f"Saved changes not sent yet: {msg}")
+                    self.save_local_game_data(self.outbox.get_pending(user_id)[-1]["game_data"])
+                    return True, "Login successful! Local changes will be synced later."
                 
                 # Immediately download user's data from MongoDB
                 print("Downloading user data...")
@@ -280,12 +294,12 @@ class CloudSyncManager:
         """Request password reset code via email"""
         try:
             print(f"Requesting password reset for: {email}")
-            if not wait_for_server_ready(timeout=15):
+            if not self.health.is_available():
                 return False, "Server is not responding"
                 
-            response = requests.post(f"{self.api_base}/auth/forgot-password", json={
+            response = self.transport.post("/auth/forgot-password", json={
                 "email": email
-            }, timeout=15)
+            })
             
             if response.status_code == 200:
                 print("Password reset request successful")
@@ -307,14 +321,14 @@ class CloudSyncManager:
         """Reset password using the code from email"""
         try:
             print(f"Resetting password for: {email}")
-            if not wait_for_server_ready(timeout=15):
+            if not self.health.is_available():
                 return False, "Server is not responding"
                 
-            response = requests.post(f"{self.api_base}/auth/reset-password", json={
+            response = self.transport.post("/auth/reset-password", json={
                 "email": email,
                 "resetCode": reset_code,
                 "newPassword": new_password
-            }, timeout=15)
+            })
             
             if response.status_code == 200:
                 print("Password reset successful")
@@ -341,38 +355,11 @@ class CloudSyncManager:
     def get_local_game_data(self) -> Dict:
         """Collect all local game data"""
         print("Collecting local game data...")
-        
-        # Load stats
-        stats = {"total_balance": 0, "snake_hi_score": 0, "fruit_hi_score": 0, "bullet_hi_score": 0}
-        stats_file = get_stats_file()
-        try:
-            if os.path.exists(stats_file):
-                print(f"Loading stats from: {stats_file}")
-                with open(stats_file, "r") as f:
-                    stats = json.load(f)
-                print(f"Loaded stats: {stats}")
-            else:
-                print(f"Stats file not found: {stats_file}")
-        except Exception as e:
-            print(f"Error loading stats: {e}")
 
-        # Get current data
-        print("Loading inventory...")
-        inventory = load_inventory()
-        
-        print("Loading selected assets...")
-        selection = load_selected_assets()
-        
-        print("Loading tiles...")
-        tiles = load_tiles()
-        
-        game_data = {
-            "inventory": inventory,
-            "selection": selection,
-            "stats": stats,
-            "tiles": tiles
-        }
-        
+        # Read from storage only once per session
+        game_data = game_state_store.export()
+
+        print(f"Loaded stats: {game_data['stats']}")
         print(f"Local game data collected: {list(game_data.keys())}")
         return game_data
 
@@ -381,30 +368,9 @@ class CloudSyncManager:
         print("Saving local game data...")
         
         try:
-            # Save inventory
-            if "inventory" in game_data:
-                print("Saving inventory...")
-                save_inventory(game_data["inventory"])
-            
-            # Save selection
-            if "selection" in game_data:
-                print("Saving selection...")
-                selection = game_data["selection"]
-                floor_selection = selection.get("floor")
-                wall_selection = selection.get("wall")
-                save_selected_assets(floor_selection, wall_selection)
-            
-            # Save stats
-            if "stats" in game_data:
-                print("Saving stats...")
-                stats_file = get_stats_file()
-                with open(stats_file, "w") as f:
-                    json.dump(game_data["stats"], f, indent=4)
-            
-            # Save tiles
-            if "tiles" in game_data:
-                print("Saving tiles...")
-                save_tiles(game_data["tiles"])
+            # Replaces the parts present in the downloaded data
+            print(f"Saving {', '.join(key for key in game_data if key in ('inventory', 'selection', 'stats', 'tiles'))}...")
+            game_state_store.replace(game_data)
                 
             print("Local game data saved successfully")
             
@@ -412,8 +378,8 @@ class CloudSyncManager:
             print(f"Error saving local game data: {e}")
             traceback.print_exc()
 
-    def upload_game_data(self) -> Tuple[bool, str]:
-        """Upload local game data to cloud with improved reliability"""
+    def upload_game_data(self, game_data: Optional[Dict] = None) -> Tuple[bool, str]:
+        """Upload local game data to cloud, or a snapshot of it taken by the caller"""
         print("Starting upload_game_data...")
         
         if not self.is_logged_in():
@@ -421,110 +387,63 @@ class CloudSyncManager:
             return False, "Not logged in"
 
         try:
-            # Enhanced server readiness check with longer timeout and retries
-            print("Ensuring server is ready for upload...")
-            if not wait_for_server_ready(timeout=20, check_interval=0.5):
-                print("Server is not ready for upload")
+            if not self.health.is_available():
+                print("Server is not available for upload")
                 return False, "Server is not responding"
             
-            print("Gathering local game data...")
-            game_data = self.get_local_game_data()
+            if game_data is None:
+                print("Gathering local game data...")
+                game_data = self.get_local_game_data()
+
+            if self.is_synced(game_data):
+                print("No changes since the last sync, skipping upload")
+                return True, "Cloud data is already up to date!"
+
+            # Small uploads first, the full document only when the server can't take a delta
+            delta_result = self.upload_delta(game_data)
+            if delta_result is not None:
+                return delta_result
             
             print(f"Making POST request to: {self.api_base}/gamedata/save/{self.user_id}")
-            
-            # Multiple upload attempts with exponential backoff
-            max_attempts = 3
-            base_delay = 1
-            
-            for attempt in range(max_attempts):
-                try:
-                    print(f"Upload attempt {attempt + 1}/{max_attempts}")
-                    
-                    # Additional health check before each attempt
-                    health_response = requests.get(f"{self.api_base}/health", timeout=5)
-                    if health_response.status_code != 200:
-                        print(f"Health check failed on attempt {attempt + 1}")
-                        if attempt < max_attempts - 1:
-                            delay = base_delay * (2 ** attempt)
-                            print(f"Waiting {delay}s before retry...")
-                            time.sleep(delay)
-                            continue
-                        else:
-                            return False, "Server health check failed"
-                    
-                    response = requests.post(
-                        f"{self.api_base}/gamedata/save/{self.user_id}",
-                        json=game_data,
-                        timeout=90  # Increased timeout for slower environments
-                    )
-                    
-                    print(f"Response status code: {response.status_code}")
-                    
-                    if response.status_code == 200:
-                        print("Upload successful, updating sync time...")
-                        self.update_last_sync_time()
-                        return True, "Game data uploaded successfully!"
-                    else:
-                        error_msg = f"Upload failed with status code: {response.status_code}"
-                        try:
-                            error_data = response.json()
-                            error_msg += f", message: {error_data.get('message', 'Unknown error')}"
-                        except:
-                            error_msg += f", response: {response.text}"
-                        print(error_msg)
-                        
-                        # Don't retry on client errors (4xx)
-                        if 400 <= response.status_code < 500:
-                            return False, error_msg
-                        
-                        # Retry on server errors (5xx) or other issues
-                        if attempt < max_attempts - 1:
-                            delay = base_delay * (2 ** attempt)
-                            print(f"Server error, waiting {delay}s before retry...")
-                            time.sleep(delay)
-                            continue
-                        else:
-                            return False, error_msg
-                            
-                except requests.ConnectionError as e:
-                    print(f"Connection error on attempt {attempt + 1}: {e}")
-                    if attempt < max_attempts - 1:
-                        delay = base_delay * (2 ** attempt)
-                        print(f"Connection failed, waiting {delay}s before retry...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        return False, "Could not connect to server - server may have stopped"
-                        
-                except requests.Timeout as e:
-                    print(f"Timeout on attempt {attempt + 1}: {e}")
-                    if attempt < max_attempts - 1:
-                        delay = base_delay * (2 ** attempt)
-                        print(f"Request timed out, waiting {delay}s before retry...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        return False, "Upload timed out - check your connection"
-                        
-                except requests.RequestException as e:
-                    print(f"Request error on attempt {attempt + 1}: {e}")
-                    if attempt < max_attempts - 1:
-                        delay = base_delay * (2 ** attempt)
-                        print(f"Request failed, waiting {delay}s before retry...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        return False, f"Network error: {str(e)}"
-            
-            return False, "All upload attempts failed"
+
+            # Saving replaces the whole document, so repeating it is safe
+            try:
+                response = self.transport.post(f"/gamedata/save/{self.user_id}", json=game_data, retry=True)
+            except requests.ConnectionError:
+                return False, "Could not connect to server - server may have stopped"
+            except requests.Timeout:
+                return False, "Upload timed out - check your connection"
+            except requests.RequestException as e:
+                return False, f"Network error: {str(e)}"
+
+            print(f"Response status code: {response.status_code}")
+
+            if response.status_code == 200:
+                print("Upload successful, updating sync time...")
+                self.update_last_sync_time(game_data, response.json().get("data", {}).get("revision"))
+                return True, "Game data uploaded successfully!"
+
+            error_msg = f"Upload failed with status code: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f", message: {error_data.get('message', 'Unknown error')}"
+            except:
+                error_msg += f", response: {response.text}"
+            print(error_msg)
+            return False, error_msg
                 
         except Exception as e:
             print(f"Upload error: {e}")
             traceback.print_exc()
             return False, f"Upload error: {str(e)}"
 
-    def download_game_data(self) -> Tuple[bool, str]:
-        """Download game data from cloud"""
+    def download_game_data(self, game_data: Optional[Dict] = None,
+                           apply: Optional[Callable[[Dict], None]] = None) -> Tuple[bool, str]:
+        """
+        Download game data from cloud, unless the local data is the last synced revision and still current.
+        Downloaded data goes to apply when given instead of being saved right away,
+        apply returning False means it was not applied.
+        """
         print("Starting download_game_data...")
         
         if not self.is_logged_in():
@@ -532,16 +451,29 @@ class CloudSyncManager:
             return False, "Not logged in"
 
         try:
+            if game_data is None:
+                game_data = self.get_local_game_data()
+
+            # Unchanged local data is the cloud copy of its revision, the server answers 304 while it is current
+            headers = {}
+            sync_state = self.load_sync_state()
+            if self.is_synced(game_data, sync_state) and sync_state.get("revision") is not None:
+                headers["If-None-Match"] = revision_etag(sync_state["revision"])
+
             print(f"Making GET request to: {self.api_base}/gamedata/load/{self.user_id}")
-            response = requests.get(f"{self.api_base}/gamedata/load/{self.user_id}", timeout=15)
+            response = self.transport.get(f"/gamedata/load/{self.user_id}", retry=True, headers=headers)
             
             print(f"Response status code: {response.status_code}")
+
+            if response.status_code == 304:
+                print("Cloud data not modified, keeping local data")
+                return True, "Game data is up to date!"
             
             if response.status_code == 200:
                 cloud_data = response.json()["data"]
                 print("Download successful, saving local data...")
-                self.save_local_game_data(cloud_data)
-                self.update_last_sync_time()
+                if (apply or self.apply_cloud_data)(cloud_data) is False:
+                    return True, KEPT_LOCAL_MESSAGE
                 return True, "Game data downloaded successfully!"
             else:
                 error_msg = f"Download failed with status code: {response.status_code}"
@@ -564,8 +496,12 @@ class CloudSyncManager:
             traceback.print_exc()
             return False, f"Download error: {str(e)}"
 
-    def sync_game_data(self) -> Tuple[bool, str]:
-        """Smart sync - compares local vs cloud timestamps"""
+    def sync_game_data(self, game_data: Optional[Dict] = None,
+                       apply: Optional[Callable[[Dict], None]] = None) -> Tuple[bool, str]:
+        """
+        Smart sync - compares local vs cloud timestamps.
+        Works on a snapshot of the local data when given, newer cloud data goes to apply when given.
+        """
         print("Starting sync_game_data...")
         
         if not self.is_logged_in():
@@ -573,23 +509,37 @@ class CloudSyncManager:
             return False, "Not logged in"
 
         try:
-            # Wait for server readiness
-            if not wait_for_server_ready(timeout=15):
+            if not self.health.is_available():
                 return False, "Server is not responding"
                 
-            print("Gathering data for sync...")
-            game_data = self.get_local_game_data()
+            success, message = self.send_outbox()
+            if not success:
+                return False, message
+
+            if game_data is None:
+                print("Gathering data for sync...")
+                game_data = self.get_local_game_data()
+
+            # Nothing to send, only ask whether the cloud copy changed
+            if self.is_synced(game_data):
+                print("No local changes since the last sync")
+                return self.download_game_data(game_data, apply)
+
+            # Nothing newer in the cloud when the revision still matches
+            delta_result = self.upload_delta(game_data)
+            if delta_result is not None:
+                return delta_result
+
             last_sync = self.get_last_sync_time()
             print(f"Last sync time: {last_sync}")
             
             print(f"Making PATCH request to: {self.api_base}/gamedata/sync/{self.user_id}")
-            response = requests.patch(
-                f"{self.api_base}/gamedata/sync/{self.user_id}",
+            response = self.transport.patch(
+                f"/gamedata/sync/{self.user_id}",
                 json={
                     "gameData": game_data,
                     "lastSyncTime": last_sync
-                },
-                timeout=20
+                }
             )
             
             print(f"Response status code: {response.status_code}")
@@ -603,13 +553,13 @@ class CloudSyncManager:
                     # Cloud data is newer, save it locally
                     cloud_data = result["data"]
                     print("Saving newer cloud data locally...")
-                    self.save_local_game_data(cloud_data)
-                    self.update_last_sync_time()
+                    if (apply or self.apply_cloud_data)(cloud_data) is False:
+                        return True, KEPT_LOCAL_MESSAGE
                     return True, "Downloaded newer data from cloud!"
                 else:
                     # Local data was uploaded
                     print("Local data was uploaded to cloud")
-                    self.update_last_sync_time()
+                    self.update_last_sync_time(game_data, (result.get("data") or {}).get("revision"))
                     return True, "Uploaded local data to cloud!"
             else:
                 error_msg = f"Sync failed with status code: {response.status_code}"
@@ -632,37 +582,149 @@ class CloudSyncManager:
             traceback.print_exc()
             return False, f"Sync error: {str(e)}"
 
-    def get_last_sync_time(self) -> Optional[str]:
-        """Get last sync timestamp"""
+    def reconcile(self, game_data: Dict) -> Tuple[bool, str, Optional[Dict]]:
+        """
+        Syncs a snapshot of a running game without touching the local data.
+        Returns newer cloud data as well, to be passed to apply_cloud_data on the main thread,
+        the message then tells what was received, not whether it was applied.
+        """
+        received = []
+        success, message = self.sync_game_data(game_data, apply=received.append)
+        return success, message, received[-1] if received else None
+
+    def apply_cloud_data(self, cloud_data: Dict, base_hash: Optional[str] = None) -> bool:
+        """
+        Replaces the local data with cloud data, unless its revision is not newer than the synced one.
+        With base_hash, also unless the local data changed since the snapshot with that content hash.
+        """
+        if base_hash is not None and content_hash(self.get_local_game_data()) != base_hash:
+            print("Local data changed while syncing, keeping the local changes")
+            return False
+
+        sync_state = self.load_sync_state()
+        synced_revision = sync_state.get("revision") if sync_state.get("user_id") == self.user_id else None
+        revision = cloud_data.get("revision")
+
+        if revision is not None and synced_revision is not None and revision <= synced_revision:
+            print(f"Cloud revision {revision} is not newer than synced revision {synced_revision}, keeping local data")
+            return False
+
+        self.save_local_game_data(cloud_data)
+        self.update_last_sync_time(self.get_local_game_data(), revision)
+        return True
+
+    def upload_delta(self, game_data: Dict) -> Optional[Tuple[bool, str]]:
+        """
+        Sends only the changes made since the last acknowledged revision.
+        Returns None when a full sync is needed instead.
+        """
+        if not self.delta_sync:
+            return None
+
+        sync_state = self.load_sync_state()
+        if sync_state.get("user_id") != self.user_id or sync_state.get("revision") is None or "base" not in sync_state:
+            print("No acknowledged revision, full sync required")
+            return None
+
+        changes = diff_game_data(sync_state["base"], game_data)
+        print(f"Sending delta on top of revision {sync_state['revision']}: {list(changes.keys()) or 'no changes'}")
+
+        try:
+            response = self.transport.patch(
+                f"/gamedata/delta/{self.user_id}",
+                json={
+                    "baseRevision": sync_state["revision"],
+                    "changes": changes
+                }
+            )
+        except requests.RequestException as e:
+            print(f"Delta sync failed: {e}")
+            return None
+
+        if response.status_code == 200:
+            self.update_last_sync_time(game_data, response.json().get("revision"))
+            return True, "Synced local changes to cloud!"
+
+        if response.status_code == 409:
+            print("Cloud data changed since the last sync, falling back to full sync")
+        else:
+            print(f"Delta sync failed with status code: {response.status_code}, falling back to full sync")
+        return None
+
+    def send_outbox(self) -> Tuple[bool, str]:
+        """Uploads the saved changes of the current user in order, each is removed once confirmed"""
+        if not self.is_logged_in():
+            return False, "Not logged in"
+
+        pending = self.outbox.get_pending(self.user_id)
+        if not pending:
+            return True, "No saved changes to send"
+
+        print(f"Sending {len(pending)} saved change(s) from the outbox...")
+        for entry in pending:
+            success, message = self.upload_game_data(entry["game_data"])
+            if not success:
+                return False, message
+            self.outbox.remove(entry["id"])
+
+        return True, message
+
+    def is_synced(self, game_data: Dict, sync_state: Optional[Dict] = None) -> bool:
+        """True when the data equals what was last synced for the current user"""
+        if sync_state is None:
+            sync_state = self.load_sync_state()
+
+        if sync_state.get("user_id") != self.user_id or "hash" not in sync_state:
+            return False
+        return content_hash(game_data) == sync_state["hash"]
+
+    def load_sync_state(self) -> Dict:
+        """Returns the content of the sync file, empty when there is none"""
         try:
             sync_file = get_sync_file()
             if os.path.exists(sync_file):
-                print(f"Loading sync time from: {sync_file}")
                 with open(sync_file, "r") as f:
-                    data = json.load(f)
-                    return data.get("last_sync")
-            else:
-                print(f"Sync file not found: {sync_file}")
+                    return json.load(f)
         except Exception as e:
-            print(f"Error loading sync time: {e}")
-        return None
+            print(f"Error loading sync state: {e}")
+        return {}
 
-    def update_last_sync_time(self):
-        """Update last sync timestamp"""
+    def get_last_sync_time(self) -> Optional[str]:
+        """Get last sync timestamp"""
+        return self.load_sync_state().get("last_sync")
+
+    def update_last_sync_time(self, game_data: Optional[Dict] = None, revision: Optional[int] = None):
+        """
+        Update last sync timestamp.
+        With the synced data and its revision, later syncs can send only the changes
+        and skip the request when nothing changed.
+        """
         try:
             sync_data = {
                 "last_sync": datetime.now().isoformat(),
                 "user_id": self.user_id
             }
-            sync_file = get_sync_file()
-            print(f"Updating sync time in: {sync_file}")
-            with open(sync_file, "w") as f:
-                json.dump(sync_data, f, indent=4)
+
+            if game_data is not None:
+                sync_data["hash"] = content_hash(game_data)
+
+            if game_data is not None and revision is not None:
+                sync_data["revision"] = revision
+                sync_data["base"] = normalize(game_data)
+
+            self.save_sync_state(sync_data)
             print("Sync time updated successfully")
         except Exception as e:
             print(f"Error updating sync time: {e}")
             traceback.print_exc()
 
+    def save_sync_state(self, sync_data: Dict):
+        """Replaces the content of the sync file"""
+        sync_file = get_sync_file()
+        print(f"Updating sync time in: {sync_file}")
+        with self.sync_state_lock:
+            write_atomic(sync_file, json.dumps(sync_data, indent=4))
+
 # Global instance
 cloud_sync = CloudSyncManager()
 
@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from storage.server_health import ServerHealthMonitor, ServerUnavailable
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+    Connection errors, timeouts and 5xx responses are retried, 4xx responses are not.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 8.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_delay(self, attempt: int) -> float:
+        """Random wait before the next attempt, attempt counts from 0"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def should_retry_response(self, response: requests.Response) -> bool:
+        return response.status_code >= 500
+
+    def should_retry_error(self, error: requests.RequestException) -> bool:
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+class HttpTransport:
+    """
+    Shared HTTP client for the game server.
+
+    Keeps connections alive in a pooled requests.Session, picks the timeout by endpoint,
+    retries with one policy and records the time spent per endpoint.
+    """
+    # Path prefix -> seconds, the longest matching prefix wins
+    DEFAULT_TIMEOUTS = {
+        "/health": 3,
+        "/auth": 15,
+        "/gamedata/save": 90,
+        "/gamedata/load": 15,
+        "/gamedata/sync": 20,
+        "/gamedata/delta": 20
+    }
+
+    def __init__(self, base_url: str, timeouts: Optional[Dict[str, float]] = None,
+                 retry_policy: Optional[RetryPolicy] = None, default_timeout: float = 15, pool_size: int = 4,
+                 health_monitor: Optional[ServerHealthMonitor] = None):
+        """
+        Parameters:
+        -----------
+        base_url : str
+            server address without a trailing slash
+        timeouts : dict
+            path prefix -> timeout in seconds, merged over DEFAULT_TIMEOUTS
+        retry_policy : RetryPolicy
+            used by requests made with retry=True
+        default_timeout : float
+            timeout of paths without a matching prefix
+        pool_size : int
+            kept-alive connections
+        health_monitor : ServerHealthMonitor
+            fed with every result, its open circuit stops requests before they are sent
+        """
+        self.base_url = base_url
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.default_timeout = default_timeout
+        self.health_monitor = health_monitor
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Endpoint -> request count, failures and timings
+        self.metrics = {}
+        self.metrics_lock = threading.Lock()
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, **kwargs)
+
+    def request(self, method: str, path: str, retry: bool = False, timeout: Optional[float] = None,
+                **kwargs) -> requests.Response:
+        """
+        Sends a request to the server
+
+        Parameters:
+        -----------
+        method : str
+            HTTP method
+        path : str
+            endpoint path starting with a slash
+        retry : bool
+            retry by the policy, only for requests that are safe to repeat
+        timeout : float
+            overrides the endpoint timeout
+
+        Returns the last response, raises the last error when no response arrived
+        and ServerUnavailable while the server is known to be down.
+        """
+        if timeout is None:
+            timeout = self.get_timeout(path)
+
+        endpoint = self.get_endpoint(method, path)
+        attempts = self.retry_policy.max_attempts if retry else 1
+
+        for attempt in range(attempts):
+            if self.health_monitor and not self.health_monitor.allow_request():
+                raise ServerUnavailable(f"{endpoint} not sent, server is unavailable")
+
+            start_time = time.perf_counter()
+
+            try:
+                response = self.session.request(method, self.base_url + path, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self.record(endpoint, time.perf_counter() - start_time, failed=True)
+                if self.health_monitor and self.retry_policy.should_retry_error(e):
+                    self.health_monitor.record_failure()
+
+                if attempt + 1 >= attempts or not self.retry_policy.should_retry_error(e):
+                    raise
+                print(f"{endpoint} failed on attempt {attempt + 1}/{attempts}: {e}")
+            else:
+                failed = response.status_code >= 500
+                self.record(endpoint, time.perf_counter() - start_time, failed=failed)
+
+                # Any answer means the server is up, 503 means it can't serve yet
+                if self.health_monitor:
+                    if response.status_code == 503:
+                        self.health_monitor.record_failure()
+                    else:
+                        self.health_monitor.record_success()
+
+                if attempt + 1 >= attempts or not self.retry_policy.should_retry_response(response):
+                    return response
+                print(f"{endpoint} returned {response.status_code} on attempt {attempt + 1}/{attempts}")
+
+            delay = self.retry_policy.get_delay(attempt)
+            print(f"Retrying {endpoint} in {delay:.2f}s...")
+            time.sleep(delay)
+
+    def get_timeout(self, path: str) -> float:
+        matches = [prefix for prefix in self.timeouts if path.startswith(prefix)]
+        if not matches:
+            return self.default_timeout
+        return self.timeouts[max(matches, key=len)]
+
+    @staticmethod
+    def get_endpoint(method: str, path: str) -> str:
+        """Groups paths by their first two segments, user ids don't split the metrics"""
+        return f"{method} /" + "/".join(path.strip("/").split("/")[:2])
+
+    def record(self, endpoint: str, duration: float, failed: bool = False):
+        with self.metrics_lock:
+            metric = self.metrics.setdefault(endpoint, {
+                "count": 0, "failures": 0, "total_time": 0.0, "max_time": 0.0, "last_time": 0.0
+            })
+            metric["count"] += 1
+            metric["failures"] += int(failed)
+            metric["total_time"] += duration
+            metric["max_time"] = max(metric["max_time"], duration)
+            metric["last_time"] = duration
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Returns a copy of the metrics with the average time per endpoint"""
+        with self.metrics_lock:
+            return {
+                endpoint: dict(metric, average_time=metric["total_time"] / metric["count"])
+                for endpoint, metric in self.metrics.items()
+            }
+
+    def close(self):
+        self.session.close()
@@ -1,23 +1,21 @@
-import json
-import os
+from storage.storage_backend import storage_backend
 
-INVENTORY_FILE = "storage/inventory_data.json"
-
-# Default structure
-default_inventory = {
-    "item": [],
-    "floor": [],
-    "wall": []
-}
-
-# Load inventory from file
+# Load inventory
 def load_inventory():
-    if not os.path.exists(INVENTORY_FILE):
-        return default_inventory
-    with open(INVENTORY_FILE, "r") as f:
-        return json.load(f)
+    return storage_backend.load_inventory()
 
-# Save inventory to file
+# Save inventory
 def save_inventory(inventory):
-    with open(INVENTORY_FILE, "w") as f:
-        json.dump(inventory, f, indent=4)
+    storage_backend.save_inventory(inventory)
+
+# Add delta to the count of an item, adding or removing its entry as needed
+def change_item_count(asset, delta):
+    storage_backend.change_item_count(asset, delta)
+
+# Add a floor or wall entry
+def add_asset(category, asset):
+    storage_backend.add_asset(category, asset)
+
+# Remove a floor or wall entry
+def remove_asset(category, asset_id):
+    storage_backend.remove_asset(category, asset_id)
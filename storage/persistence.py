@@ -0,0 +1,243 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+
+def write_atomic(path, text):
+    """
+    Replaces the file content through a temporary file and a rename,
+    a crash leaves either the old or the new content, never a truncated file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = f"{path}.tmp"
+
+    with open(temp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+
+class PersistenceManager:
+    """
+    Write-behind store for the local JSON documents.
+
+    Documents are kept in memory as serialized text, so loading never touches the disk
+    after the first read. Saves mark a document dirty and a background thread writes it
+    once no further change arrived for a short while. Repeated saves of one document
+    collapse into a single write and saves that match the file content are skipped.
+
+    Append-only files (like the room journal) queue their lines the same way and the
+    background thread appends them on the next write.
+    """
+
+    def __init__(self, delay=0.5, max_delay=2.0):
+        """
+        Parameters:
+        -----------
+        delay : float
+            seconds without changes before dirty documents are written
+        max_delay : float
+            longest time a document stays dirty while it keeps changing
+        """
+        self.delay = delay
+        self.max_delay = max_delay
+
+        # Absolute path -> serialized document, as the game sees it
+        self.texts = {}
+        # Absolute path -> hash of the content on disk, or being written there
+        self.disk_hashes = {}
+        # Absolute path -> serialized document waiting to be written
+        self.pending = {}
+        # Absolute path -> lines waiting to be appended, in order
+        self.appends = {}
+
+        self.condition = threading.Condition()
+        self.first_dirty_time = None
+        self.last_dirty_time = None
+        self.flush_requested = False
+        self.writing = False
+        self.thread = None
+
+    def exists(self, path):
+        """Tells if the document is in memory or on disk"""
+        key = os.path.abspath(path)
+
+        with self.condition:
+            if key in self.texts:
+                return True
+        return os.path.exists(key)
+
+    def load(self, path):
+        """
+        Returns a fresh copy of the document.
+        Raises FileNotFoundError or json.JSONDecodeError like reading the file would.
+        """
+        key = os.path.abspath(path)
+
+        with self.condition:
+            text = self.texts.get(key)
+
+        if text is None:
+            with open(key, "r") as f:
+                text = f.read()
+
+            with self.condition:
+                # A save might have happened while reading
+                text = self.texts.setdefault(key, text)
+                self.disk_hashes.setdefault(key, self._hash(text))
+
+        return json.loads(text)
+
+    def save(self, path, data, indent=None):
+        """Updates the document in memory and schedules the write"""
+        # Serialize on the caller thread, later changes to data can't leak into the file
+        text = json.dumps(data, indent=indent)
+        key = os.path.abspath(path)
+
+        with self.condition:
+            self.texts[key] = text
+
+            if self._hash(text) == self.disk_hashes.get(key):
+                # Back to what is already on disk
+                self.pending.pop(key, None)
+                return
+
+            self.pending[key] = text
+            self._mark_dirty()
+
+    def append(self, path, text):
+        """Queues text to be appended to the file, the file is not kept in memory"""
+        key = os.path.abspath(path)
+
+        with self.condition:
+            self.appends.setdefault(key, []).append(text)
+            self._mark_dirty()
+
+    def discard_appends(self, path):
+        """Drops the queued appends of a file, for when its content gets replaced"""
+        key = os.path.abspath(path)
+
+        with self.condition:
+            # An append being written could land after the replacement otherwise
+            while self.writing:
+                self.condition.wait()
+
+            self.appends.pop(key, None)
+
+    def request_flush(self):
+        """Asks the background thread to write dirty documents right away"""
+        with self.condition:
+            if self.pending or self.appends:
+                self.flush_requested = True
+                self._ensure_thread()
+                self.condition.notify_all()
+
+    def flush(self):
+        """Writes all dirty documents and waits until they are on disk"""
+        with self.condition:
+            pending, appends = self._take_pending()
+
+        self._write_all(pending, appends)
+
+    def forget(self, path=None):
+        """Drops documents from memory so they are read from disk again"""
+        self.flush()
+
+        with self.condition:
+            if path is None:
+                self.texts.clear()
+                self.disk_hashes.clear()
+            else:
+                key = os.path.abspath(path)
+                self.texts.pop(key, None)
+                self.disk_hashes.pop(key, None)
+
+    def _mark_dirty(self):
+        now = time.monotonic()
+        if self.first_dirty_time is None:
+            self.first_dirty_time = now
+        self.last_dirty_time = now
+
+        self._ensure_thread()
+        self.condition.notify_all()
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.appends:
+                    self.condition.wait()
+
+                # Debounce, but never hold a change back longer than max_delay
+                while (self.pending or self.appends) and not self.flush_requested:
+                    now = time.monotonic()
+                    deadline = min(self.last_dirty_time + self.delay, self.first_dirty_time + self.max_delay)
+
+                    if now >= deadline:
+                        break
+                    self.condition.wait(deadline - now)
+
+                pending, appends = self._take_pending()
+
+            self._write_all(pending, appends)
+
+    def _take_pending(self):
+        # Only one writer at a time so an older version can't overwrite a newer one
+        while self.writing:
+            self.condition.wait()
+
+        pending = self.pending
+        self.pending = {}
+        appends = self.appends
+        self.appends = {}
+        self.first_dirty_time = None
+        self.last_dirty_time = None
+        self.flush_requested = False
+
+        for key, text in pending.items():
+            self.disk_hashes[key] = self._hash(text)
+
+        self.writing = True
+        return pending, appends
+
+    def _write_all(self, pending, appends):
+        try:
+            for key, text in pending.items():
+                try:
+                    write_atomic(key, text)
+                except OSError as e:
+                    print(f"Error writing {key}: {e}")
+
+                    # Unknown content on disk, the next save has to write again
+                    with self.condition:
+                        self.disk_hashes.pop(key, None)
+
+            for key, lines in appends.items():
+                try:
+                    with open(key, "a") as f:
+                        f.write("".join(lines))
+                        f.flush()
+                except OSError as e:
+                    print(f"Error appending to {key}: {e}")
+        finally:
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+# Global instance
+persistence = PersistenceManager()
+atexit.register(persistence.flush)
@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from storage.asset_catalog import asset_catalog
+from storage.persistence import write_atomic
+
+class RoomFile:
+    """
+    Binary room storage in two memory-mapped .npy files.
+
+    The map file holds the occupancy volume with one byte per cell. The objects file
+    holds one packed record per cell: placement order, asset index, sprite column and
+    row. The grid position of a record is its index, so placing, picking up or
+    rotating an object writes a single record in place and opening a room maps the
+    files without parsing anything.
+
+    Asset indexes point into the asset id list of the assets file, which only grows,
+    so changes to the shop never move an object to another asset. Room files from
+    before the assets file existed indexed the catalog and are read that way once.
+    """
+    OBJECT_DTYPE = np.dtype([('seq', '<u4'), ('asset', '<u2'), ('col', 'u1'), ('row', 'u1')])
+
+    def __init__(self, map_path, objects_path, assets_path, shape=(12, 12, 5)):
+        """
+        Parameters:
+        -----------
+        map_path : str
+            uint8 occupancy volume
+        objects_path : str
+            placed object records, asset index 0 marks an empty cell
+        assets_path : str
+            JSON list of the asset ids the records point to, index 1 is the first
+        shape : tuple
+            grid size used when the files are created before the game opens the map
+        """
+        self.map_path = map_path
+        self.objects_path = objects_path
+        self.assets_path = assets_path
+        self.shape = tuple(shape)
+
+        self.lock = threading.RLock()
+        self.game_map = None
+        self.objects = None
+        self.next_seq = 1
+
+        # Asset ids of the records and their indexes
+        self.asset_ids = []
+        self.asset_indexes = {}
+
+    def exists(self):
+        return os.path.exists(self.objects_path)
+
+    def open_game_map(self, shape, create_map):
+        """
+        Returns the game map mapped from the room file
+
+        Parameters:
+        -----------
+        shape : tuple
+            grid width, height and depth
+        create_map : function
+            builds an empty map for the shape, used for new files
+        """
+        with self.lock:
+            shape = tuple(shape)
+            template = create_map(*shape)
+
+            self._ensure_objects()
+
+            if self.objects.shape != shape:
+                # The room size changed, keep the objects that still fit
+                tiles = self.load_tiles()
+                self._close()
+                self.shape = shape
+                self._create_objects([tile for tile in tiles if self._fits(tile)])
+
+            if os.path.exists(self.map_path):
+                game_map = np.load(self.map_path, mmap_mode='r+')
+                if game_map.shape != shape or game_map.dtype != np.uint8:
+                    game_map = None
+            else:
+                game_map = None
+
+            if game_map is None:
+                game_map = np.lib.format.open_memmap(self.map_path, mode='w+', dtype=np.uint8, shape=shape)
+                game_map[:] = template
+
+            # Cells without an object go back to their empty state,
+            # the map can be ahead of the objects after a crash
+            stale = self.objects['asset'] == 0
+            game_map[stale] = template[stale]
+
+            self.game_map = game_map
+            return game_map
+
+    def load_tiles(self):
+        """Returns the placed objects in placement order, in the tile_data.json format"""
+        with self.lock:
+            self._ensure_objects()
+
+            positions = np.argwhere(self.objects['asset'] != 0)
+            records = self.objects[tuple(positions.T)]
+            order = np.argsort(records['seq'], kind='stable')
+
+            tiles = []
+            for (x, y, z), record in zip(positions[order].tolist(), records[order]):
+                index = int(record['asset']) - 1
+                if index >= len(self.asset_ids):
+                    print(f"Skipping object with unknown asset index {index + 1} at {x}, {y}, {z}")
+                    continue
+
+                tiles.append({
+                    "grid_x": x,
+                    "grid_y": y,
+                    "grid_z": z,
+                    "col": int(record['col']),
+                    "row": int(record['row']),
+                    "id": self.asset_ids[index]
+                })
+            return tiles
+
+    def save_tiles(self, tiles):
+        """Replaces all placed objects"""
+        with self.lock:
+            self._ensure_objects()
+
+            self.objects[:] = 0
+            self.next_seq = 1
+
+            for tile in tiles:
+                self.place(tile)
+            self.flush()
+
+    def place(self, tile):
+        with self.lock:
+            self._ensure_objects()
+
+            if not self._fits(tile):
+                print(f"Cannot store object {tile['id']} at {tile['grid_x']}, {tile['grid_y']}, {tile['grid_z']}")
+                return
+
+            index = self._get_asset_index(tile['id'])
+            self.objects[tile['grid_x'], tile['grid_y'], tile['grid_z']] = (
+                self.next_seq, index + 1, tile['col'], tile['row']
+            )
+            self.next_seq += 1
+
+    def pickup(self, x, y, z):
+        with self.lock:
+            self._ensure_objects()
+            self.objects[x, y, z] = 0
+
+    def rotate(self, x, y, z, col, row):
+        with self.lock:
+            self._ensure_objects()
+
+            record = self.objects[x, y, z]
+            if record['asset']:
+                record['col'] = col
+                record['row'] = row
+
+    def flush(self):
+        """Writes the mapped pages to disk"""
+        with self.lock:
+            if self.objects is not None:
+                self.objects.flush()
+            if self.game_map is not None:
+                self.game_map.flush()
+
+    def _ensure_objects(self):
+        if self.objects is not None:
+            return
+
+        if self.exists():
+            objects = np.load(self.objects_path, mmap_mode='r+')
+
+            if objects.dtype == self.OBJECT_DTYPE:
+                self._load_asset_ids()
+                self.objects = objects
+                self.shape = objects.shape
+                self.next_seq = int(objects['seq'].max(initial=0)) + 1
+                return
+
+            print(f"Unsupported room file {self.objects_path}, starting an empty room")
+
+        self.asset_ids = []
+        self.asset_indexes = {}
+        self._create_objects([])
+
+    def _load_asset_ids(self):
+        try:
+            with open(self.assets_path, "r") as f:
+                asset_ids = json.load(f)
+        except FileNotFoundError:
+            # Written before the assets file existed, the records index the catalog
+            asset_ids = [asset['id'] for asset in asset_catalog]
+            write_atomic(self.assets_path, json.dumps(asset_ids))
+
+        self.asset_ids = asset_ids
+        self.asset_indexes = {asset_id: index for index, asset_id in enumerate(asset_ids)}
+
+    def _get_asset_index(self, asset_id):
+        index = self.asset_indexes.get(asset_id)
+        if index is None:
+            # On disk before any record points to it
+            index = len(self.asset_ids)
+            self.asset_ids.append(asset_id)
+            self.asset_indexes[asset_id] = index
+            write_atomic(self.assets_path, json.dumps(self.asset_ids))
+        return index
+
+    def _create_objects(self, tiles):
+        directory = os.path.dirname(self.objects_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.objects = np.lib.format.open_memmap(
+            self.objects_path, mode='w+', dtype=self.OBJECT_DTYPE, shape=self.shape
+        )
+        self.next_seq = 1
+
+        for tile in tiles:
+            self.place(tile)
+        self.flush()
+
+    def _close(self):
+        self.flush()
+        self.objects = None
+        self.game_map = None
+
+    def _fits(self, tile):
+        return all(0 <= tile[key] < size for key, size in zip(("grid_x", "grid_y", "grid_z"), self.shape))
@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+
+from storage.persistence import persistence, write_atomic
+
+class RoomJournal:
+    """
+    Journaled store for the placed objects.
+
+    The room is a snapshot (tile_data.json) plus an append-only log of the edits made
+    since the snapshot. Every place, pickup or rotate appends one line, so saving costs
+    the same regardless of the room size. Lines are queued in memory and the persistence
+    thread appends them, the click never waits for the disk. The log is compacted into a new snapshot
+    once it grows long enough and whenever the whole room is saved at once.
+
+    Every edit assigns a whole cell, so replaying the log over a snapshot that
+    already contains some of the edits still gives the same room.
+    """
+
+    def __init__(self, snapshot_path, journal_path, compact_every=500):
+        """
+        Parameters:
+        -----------
+        snapshot_path : str
+            JSON array of placed objects
+        journal_path : str
+            log file with one JSON edit per line
+        compact_every : int
+            number of logged edits that triggers a compaction
+        """
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+
+        self.lock = threading.RLock()
+        self.tiles = None
+        self.journal_length = 0
+
+    def load(self):
+        """
+        Returns a copy of the placed objects.
+        Raises FileNotFoundError or json.JSONDecodeError when there is no valid snapshot.
+        """
+        with self.lock:
+            self._ensure_loaded()
+            return [dict(record) for record in self.tiles.values()]
+
+    def save(self, tiles):
+        """Replaces the whole room and starts a fresh log"""
+        with self.lock:
+            self.tiles = {}
+            for record in tiles:
+                self.tiles[self._position(record)] = dict(record)
+
+            self.compact()
+
+    def place(self, record):
+        self._append({"op": "place", **record})
+
+    def pickup(self, x, y, z):
+        self._append({"op": "pickup", "grid_x": x, "grid_y": y, "grid_z": z})
+
+    def rotate(self, x, y, z, col, row):
+        self._append({"op": "rotate", "grid_x": x, "grid_y": y, "grid_z": z, "col": col, "row": row})
+
+    def compact(self):
+        """Writes the current room as the new snapshot and empties the log"""
+        with self.lock:
+            if self.tiles is None:
+                return
+
+            write_atomic(self.snapshot_path, json.dumps(list(self.tiles.values()), indent=4))
+
+            # The snapshot holds every logged edit now, queued ones included
+            persistence.discard_appends(self.journal_path)
+            write_atomic(self.journal_path, "")
+            self.journal_length = 0
+
+    def close(self):
+        """Compacts pending edits"""
+        with self.lock:
+            if self.journal_length:
+                self.compact()
+
+    def _append(self, operation):
+        with self.lock:
+            self._ensure_loaded(missing_ok=True)
+            self._apply(operation)
+
+            persistence.append(self.journal_path, json.dumps(operation, separators=(",", ":")) + "\n")
+            self.journal_length += 1
+
+            if self.journal_length >= self.compact_every:
+                self.compact()
+
+    def _ensure_loaded(self, missing_ok=False):
+        if self.tiles is not None:
+            return
+
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Editing an empty room creates the snapshot on the next compaction
+            if not missing_ok:
+                raise
+            snapshot = []
+
+        tiles = {}
+        for record in snapshot:
+            tiles[self._position(record)] = record
+        self.tiles = tiles
+
+        # Replay the edits made after the snapshot
+        self.journal_length = 0
+        damaged = False
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        operation = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Half-written last line after a crash
+                        print(f"Skipping damaged journal entry in {self.journal_path}")
+                        damaged = True
+                        continue
+
+                    self._apply(operation)
+                    self.journal_length += 1
+
+        # New edits must not be appended to the damaged line, a fresh snapshot drops it
+        if damaged:
+            self.compact()
+
+    def _apply(self, operation):
+        operation = dict(operation)
+        op = operation.pop("op")
+        position = self._position(operation)
+
+        if op == "place":
+            # Placing moves the object to the end, like appending to the snapshot
+            self.tiles.pop(position, None)
+            self.tiles[position] = operation
+        elif op == "pickup":
+            self.tiles.pop(position, None)
+        elif op == "rotate":
+            record = self.tiles.get(position)
+            if record:
+                record["col"] = operation["col"]
+                record["row"] = operation["row"]
+
+    @staticmethod
+    def _position(record):
+        return (record["grid_x"], record["grid_y"], record["grid_z"])
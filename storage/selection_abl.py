@@ -1,17 +1,10 @@
-import json
-
-SELECTION_FILE = "storage/selection_data.json"
+from storage.storage_backend import storage_backend
 
 def save_selected_assets(selected_floor, selected_wall):
-    with open(SELECTION_FILE, "w") as f:
-        json.dump({
-            "floor": selected_floor,
-            "wall": selected_wall
-        }, f)
+    storage_backend.save_selection({
+        "floor": selected_floor,
+        "wall": selected_wall
+    })
 
 def load_selected_assets():
-    try:
-        with open(SELECTION_FILE, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"floor": None, "wall": None}
\ No newline at end of file
+    return storage_backend.load_selection()
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from typing import Optional
+
+import requests
+
+class ServerUnavailable(requests.ConnectionError):
+    """Raised instead of sending a request while the circuit is open"""
+
+class ServerHealthMonitor:
+    """
+    Last known state of the game server, shared by the launcher and cloud sync.
+
+    Every answered request marks the server healthy and every connection error or
+    timeout counts as a failure, so the state stays current without extra /health
+    round trips. After repeated failures the circuit opens and callers fail at once
+    instead of sleeping; after the reset timeout one request is let through to test
+    the server again (half-open).
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, base_url: str, ttl: float = 30, failure_threshold: int = 3,
+                 reset_timeout: float = 10, probe_timeout: float = 3):
+        """
+        Parameters:
+        -----------
+        base_url : str
+            server address without a trailing slash
+        ttl : float
+            seconds a healthy result is trusted without probing again
+        failure_threshold : int
+            consecutive failures that open the circuit
+        reset_timeout : float
+            seconds the circuit stays open before a test request is allowed
+        probe_timeout : float
+            timeout of a /health request
+        """
+        self.base_url = base_url
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.last_success = None
+        self.opened_at = None
+
+        # Start time of the one test request of the half-open state, None when none is out
+        self.trial_started = None
+
+    def record_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                print("Server is reachable again, closing circuit")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.last_success = time.monotonic()
+            self.trial_started = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.last_success = None
+            self.trial_started = None
+
+            # A failed test request opens the circuit again right away
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                print(f"Server unreachable after {self.failures} failures, opening circuit for {self.reset_timeout}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def mark_down(self):
+        """Opens the circuit at once, e.g. when the server process was stopped"""
+        with self.lock:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.last_success = None
+            self.trial_started = None
+
+    def allow_request(self) -> bool:
+        """
+        False while the circuit is open, requests should not be sent then.
+        Once the reset timeout passed only the first caller gets True and sends the
+        test request, everyone else fails fast until it succeeded or failed.
+        """
+        with self.lock:
+            if not self._available():
+                return False
+
+            if self.state != self.CLOSED:
+                self.state = self.HALF_OPEN
+                self.trial_started = time.monotonic()
+            return True
+
+    def is_available(self) -> bool:
+        """Like allow_request without taking the test request, for checks before sending anything"""
+        with self.lock:
+            return self._available()
+
+    def _available(self):
+        now = time.monotonic()
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and now - self.opened_at < self.reset_timeout:
+            return False
+
+        # A test request that never reported back doesn't block the circuit for good
+        return self.trial_started is None or now - self.trial_started >= self.reset_timeout
+
+    def is_healthy(self) -> bool:
+        """True when the server answered within the TTL"""
+        with self.lock:
+            return self.last_success is not None and time.monotonic() - self.last_success < self.ttl
+
+    def probe(self, timeout: Optional[float] = None) -> bool:
+        """Sends one /health request and records the result"""
+        try:
+            response = requests.get(f"{self.base_url}/health", timeout=timeout or self.probe_timeout)
+        except requests.RequestException as e:
+            print(f"Health check failed: {e}")
+            self.record_failure()
+            return False
+
+        if response.status_code == 200:
+            self.record_success()
+            return True
+
+        print(f"Health check returned status code: {response.status_code}")
+        self.record_failure()
+        return False
+
+# Game server address, ROOM_DESIGNER_API_URL points the game at another server
+API_BASE_URL = os.environ.get("ROOM_DESIGNER_API_URL", "http://localhost:8000").rstrip("/")
+
+# Global instance
+server_health = ServerHealthMonitor(API_BASE_URL)
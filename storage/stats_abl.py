@@ -0,0 +1,9 @@
+from storage.storage_backend import storage_backend, default_stats
+
+# Load stats
+def load_stats():
+    return storage_backend.load_stats()
+
+# Save stats
+def save_stats(stats):
+    storage_backend.save_stats(stats)
@@ -0,0 +1,479 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from storage.persistence import persistence
+from storage.room_file import RoomFile
+from storage.room_journal import RoomJournal
+
+TILES_FILE = "storage/tile_data.json"
+JOURNAL_FILE = "storage/tile_journal.jsonl"
+INVENTORY_FILE = "storage/inventory_data.json"
+STATS_FILE = "storage/stats_data.json"
+SELECTION_FILE = "storage/selection_data.json"
+DATABASE_FILE = "storage/room_designer.db"
+ROOM_MAP_FILE = "storage/room_map.npy"
+ROOM_OBJECTS_FILE = "storage/room_objects.npy"
+ROOM_ASSETS_FILE = "storage/room_assets.json"
+
+# Default structures
+default_inventory = {
+    "item": [],
+    "floor": [],
+    "wall": []
+}
+
+default_stats = {
+    "total_balance": 0,
+    "snake_hi_score": 0,
+    "fruit_hi_score": 0,
+    "bullet_hi_score": 0
+}
+
+default_selection = {"floor": None, "wall": None}
+
+class JsonBackend:
+    """
+    Local data kept in the JSON files under storage/.
+    Documents are cached and written behind by the persistence manager,
+    tiles are a snapshot plus the edit journal.
+    """
+    name = "json"
+
+    def __init__(self):
+        self.room_journal = RoomJournal(TILES_FILE, JOURNAL_FILE)
+
+    def exists(self):
+        return any(os.path.exists(path) for path in (TILES_FILE, INVENTORY_FILE, STATS_FILE, SELECTION_FILE))
+
+    def get_game_map(self, shape, create_map):
+        """Returns the game map, built in memory"""
+        return create_map(*shape)
+
+    # Tiles
+    def load_tiles(self):
+        return self.room_journal.load()
+
+    def save_tiles(self, tiles):
+        self.room_journal.save(tiles)
+
+    def place_tile(self, tile):
+        self.room_journal.place(tile)
+
+    def remove_tile(self, x, y, z):
+        self.room_journal.pickup(x, y, z)
+
+    def rotate_tile(self, x, y, z, col, row):
+        self.room_journal.rotate(x, y, z, col, row)
+
+    # Inventory
+    def load_inventory(self):
+        if not persistence.exists(INVENTORY_FILE):
+            return {category: [] for category in default_inventory}
+        return persistence.load(INVENTORY_FILE)
+
+    def save_inventory(self, inventory):
+        persistence.save(INVENTORY_FILE, inventory, indent=4)
+
+    def change_item_count(self, asset, delta):
+        inventory = self.load_inventory()
+        change_count(inventory['item'], asset, delta)
+        self.save_inventory(inventory)
+
+    def add_asset(self, category, asset):
+        inventory = self.load_inventory()
+        inventory.setdefault(category, []).append(dict(asset))
+        self.save_inventory(inventory)
+
+    def remove_asset(self, category, asset_id):
+        inventory = self.load_inventory()
+        inventory[category] = [entry for entry in inventory.get(category, []) if entry.get('id') != asset_id]
+        self.save_inventory(inventory)
+
+    # Stats
+    def load_stats(self):
+        try:
+            return persistence.load(STATS_FILE)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return dict(default_stats)
+
+    def save_stats(self, stats):
+        persistence.save(STATS_FILE, stats)
+
+    # Selection
+    def load_selection(self):
+        try:
+            return persistence.load(SELECTION_FILE)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return dict(default_selection)
+
+    def save_selection(self, selection):
+        persistence.save(SELECTION_FILE, selection)
+
+    def flush(self):
+        persistence.flush()
+
+    def compact(self):
+        """Folds the tile journal into the snapshot and writes dirty documents"""
+        self.room_journal.close()
+        persistence.flush()
+
+class SqliteBackend:
+    """
+    Local data kept in one SQLite database.
+
+    Tiles are rows keyed by their grid position and inventory entries rows keyed
+    by category and asset id, so single edits update one row instead of rewriting
+    a whole document. Every save runs in its own transaction.
+    """
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tiles (
+            grid_x INTEGER NOT NULL,
+            grid_y INTEGER NOT NULL,
+            grid_z INTEGER NOT NULL,
+            id TEXT NOT NULL,
+            col INTEGER NOT NULL,
+            row INTEGER NOT NULL,
+            UNIQUE (grid_x, grid_y, grid_z)
+        );
+        CREATE TABLE IF NOT EXISTS inventory (
+            category TEXT NOT NULL,
+            id TEXT NOT NULL,
+            count INTEGER,
+            data TEXT NOT NULL,
+            UNIQUE (category, id)
+        );
+        CREATE TABLE IF NOT EXISTS stats (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS selection (
+            slot TEXT PRIMARY KEY,
+            data TEXT
+        );
+    """
+
+    def __init__(self, path=DATABASE_FILE):
+        """
+        Parameters:
+        -----------
+        path : str
+            database file, created with an empty schema when missing
+        """
+        self.path = path
+        self.created = not os.path.exists(path)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Shared with the sync code, the lock keeps one statement sequence at a time
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+    def exists(self):
+        return not self.created
+
+    def get_game_map(self, shape, create_map):
+        """Returns the game map, built in memory"""
+        return create_map(*shape)
+
+    # Tiles, rowid order keeps the placement order of the JSON snapshot
+    def load_tiles(self):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT grid_x, grid_y, grid_z, col, row, id FROM tiles ORDER BY rowid"
+            ).fetchall()
+
+        return [
+            {"grid_x": x, "grid_y": y, "grid_z": z, "col": col, "row": row, "id": obj_id}
+            for x, y, z, col, row, obj_id in rows
+        ]
+
+    def save_tiles(self, tiles):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM tiles")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO tiles (grid_x, grid_y, grid_z, id, col, row) VALUES (?, ?, ?, ?, ?, ?)",
+                [self._tile_row(tile) for tile in tiles]
+            )
+
+    def place_tile(self, tile):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO tiles (grid_x, grid_y, grid_z, id, col, row) VALUES (?, ?, ?, ?, ?, ?)",
+                self._tile_row(tile)
+            )
+
+    def remove_tile(self, x, y, z):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM tiles WHERE grid_x = ? AND grid_y = ? AND grid_z = ?", (x, y, z)
+            )
+
+    def rotate_tile(self, x, y, z, col, row):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE tiles SET col = ?, row = ? WHERE grid_x = ? AND grid_y = ? AND grid_z = ?",
+                (col, row, x, y, z)
+            )
+
+    # Inventory
+    def load_inventory(self):
+        inventory = {category: [] for category in default_inventory}
+
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT category, count, data FROM inventory ORDER BY rowid"
+            ).fetchall()
+
+        for category, count, data in rows:
+            entry = json.loads(data)
+            if count is not None:
+                entry['count'] = count
+            inventory.setdefault(category, []).append(entry)
+
+        return inventory
+
+    def save_inventory(self, inventory):
+        rows = []
+        for category, entries in inventory.items():
+            for entry in entries:
+                rows.append(self._inventory_row(category, entry))
+
+        with self.lock, self.connection:
+            # Keep rows that did not change so their order stays the same
+            current = {
+                (category, obj_id): (count, data)
+                for category, obj_id, count, data in self.connection.execute(
+                    "SELECT category, id, count, data FROM inventory"
+                )
+            }
+            keys = set()
+
+            for category, obj_id, count, data in rows:
+                keys.add((category, obj_id))
+
+                if current.get((category, obj_id)) != (count, data):
+                    self.connection.execute(
+                        "INSERT INTO inventory (category, id, count, data) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (category, id) DO UPDATE SET count = excluded.count, data = excluded.data",
+                        (category, obj_id, count, data)
+                    )
+
+            for key in current.keys() - keys:
+                self.connection.execute("DELETE FROM inventory WHERE category = ? AND id = ?", key)
+
+    def change_item_count(self, asset, delta):
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT count FROM inventory WHERE category = 'item' AND id = ?", (asset['id'],)
+            ).fetchone()
+
+            if row is None:
+                if delta > 0:
+                    _, obj_id, _, data = self._inventory_row('item', asset)
+                    self.connection.execute(
+                        "INSERT INTO inventory (category, id, count, data) VALUES ('item', ?, ?, ?)",
+                        (obj_id, delta, data)
+                    )
+            elif (row[0] or 1) + delta > 0:
+                self.connection.execute(
+                    "UPDATE inventory SET count = ? WHERE category = 'item' AND id = ?",
+                    ((row[0] or 1) + delta, asset['id'])
+                )
+            else:
+                self.connection.execute(
+                    "DELETE FROM inventory WHERE category = 'item' AND id = ?", (asset['id'],)
+                )
+
+    def add_asset(self, category, asset):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO inventory (category, id, count, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (category, id) DO UPDATE SET count = excluded.count, data = excluded.data",
+                self._inventory_row(category, asset)
+            )
+
+    def remove_asset(self, category, asset_id):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM inventory WHERE category = ? AND id = ?", (category, asset_id))
+
+    # Stats
+    def load_stats(self):
+        stats = dict(default_stats)
+
+        with self.lock:
+            stats.update(self.connection.execute("SELECT key, value FROM stats").fetchall())
+        return stats
+
+    def save_stats(self, stats):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO stats (key, value) VALUES (?, ?)", list(stats.items())
+            )
+
+    # Selection
+    def load_selection(self):
+        selection = dict(default_selection)
+
+        with self.lock:
+            for slot, data in self.connection.execute("SELECT slot, data FROM selection"):
+                selection[slot] = json.loads(data)
+        return selection
+
+    def save_selection(self, selection):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO selection (slot, data) VALUES (?, ?)",
+                [(slot, json.dumps(data)) for slot, data in selection.items()]
+            )
+
+    def flush(self):
+        # Every save is committed already
+        pass
+
+    def compact(self):
+        """Moves the write-ahead log into the database file"""
+        with self.lock:
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @staticmethod
+    def _tile_row(tile):
+        return (tile['grid_x'], tile['grid_y'], tile['grid_z'], tile['id'], tile['col'], tile['row'])
+
+    @staticmethod
+    def _inventory_row(category, entry):
+        entry = dict(entry)
+        count = entry.pop('count', None)
+        return category, entry['id'], count, json.dumps(entry)
+
+class BinaryBackend(JsonBackend):
+    """
+    JSON documents with the room kept in the binary room files.
+    The game map is mapped from disk and tile edits write one record in place.
+    """
+    name = "binary"
+
+    def __init__(self):
+        super().__init__()
+        self.room_file = RoomFile(ROOM_MAP_FILE, ROOM_OBJECTS_FILE, ROOM_ASSETS_FILE)
+
+    def get_game_map(self, shape, create_map):
+        """Returns the game map mapped from the room file"""
+        return self.room_file.open_game_map(shape, create_map)
+
+    # Tiles
+    def load_tiles(self):
+        return self.room_file.load_tiles()
+
+    def save_tiles(self, tiles):
+        self.room_file.save_tiles(tiles)
+
+    def place_tile(self, tile):
+        self.room_file.place(tile)
+
+    def remove_tile(self, x, y, z):
+        self.room_file.pickup(x, y, z)
+
+    def rotate_tile(self, x, y, z, col, row):
+        self.room_file.rotate(x, y, z, col, row)
+
+    def compact(self):
+        """Writes the mapped room and dirty documents"""
+        self.room_file.flush()
+        persistence.flush()
+
+def change_count(items, asset, delta):
+    """Adds delta to the count of an inventory item, adding or removing the entry as needed"""
+    for existing in items:
+        if existing.get('id') == asset['id']:
+            count = existing.get('count', 1) + delta
+
+            if count > 0:
+                existing['count'] = count
+            else:
+                items.remove(existing)
+            return
+
+    if delta > 0:
+        asset_copy = dict(asset)
+        asset_copy['count'] = delta
+        items.append(asset_copy)
+
+def export_data(backend):
+    """Returns all local data of a backend in the cloud save format"""
+    try:
+        tiles = backend.load_tiles()
+    except (FileNotFoundError, json.JSONDecodeError):
+        tiles = []
+
+    return {
+        "inventory": backend.load_inventory(),
+        "selection": backend.load_selection(),
+        "stats": backend.load_stats(),
+        "tiles": tiles
+    }
+
+def import_data(backend, game_data):
+    """Replaces the local data of a backend"""
+    backend.save_inventory(game_data["inventory"])
+    backend.save_selection(game_data["selection"])
+    backend.save_stats(game_data["stats"])
+    backend.save_tiles(game_data["tiles"])
+    backend.flush()
+
+def create_backend(name):
+    """
+    Creates a storage backend by name, 'json', 'sqlite' or 'binary'.
+    A new SQLite database or room file starts with the data from the JSON files.
+    """
+    if name == "sqlite":
+        backend = SqliteBackend()
+
+        if backend.created:
+            json_backend = JsonBackend()
+
+            if json_backend.exists():
+                print(f"Importing JSON data into {backend.path}")
+                import_data(backend, export_data(json_backend))
+        return backend
+
+    if name == "binary":
+        backend = BinaryBackend()
+
+        if not backend.room_file.exists():
+            try:
+                tiles = backend.room_journal.load()
+            except (FileNotFoundError, json.JSONDecodeError):
+                tiles = []
+
+            print(f"Importing tiles into {backend.room_file.objects_path}")
+            backend.save_tiles(tiles)
+        return backend
+
+    if name != "json":
+        print(f"Unknown storage backend '{name}', using json")
+    return JsonBackend()
+
+# Global instance
+storage_backend = create_backend(os.environ.get('ROOM_DESIGNER_STORAGE', 'json'))
+
+if __name__ == "__main__":
+    # python -m storage.storage_backend <from> <to> copies the local data between backends
+    if len(sys.argv) != 3:
+        print("Usage: python -m storage.storage_backend json|sqlite|binary json|sqlite|binary")
+        sys.exit(1)
+
+    source = storage_backend if storage_backend.name == sys.argv[1] else create_backend(sys.argv[1])
+    target = storage_backend if storage_backend.name == sys.argv[2] else create_backend(sys.argv[2])
+    import_data(target, export_data(source))
+    target.compact()
+    print(f"Copied local data from {source.name} to {target.name}")
@@ -0,0 +1,114 @@
+import copy
+import hashlib
+import json
+
+# Delta encoding of the cloud save document.
+# Tiles are keyed by grid position, inventory entries by asset id. Changed entries are
+# sent whole in "put", gone entries by key in "remove". Stats and selection are small
+# and sent whole when they differ.
+
+def tile_key(tile):
+    return (tile['grid_x'], tile['grid_y'], tile['grid_z'])
+
+def entry_key(entry):
+    return entry['id']
+
+def strip_ids(entry):
+    """Drops the database _id, it differs between copies of the same entry"""
+    if isinstance(entry, dict):
+        return {key: value for key, value in entry.items() if key != '_id'}
+    return entry
+
+def normalize(game_data):
+    """Returns a copy of the document without database ids, as kept for the sync base"""
+    inventory = game_data.get('inventory') or {}
+
+    return {
+        "inventory": {category: [strip_ids(entry) for entry in entries] for category, entries in inventory.items()},
+        "selection": {slot: strip_ids(asset) for slot, asset in (game_data.get('selection') or {}).items()},
+        "stats": strip_ids(game_data.get('stats') or {}),
+        "tiles": [strip_ids(tile) for tile in game_data.get('tiles') or []]
+    }
+
+def content_hash(game_data):
+    """
+    Returns a hash of the document content, equal for equal data in any order.
+    Database ids and the order of tiles and inventory entries don't change it.
+    """
+    data = normalize(game_data)
+    data['tiles'] = sorted(data['tiles'], key=tile_key)
+    data['inventory'] = {category: sorted(entries, key=entry_key) for category, entries in data['inventory'].items()}
+
+    text = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def diff_entries(base, current, key):
+    """Returns (put, removed keys) turning the base entries into the current ones"""
+    base_by_key = {key(entry): strip_ids(entry) for entry in base}
+    current_by_key = {key(entry): strip_ids(entry) for entry in current}
+
+    put = [entry for entry_id, entry in current_by_key.items() if base_by_key.get(entry_id) != entry]
+    removed = [entry_id for entry_id in base_by_key if entry_id not in current_by_key]
+    return put, removed
+
+def diff_game_data(base, current):
+    """
+    Returns the changes from the base document to the current one, empty when equal
+
+    Parameters:
+    -----------
+    base : dict
+        document as last acknowledged by the server
+    current : dict
+        local document
+    """
+    changes = {}
+
+    put, removed = diff_entries(base.get('tiles', []), current.get('tiles', []), tile_key)
+    if put or removed:
+        changes['tiles'] = {
+            "put": put,
+            "remove": [{"grid_x": x, "grid_y": y, "grid_z": z} for x, y, z in removed]
+        }
+
+    base_inventory = base.get('inventory') or {}
+    current_inventory = current.get('inventory') or {}
+    inventory = {}
+
+    for category in list(current_inventory) + [c for c in base_inventory if c not in current_inventory]:
+        put, removed = diff_entries(base_inventory.get(category, []), current_inventory.get(category, []), entry_key)
+        if put or removed:
+            inventory[category] = {"put": put, "remove": removed}
+
+    if inventory:
+        changes['inventory'] = inventory
+
+    for part in ('stats', 'selection'):
+        if normalize({part: base.get(part)})[part] != normalize({part: current.get(part)})[part]:
+            changes[part] = current.get(part)
+
+    return changes
+
+def apply_delta(game_data, changes):
+    """Returns a copy of the document with the changes applied, the way the server does it"""
+    game_data = copy.deepcopy(game_data)
+
+    tiles = changes.get('tiles') or {}
+    if tiles:
+        gone = {tile_key(tile) for tile in tiles.get('remove', []) + tiles.get('put', [])}
+        game_data['tiles'] = [tile for tile in game_data.get('tiles', []) if tile_key(tile) not in gone]
+        game_data['tiles'].extend(copy.deepcopy(tiles.get('put', [])))
+
+    for category, category_changes in (changes.get('inventory') or {}).items():
+        gone = set(category_changes.get('remove', [])) | {entry['id'] for entry in category_changes.get('put', [])}
+        entries = game_data.setdefault('inventory', {}).get(category, [])
+
+        entries = [entry for entry in entries if entry['id'] not in gone]
+        entries.extend(copy.deepcopy(category_changes.get('put', [])))
+        game_data['inventory'][category] = entries
+
+    for part in ('stats', 'selection'):
+        if part in changes:
+            game_data[part] = copy.deepcopy(changes[part])
+
+    return game_data
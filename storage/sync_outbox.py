@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from storage.persistence import write_atomic
+
+class SyncOutbox:
+    """
+    Durable queue of cloud uploads that the server has not confirmed yet.
+
+    An upload is written to disk before it is sent and removed once the server took
+    it, so changes survive a dead server, a failed upload or quitting the game. Uploads
+    replace the whole cloud document, so a newer entry of a user supersedes the older
+    ones and the file holds at most one entry per user.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Optional[List[Dict]] = None
+
+    def add(self, user_id: str, game_data: Dict) -> int:
+        """Records an upload and returns its id, older entries of the user are dropped"""
+        with self.lock:
+            entries = self._load()
+            entry_id = max((entry["id"] for entry in entries), default=0) + 1
+
+            entries[:] = [entry for entry in entries if entry["user_id"] != user_id]
+            entries.append({
+                "id": entry_id,
+                "user_id": user_id,
+                "created": datetime.now().isoformat(),
+                "game_data": game_data
+            })
+            self._save()
+            return entry_id
+
+    def get_pending(self, user_id: str) -> List[Dict]:
+        """Returns the entries of a user, oldest first"""
+        with self.lock:
+            return [entry for entry in self._load() if entry["user_id"] == user_id]
+
+    def has_pending(self, user_id: str) -> bool:
+        return bool(user_id) and bool(self.get_pending(user_id))
+
+    def remove(self, entry_id: int):
+        """Drops a confirmed entry, entries added meanwhile stay"""
+        with self.lock:
+            entries = self._load()
+            remaining = [entry for entry in entries if entry["id"] != entry_id]
+
+            if len(remaining) != len(entries):
+                entries[:] = remaining
+                self._save()
+
+    def _load(self):
+        if self.entries is None:
+            self.entries = []
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, "r") as f:
+                        self.entries = json.load(f).get("entries", [])
+            except (OSError, ValueError) as e:
+                print(f"Error reading sync outbox: {e}")
+        return self.entries
+
+    def _save(self):
+        try:
+            write_atomic(self.path, json.dumps({"entries": self.entries}))
+        except OSError as e:
+            print(f"Error writing sync outbox: {e}")
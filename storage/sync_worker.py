@@ -0,0 +1,217 @@
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from storage.cloud_sync import cloud_sync
+
+class SyncJob:
+    def __init__(self, label: str, func: Callable, args: tuple, key: Optional[str] = None):
+        self.label = label
+        self.func = func
+        self.args = args
+        self.key = key
+        self.future = Future()
+        self.callbacks = []
+
+class SyncWorker:
+    """
+    Runs cloud sync calls on a background thread so the pygame loop never waits on the network.
+
+    Jobs run one at a time in the order they were queued and every submit returns a
+    Future. Callbacks are not called on the worker thread, they are collected and run
+    by dispatch(), which the screens call once per frame. A queued upload that has not
+    started yet is replaced by a newer one, only the newest snapshot is sent.
+
+    Uploads go through the manager's outbox. While the worker is idle it sends what
+    the outbox still holds every retry_interval seconds, unless the server is known
+    to be down.
+
+    Jobs that replace local data (login, download, sync) must not run while the game
+    is subscribed to the state store. The game queues uploads and reconciles, which
+    hand newer cloud data to the callback instead.
+    """
+
+    def __init__(self, manager=cloud_sync, retry_interval: float = 30):
+        self.manager = manager
+        self.retry_interval = retry_interval
+
+        self.condition = threading.Condition()
+        self.queue: List[SyncJob] = []
+        self.active: Optional[SyncJob] = None
+        self.active_since = None
+        self.thread = None
+
+        # (callback, result) pairs waiting for dispatch() on the main thread
+        self.finished = []
+        self.finished_lock = threading.Lock()
+
+        self.last_label = None
+        self.last_result = None
+
+    def submit(self, label: str, func: Callable, *args, callback: Optional[Callable] = None,
+               key: Optional[str] = None) -> Future:
+        """
+        Queues a call and returns its future
+
+        Parameters:
+        -----------
+        label : str
+            shown as progress while the job runs
+        func : function
+            called on the worker thread with args, returns (success, message)
+        callback : function
+            called by dispatch() with (success, message) once the job is done
+        key : str
+            a queued job with the same key is replaced by this one and shares its future
+        """
+        with self.condition:
+            job = None
+            if key is not None:
+                job = next((queued for queued in self.queue if queued.key == key), None)
+
+            if job:
+                # Newest snapshot wins, everyone waiting gets its result
+                job.label = label
+                job.func = func
+                job.args = args
+            else:
+                job = SyncJob(label, func, args, key)
+                self.queue.append(job)
+
+            if callback:
+                job.callbacks.append(callback)
+
+            self.start()
+            self.condition.notify_all()
+            return job.future
+
+    # Cloud sync calls
+    def login(self, username: str, password: str, callback: Optional[Callable] = None) -> Future:
+        return self.submit("Logging in", self.manager.login_user, username, password, callback=callback)
+
+    def register(self, username: str, email: str, password: str, callback: Optional[Callable] = None) -> Future:
+        return self.submit("Registering", self.manager.register_user, username, email, password, callback=callback)
+
+    def request_password_reset(self, email: str, callback: Optional[Callable] = None) -> Future:
+        return self.submit("Sending code", self.manager.request_password_reset, email, callback=callback)
+
+    def reset_password(self, email: str, reset_code: str, new_password: str,
+                       callback: Optional[Callable] = None) -> Future:
+        return self.submit("Resetting password", self.manager.reset_password, email, reset_code, new_password,
+                           callback=callback)
+
+    def sync(self, callback: Optional[Callable] = None) -> Future:
+        return self.submit("Syncing", self.manager.sync_game_data, callback=callback, key="sync")
+
+    def reconcile(self, game_data: Dict, callback: Optional[Callable] = None) -> Future:
+        """Syncs a snapshot of a running game, the callback also gets newer cloud data or None"""
+        return self.submit("Syncing", self.manager.reconcile, game_data, callback=callback, key="sync")
+
+    def upload(self, game_data: Dict, callback: Optional[Callable] = None, durable: bool = False) -> Future:
+        """
+        Uploads a snapshot taken on the main thread, e.g. game_state_store.export()
+
+        Parameters:
+        -----------
+        game_data : dict
+            snapshot of the local data
+        callback : function
+            called by dispatch() with (success, message) once the job is done
+        durable : bool
+            write the snapshot to the outbox before returning instead of on the worker,
+            for the last upload before quitting
+        """
+        user_id = self.manager.user_id
+
+        if durable:
+            self.manager.outbox.add(user_id, game_data)
+            return self.submit("Saving to cloud", self.manager.send_outbox, callback=callback, key="upload")
+        return self.submit("Saving to cloud", self._store_and_send, user_id, game_data, callback=callback, key="upload")
+
+    def _store_and_send(self, user_id: str, game_data: Dict):
+        # Disk writes stay off the pygame thread, a newer queued snapshot replaces this one
+        self.manager.outbox.add(user_id, game_data)
+        return self.manager.send_outbox()
+
+    # Main thread
+    def dispatch(self):
+        """Runs the callbacks of finished jobs, call it from the thread that owns the UI"""
+        with self.finished_lock:
+            finished = self.finished
+            self.finished = []
+
+        for callback, result in finished:
+            try:
+                callback(*result)
+            except Exception as e:
+                print(f"Error in sync callback: {e}")
+                traceback.print_exc()
+
+    def is_busy(self) -> bool:
+        with self.condition:
+            return self.active is not None or bool(self.queue)
+
+    def get_progress(self) -> Dict:
+        """Returns what the worker is doing, for status text on screen"""
+        with self.condition:
+            return {
+                "label": self.active.label if self.active else None,
+                "elapsed": time.monotonic() - self.active_since if self.active else 0.0,
+                "queued": len(self.queue),
+                "last_label": self.last_label,
+                "last_result": self.last_result
+            }
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every queued job is done, returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.condition:
+            while self.active is not None or self.queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def start(self):
+        """Starts the worker thread, it sends changes left in the outbox once the server answers"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="sync-worker", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    if not self.condition.wait(self.retry_interval) and self._replay_due():
+                        self.queue.append(SyncJob("Sending saved changes", self.manager.send_outbox, (), "upload"))
+
+                job = self.queue.pop(0)
+                self.active = job
+                self.active_since = time.monotonic()
+
+            try:
+                result = job.func(*job.args)
+            except Exception as e:
+                print(f"{job.label} failed: {e}")
+                traceback.print_exc()
+                result = (False, str(e))
+
+            with self.finished_lock:
+                self.finished.extend((callback, result) for callback in job.callbacks)
+            job.future.set_result(result)
+
+            with self.condition:
+                self.active = None
+                self.last_label = job.label
+                self.last_result = result
+                self.condition.notify_all()
+
+    def _replay_due(self):
+        return self.manager.outbox.has_pending(self.manager.user_id) and self.manager.health.is_available()
+
+# Global instance
+sync_worker = SyncWorker()
@@ -1,13 +1,27 @@
-import json
+from storage.storage_backend import storage_backend
 
-TILES_FILE = "storage/tile_data.json"
+# Game map for the room, memory-mapped by the binary backend
+def load_game_map(shape, create_map):
+    return storage_backend.get_game_map(shape, create_map)
 
-# Load tiles from file
+# Load tiles from the selected backend
 def load_tiles():
-    with open(TILES_FILE, "r") as f:
-        return json.load(f)
+    return storage_backend.load_tiles()
 
-# Save changes to file
+# Save the whole room
 def save_tiles(tiles):
-    with open(TILES_FILE, "w") as f:
-        json.dump(tiles, f, indent=4)
\ No newline at end of file
+    storage_backend.save_tiles(tiles)
+
+# Single edits, each touches one tile only
+def place_tile(tile):
+    storage_backend.place_tile(tile)
+
+def remove_tile(x, y, z):
+    storage_backend.remove_tile(x, y, z)
+
+def rotate_tile(x, y, z, col, row):
+    storage_backend.rotate_tile(x, y, z, col, row)
+
+# Write everything out before exit
+def compact_tiles():
+    storage_backend.compact()
@@ -0,0 +1,361 @@
+import argparse
+import contextlib
+import copy
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from domain.state.inventory import Inventory
+from local_server import LocalServer
+from storage.asset_catalog import asset_catalog
+from storage.cloud_sync import CloudSyncManager
+from storage.http_transport import HttpTransport
+from storage.server_health import ServerHealthMonitor
+from storage.sync_outbox import SyncOutbox
+
+ITEM_TYPES = ('floor item', 'surface item', 'wall item', 'non top floor item')
+ROOM_SIZE = 12
+
+def percentile(samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of unsorted samples, 0 when there are none"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(len(ordered) * percent / 100))
+    return ordered[rank - 1]
+
+class BenchmarkRecorder:
+    """Latency, payload sizes and errors of every sample, grouped by name"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples: Dict[str, List[Dict]] = {}
+
+    def add(self, name: str, duration: float, sent: int = 0, received: int = 0, failed: bool = False):
+        with self.lock:
+            self.samples.setdefault(name, []).append({
+                "duration": duration, "sent": sent, "received": received, "failed": failed
+            })
+
+    def summary(self) -> Dict[str, Dict]:
+        """Returns count, error rate, latency percentiles in ms and average bytes per name"""
+        with self.lock:
+            samples = {name: list(entries) for name, entries in self.samples.items()}
+
+        summary = {}
+        for name, entries in sorted(samples.items()):
+            durations = [entry["duration"] * 1000 for entry in entries]
+            failures = sum(entry["failed"] for entry in entries)
+            summary[name] = {
+                "count": len(entries),
+                "errors": failures,
+                "error_rate": failures / len(entries),
+                "p50_ms": percentile(durations, 50),
+                "p95_ms": percentile(durations, 95),
+                "p99_ms": percentile(durations, 99),
+                "max_ms": max(durations),
+                "avg_sent_bytes": sum(entry["sent"] for entry in entries) / len(entries),
+                "avg_received_bytes": sum(entry["received"] for entry in entries) / len(entries)
+            }
+        return summary
+
+class BenchmarkTransport(HttpTransport):
+    """HttpTransport that reports every request with its payload sizes to a recorder"""
+
+    # 304 and 409 are answers the sync protocol expects, not errors
+    EXPECTED_STATUSES = (304, 409)
+
+    def __init__(self, base_url: str, recorder: BenchmarkRecorder, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.recorder = recorder
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        endpoint = self.get_endpoint(method, path)
+        start_time = time.perf_counter()
+
+        try:
+            response = super().request(method, path, **kwargs)
+        except requests.RequestException:
+            self.recorder.add(endpoint, time.perf_counter() - start_time, failed=True)
+            raise
+
+        body = response.request.body or b""
+        failed = response.status_code >= 400 and response.status_code not in self.EXPECTED_STATUSES
+        self.recorder.add(endpoint, time.perf_counter() - start_time, sent=len(body),
+                          received=len(response.content), failed=failed)
+        return response
+
+class BenchmarkClient(CloudSyncManager):
+    """
+    CloudSyncManager of one synthetic player.
+
+    Local data, session and sync state stay in memory and the outbox in a directory
+    of the client, so many clients can run side by side without touching the files
+    of the game.
+    """
+
+    def __init__(self, base_url: str, recorder: BenchmarkRecorder, work_dir: str):
+        # Not calling super().__init__, it would load the session of the game
+        self.api_base = base_url
+        self.health = ServerHealthMonitor(base_url)
+        self.transport = BenchmarkTransport(base_url, recorder, health_monitor=self.health, pool_size=1)
+        self.user_id = None
+        self.username = None
+        self.delta_sync = True
+        self.outbox = SyncOutbox(os.path.join(work_dir, "sync_outbox.json"))
+        self.reconcile_pending = False
+
+        self.game_data = {"inventory": {"item": [], "floor": [], "wall": []}, "selection": {}, "stats": {}, "tiles": []}
+        self.sync_state = {}
+
+    def save_user_session(self, user_id: str, username: str):
+        self.user_id = user_id
+        self.username = username
+
+    def clear_user_data(self):
+        # The generated room is the player's data, registering keeps it
+        pass
+
+    def get_local_game_data(self) -> Dict:
+        return copy.deepcopy(self.game_data)
+
+    def save_local_game_data(self, game_data: Dict):
+        self.game_data.update(copy.deepcopy({
+            key: value for key, value in game_data.items() if key in ("inventory", "selection", "stats", "tiles")
+        }))
+
+    def load_sync_state(self) -> Dict:
+        return self.sync_state
+
+    def save_sync_state(self, sync_data: Dict):
+        self.sync_state = sync_data
+
+    def close(self):
+        self.transport.close()
+
+def generate_game_data(rng: random.Random, items: int, tiles: int) -> Dict:
+    """
+    Builds a player's data in the cloud save format
+
+    Parameters:
+    -----------
+    rng : random.Random
+        source of the choices, seeded for repeatable runs
+    items : int
+        distinct item assets in the inventory, at most the number of items in the shop
+    tiles : int
+        placed items, stacked in layers of the room grid
+    """
+    item_assets = [asset for asset_type in ITEM_TYPES for asset in asset_catalog.of_type(asset_type)]
+    floor = rng.choice(asset_catalog.of_type('floor'))
+    wall = rng.choice(asset_catalog.of_type('wall'))
+
+    inventory = Inventory()
+    inventory.add('floor', floor['id'], 1, floor)
+    inventory.add('wall', wall['id'], 1, wall)
+    for asset in rng.sample(item_assets, min(items, len(item_assets))):
+        inventory.add('item', asset['id'], rng.randint(1, 5), asset)
+
+    placed = []
+    for index in range(tiles):
+        asset = rng.choice(item_assets)
+        placed.append({
+            "grid_x": index % ROOM_SIZE,
+            "grid_y": index // ROOM_SIZE % ROOM_SIZE,
+            "grid_z": index // (ROOM_SIZE * ROOM_SIZE),
+            "col": rng.randint(0, 3),
+            "row": 0,
+            "id": asset['id']
+        })
+
+    return {
+        "inventory": inventory.to_dict(),
+        "selection": {"floor": floor, "wall": wall},
+        "stats": {
+            "total_balance": rng.randint(0, 10000),
+            "snake_hi_score": rng.randint(0, 500),
+            "fruit_hi_score": rng.randint(0, 500),
+            "bullet_hi_score": rng.randint(0, 500)
+        },
+        "tiles": placed
+    }
+
+def play_round(rng: random.Random, game_data: Dict):
+    """Changes the data like a short play session: money earned and a few tiles moved"""
+    game_data["stats"]["total_balance"] += rng.randint(1, 200)
+
+    tiles = game_data["tiles"]
+    for _ in range(min(3, len(tiles))):
+        tile = rng.choice(tiles)
+        tile["col"] = (tile["col"] + 1) % 4
+
+class SyncBenchmark:
+    """
+    Runs synthetic players against a server through CloudSyncManager.
+
+    Every client registers, logs in, builds its room and then plays rounds of
+    upload, download and sync. Each manager call and each HTTP request is timed,
+    so the report shows both what the player waits for and what goes over the wire.
+    """
+
+    def __init__(self, base_url: str, clients: int = 10, rounds: int = 5, items: int = 20,
+                 tiles: int = 100, seed: int = 0):
+        """
+        Parameters:
+        -----------
+        base_url : str
+            server address without a trailing slash
+        clients : int
+            players running at the same time, one thread each
+        rounds : int
+            upload, download and sync rounds per player
+        items : int
+            distinct items in each generated inventory
+        tiles : int
+            placed items in each generated room
+        seed : int
+            makes the generated data repeatable
+        """
+        self.base_url = base_url
+        self.clients = clients
+        self.rounds = rounds
+        self.items = items
+        self.tiles = tiles
+        self.seed = seed
+
+        self.operations = BenchmarkRecorder()
+        self.endpoints = BenchmarkRecorder()
+        self.run_id = uuid.uuid4().hex[:8]
+
+    def run(self) -> Dict:
+        """Runs every client and returns the report"""
+        work_dir = tempfile.mkdtemp(prefix="sync_benchmark_")
+        start_time = time.perf_counter()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.clients) as executor:
+                list(executor.map(lambda index: self.run_client(index, work_dir), range(self.clients)))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        return {
+            "server": self.base_url,
+            "clients": self.clients,
+            "rounds": self.rounds,
+            "items": self.items,
+            "tiles": self.tiles,
+            "duration_s": time.perf_counter() - start_time,
+            "operations": self.operations.summary(),
+            "endpoints": self.endpoints.summary()
+        }
+
+    def run_client(self, index: int, work_dir: str):
+        rng = random.Random(f"{self.seed}-{index}")
+        client_dir = os.path.join(work_dir, str(index))
+        os.makedirs(client_dir)
+        client = BenchmarkClient(self.base_url, self.endpoints, client_dir)
+
+        username = f"bench_{self.run_id}_{index}"
+        password = f"pw_{self.run_id}_{index}"
+
+        try:
+            if not self.measure("register", client.register_user, username, f"{username}@example.com", password):
+                return
+            if not self.measure("login", client.login_user, username, password):
+                return
+
+            client.game_data = generate_game_data(rng, self.items, self.tiles)
+
+            for _ in range(self.rounds):
+                play_round(rng, client.game_data)
+                self.measure("upload", client.upload_game_data)
+                self.measure("download", client.download_game_data)
+
+                play_round(rng, client.game_data)
+                self.measure("sync", client.sync_game_data)
+        except Exception as e:
+            print(f"Client {index} failed: {e}")
+            traceback.print_exc()
+        finally:
+            client.close()
+
+    def measure(self, operation: str, func, *args) -> bool:
+        start_time = time.perf_counter()
+        success, message = func(*args)
+        self.operations.add(operation, time.perf_counter() - start_time, failed=not success)
+        return success
+
+def format_table(title: str, summary: Dict[str, Dict], payload: bool = True) -> str:
+    """Formats a summary as a text table, payload adds the average bytes sent and received"""
+    header = f"{'name':<26}{'count':>7}{'err %':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    if payload:
+        header += f"{'sent B':>10}{'recv B':>10}"
+
+    lines = [title, header]
+    for name, stats in summary.items():
+        line = (
+            f"{name:<26}{stats['count']:>7}{stats['error_rate']:>8.1%}{stats['p50_ms']:>9.1f}"
+            f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+        )
+        if payload:
+            line += f"{stats['avg_sent_bytes']:>10.0f}{stats['avg_received_bytes']:>10.0f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the cloud sync against a game server")
+    parser.add_argument("--url", help="server to test, by default a local server with an in-memory database is started")
+    parser.add_argument("--clients", type=int, default=10, help="players running at the same time")
+    parser.add_argument("--rounds", type=int, default=5, help="upload, download and sync rounds per player")
+    parser.add_argument("--items", type=int, default=20, help="distinct items in each inventory")
+    parser.add_argument("--tiles", type=int, default=100, help="placed items in each room")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file, for comparing runs")
+    parser.add_argument("--verbose", action="store_true", help="keep the output of the sync code")
+    args = parser.parse_args()
+
+    local_server = None
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        local_server = LocalServer(port=0)
+        local_server.start()
+        base_url = f"http://127.0.0.1:{local_server.port}"
+
+    benchmark = SyncBenchmark(base_url, args.clients, args.rounds, args.items, args.tiles, args.seed)
+    print(f"Running {args.clients} clients x {args.rounds} rounds against {base_url}...")
+
+    try:
+        if args.verbose:
+            report = benchmark.run()
+        else:
+            # The sync code prints every step, thousands of lines per run
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                report = benchmark.run()
+    finally:
+        if local_server:
+            local_server.stop()
+
+    print(f"Finished in {report['duration_s']:.2f}s")
+    print()
+    print(format_table("Operations (CloudSyncManager calls)", report["operations"], payload=False))
+    print()
+    print(format_table("Endpoints (HTTP requests)", report["endpoints"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nReport written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,8 @@
 import pygame
 
-from utils.sprite_sheet import SpriteSheet
-from utils.path_utils import get_spritesheet_path
+from utils.thumbnail_cache import thumbnail_cache
 from game_logic import create_graphics, create_sounds
-import storage.inventory_abl as inventory_abl
+from domain.state.game_state_store import game_state_store
 
 class Button:
     def __init__(self, x, y, width, height, text, font, color, text_color):
@@ -64,7 +63,7 @@ class InventoryUI:
         self.ITEM_TAB = 0
         self.FLOOR_TAB = 1
         self.WALL_TAB = 2
-    
+
     def draw(self, screen):
         start = 0
         end = start + self.cols * self.rows
@@ -107,136 +106,103 @@ class InventoryUI:
             label = font.render(tab, True, (255, 255, 255))
             screen.blit(label, (x + 12 + x_offset, y + 25))
 
-            # Draw item icons
-            if self.selected_tab == self.ITEM_TAB:   
-                for idx, item in enumerate(self.items[start:end]):
-                    grid_x = idx % self.cols
-                    grid_y = idx // self.cols
-                    x = self.x + grid_x * self.item_size
-                    y = self.y + grid_y * self.item_size
-
-                    # Load only the first tile of the spritesheet as an icon
-                    icon_path = get_spritesheet_path('items', item['spritesheet'])
-                    icon_sheet = SpriteSheet(str(icon_path))
-
-                    # Calculate tile size (10x10 grid)
-                    total_width = icon_sheet.sheet.get_width()
-                    total_height = icon_sheet.sheet.get_height()
-                    tile_w = total_width // 10
-                    tile_h = total_height // 10
-
-                    # Resize and center the icon
-                    icon_resize = 1.35
-                    icon_margin = self.item_size // 13
-
-                    # Extract the first tile
-                    icon = icon_sheet.get_sprite(0, 0, tile_w, tile_h,
-                                                scale=self.item_size / tile_w / icon_resize)
-
-                    #Draw square behind icon
-                    cell_rect = pygame.Rect(x, y, self.item_size, self.item_size)
-                    pygame.draw.rect(screen, (214, 162, 104), cell_rect)
-
-                    # White border
-                    pygame.draw.rect(screen, (255, 255, 255), cell_rect, 1)
-
-                    # Show icons
-                    if item.get('type') == 'wall item':
-                        screen.blit(icon, (x + 2 * icon_margin, y + 2 * icon_margin))
-                    else:
-                        screen.blit(icon, (x + 2 * icon_margin, y + icon_margin))
-
-                    # Yellow border
-                    if self.selected_item == item:
-                        pygame.draw.rect(screen, (255, 255, 0), cell_rect, 5)
-
-                    # Show count
-                    font = pygame.font.Font('ithaca.ttf', 36)
-                    count_str = str(item['count'])
-                    label = font.render(count_str, True, (255, 255, 255))
-                    label_rect = label.get_rect(bottomright=(x + self.item_size - 3, y + self.item_size))
-                    
-                    if item['count'] != 1:
-                        screen.blit(label, label_rect)
-                    
-            # Draw floor icons
-            elif self.selected_tab == self.FLOOR_TAB:
-                for idx, floor in enumerate(self.floors[start:end]):
-                    grid_x = idx % self.cols
-                    grid_y = idx // self.cols
-                    x = self.x + grid_x * self.item_size
-                    y = self.y + grid_y * self.item_size
-
-                    # Load only the first tile of the spritesheet as an icon
-                    icon_path = get_spritesheet_path('floors', floor['spritesheet'])
-                    icon_sheet = SpriteSheet(str(icon_path))
-
-                    # Calculate tile size (10x10 grid)
-                    total_width = icon_sheet.sheet.get_width()
-                    total_height = icon_sheet.sheet.get_height()
-                    tile_w = total_width // 10
-                    tile_h = total_height // 10
-
-                    # Resize and center the icon
-                    icon_resize = 1.35
-                    icon_margin = self.item_size // 13
-
-                    # Extract the first tile
-                    icon = icon_sheet.get_sprite(0, 0, tile_w, tile_h,
-                                                scale=self.item_size / tile_w / icon_resize)
-
-                    #Draw square behind icon
-                    cell_rect = pygame.Rect(x, y, self.item_size, self.item_size)
-                    pygame.draw.rect(screen, (214, 162, 104), cell_rect)
-
-                    # White border
-                    pygame.draw.rect(screen, (255, 255, 255), cell_rect, 1)
-
-                    # Show icons
-                    screen.blit(icon, (x + 2 * icon_margin, y + 1.25 * icon_margin))
-
-                    # Yellow border
-                    if self.selected_floor.get('id') == floor.get('id'):
-                        pygame.draw.rect(screen, (255, 255, 0), cell_rect, 5)
-            # Draw wall icons
-            else:
-                for idx, wall in enumerate(self.walls[start:end]):
-                    grid_x = idx % self.cols
-                    grid_y = idx // self.cols
-                    x = self.x + grid_x * self.item_size
-                    y = self.y + grid_y * self.item_size
-
-                    # Load only the first tile of the spritesheet as an icon
-                    icon_path = get_spritesheet_path('walls', wall['spritesheet'])
-                    icon_sheet = SpriteSheet(str(icon_path))
-
-                    # Calculate tile size (10x10 grid)
-                    total_width = icon_sheet.sheet.get_width()
-                    total_height = icon_sheet.sheet.get_height()
-                    tile_w = total_width // 10
-                    tile_h = total_height // 10
-
-                    # Resize and center the icon
-                    icon_resize = 1.35
-                    icon_margin = self.item_size // 13
-
-                    # Extract the first tile
-                    icon = icon_sheet.get_sprite(0, 0, tile_w, tile_h,
-                                                scale=self.item_size / tile_w / icon_resize)
-
-                    #Draw square behind icon
-                    cell_rect = pygame.Rect(x, y, self.item_size, self.item_size)
-                    pygame.draw.rect(screen, (214, 162, 104), cell_rect)
-
-                    # White border
-                    pygame.draw.rect(screen, (255, 255, 255), cell_rect, 1)
-
-                    # Show icons
+        # Draw item icons
+        if self.selected_tab == self.ITEM_TAB:   
+            for idx, item in enumerate(self.items[start:end]):
+                grid_x = idx % self.cols
+                grid_y = idx // self.cols
+                x = self.x + grid_x * self.item_size
+                y = self.y + grid_y * self.item_size
+
+                # Resize and center the icon
+                icon_resize = 1.35
+                icon_margin = self.item_size // 13
+
+                # First tile of the spritesheet as an icon
+                icon = thumbnail_cache.get_thumbnail('items', item['spritesheet'], self.item_size / icon_resize)
+
+                #Draw square behind icon
+                cell_rect = pygame.Rect(x, y, self.item_size, self.item_size)
+                pygame.draw.rect(screen, (214, 162, 104), cell_rect)
+
+                # White border
+                pygame.draw.rect(screen, (255, 255, 255), cell_rect, 1)
+
+                # Show icons
+                if item.get('type') == 'wall item':
+                    screen.blit(icon, (x + 2 * icon_margin, y + 2 * icon_margin))
+                else:
                     screen.blit(icon, (x + 2 * icon_margin, y + icon_margin))
 
-                    # Yellow border
-                    if self.selected_wall.get('id') == wall.get('id'):
-                        pygame.draw.rect(screen, (255, 255, 0), cell_rect, 5)
+                # Yellow border
+                if self.selected_item == item:
+                    pygame.draw.rect(screen, (255, 255, 0), cell_rect, 5)
+
+                # Show count
+                font = pygame.font.Font('ithaca.ttf', 36)
+                count_str = str(item['count'])
+                label = font.render(count_str, True, (255, 255, 255))
+                label_rect = label.get_rect(bottomright=(x + self.item_size - 3, y + self.item_size))
+                
+                if item['count'] != 1:
+                    screen.blit(label, label_rect)
+                
+        # Draw floor icons
+        elif self.selected_tab == self.FLOOR_TAB:
+            for idx, floor in enumerate(self.floors[start:end]):
+                grid_x = idx % self.cols
+                grid_y = idx // self.cols
+                x = self.x + grid_x * self.item_size
+                y = self.y + grid_y * self.item_size
+
+                # Resize and center the icon
+                icon_resize = 1.35
+                icon_margin = self.item_size // 13
+
+                # First tile of the spritesheet as an icon
+                icon = thumbnail_cache.get_thumbnail('floors', floor['spritesheet'], self.item_size / icon_resize)
+
+                #Draw square behind icon
+                cell_rect = pygame.Rect(x, y, self.item_size, self.item_size)
+                pygame.draw.rect(screen, (214, 162, 104), cell_rect)
+
+                # White border
+                pygame.draw.rect(screen, (255, 255, 255), cell_rect, 1)
+
+                # Show icons
+                screen.blit(icon, (x + 2 * icon_margin, y + 1.25 * icon_margin))
+
+                # Yellow border
+                if self.selected_floor.get('id') == floor.get('id'):
+                    pygame.draw.rect(screen, (255, 255, 0), cell_rect, 5)
+        # Draw wall icons
+        else:
+            for idx, wall in enumerate(self.walls[start:end]):
+                grid_x = idx % self.cols
+                grid_y = idx // self.cols
+                x = self.x + grid_x * self.item_size
+                y = self.y + grid_y * self.item_size
+
+                # Resize and center the icon
+                icon_resize = 1.35
+                icon_margin = self.item_size // 13
+
+                # First tile of the spritesheet as an icon
+                icon = thumbnail_cache.get_thumbnail('walls', wall['spritesheet'], self.item_size / icon_resize)
+
+                #Draw square behind icon
+                cell_rect = pygame.Rect(x, y, self.item_size, self.item_size)
+                pygame.draw.rect(screen, (214, 162, 104), cell_rect)
+
+                # White border
+                pygame.draw.rect(screen, (255, 255, 255), cell_rect, 1)
+
+                # Show icons
+                screen.blit(icon, (x + 2 * icon_margin, y + icon_margin))
+
+                # Yellow border
+                if self.selected_wall.get('id') == wall.get('id'):
+                    pygame.draw.rect(screen, (255, 255, 0), cell_rect, 5)
     
     def handle_click(self, mouse_pos):
         mx, my = mouse_pos
@@ -287,62 +253,35 @@ class InventoryUI:
     def attempt_item_sale(self):
         item = self.selected_item
 
-        if item:
-            price = item.get('price', 0)
+        if item and game_state_store.get_item_count(item.get('id')):
+            remaining = game_state_store.change_item_count(item, -1)
+            self.total_balance += item.get('price', 0)
+
+            if remaining:
+                # Keep selection when more items remain
+                item['count'] = remaining
+            else:
+                # Only clear selection when no items remain
+                self.selected_item = None
 
-        inventory = inventory_abl.load_inventory()
-            
-        for existing in inventory['item']:
-            if existing.get('id') == item.get('id'):
-                if existing['count'] > 1:
-                    existing['count'] = existing.get('count', 1) - 1
-                    self.total_balance += price
-                    # Keep selection when more items remain
-                    item['count'] = existing['count']
-                    break
-                elif existing['count'] == 1:
-                    inventory['item'].remove(existing)
-                    self.total_balance += price
-                    # Only clear selection when no items remain
-                    self.selected_item = None
-
-        inventory_abl.save_inventory(inventory)
         return True
     
     def attempt_floor_sale(self):
         floor = self.selected_floor
 
-        if floor:
-            price = floor.get('price', 0)
+        if floor and game_state_store.remove_asset('floor', floor.get('id')):
+            self.total_balance += floor.get('price', 0)
+            self.selected_floor = None
 
-        inventory = inventory_abl.load_inventory()
-            
-        for existing in inventory['floor']:
-            if floor:
-                if existing.get('id') == floor.get('id'):
-                    inventory['floor'].remove(existing)
-                    self.total_balance += price
-                    self.selected_floor = None
-
-        inventory_abl.save_inventory(inventory)
         return True
     
     def attempt_wall_sale(self):
         wall = self.selected_wall
 
-        if wall:
-            price = wall.get('price', 0)
+        if wall and game_state_store.remove_asset('wall', wall.get('id')):
+            self.total_balance += wall.get('price', 0)
+            self.selected_wall = None
 
-        inventory = inventory_abl.load_inventory()
-            
-        for existing in inventory['wall']:
-            if wall:
-                if existing.get('id') == wall.get('id'):
-                    inventory['wall'].remove(existing)
-                    self.total_balance += price
-                    self.selected_wall = None
-
-        inventory_abl.save_inventory(inventory)
         return True
 
 class MinigameUI:
@@ -425,8 +364,9 @@ class MinigameUI:
                 return 'minigame'
 
 class ShopUI:
-    def __init__(self, assets, thumbnail_size, x, y, cols, rows, total_balance):
-        self.assets = assets
+    def __init__(self, catalog, thumbnail_size, x, y, cols, rows, total_balance):
+        self.catalog = catalog
+        self.assets = catalog.assets
         self.thumbnail_size = thumbnail_size
         self.x = x
         self.y = y
@@ -478,23 +418,12 @@ class ShopUI:
                 x = self.x + grid_x * self.thumbnail_size
                 y = self.y + grid_y * self.thumbnail_size
 
-                # Load only the first tile of the spritesheet as an icon
-                icon_path = get_spritesheet_path('assets', asset['spritesheet'])
-                icon_sheet = SpriteSheet(str(icon_path))
-
-                # Calculate tile size (10x10 grid)
-                total_width = icon_sheet.sheet.get_width()
-                total_height = icon_sheet.sheet.get_height()
-                tile_w = total_width // 10
-                tile_h = total_height // 10
-
                 # Resize and center the icon
                 icon_resize = 1.5
                 icon_margin = self.thumbnail_size // 6
 
-                # Extract the first tile
-                icon = icon_sheet.get_sprite(0, 0, tile_w, tile_h,
-                                             scale=self.thumbnail_size / tile_w / icon_resize)
+                # First tile of the spritesheet as an icon
+                icon = thumbnail_cache.get_thumbnail('assets', asset['spritesheet'], self.thumbnail_size / icon_resize)
 
                 #Draw square behind icon
                 cell_rect = pygame.Rect(x, y, self.thumbnail_size, self.thumbnail_size)
@@ -542,20 +471,11 @@ class ShopUI:
 
         # Asset selection
         def handle_grid_selection(grid_list, set_selected_callback):
-            for idx in range(self.cols * self.rows):
-                grid_x = idx % self.cols
-                grid_y = idx // self.cols
-                x = self.x + grid_x * self.thumbnail_size
-                y = self.y + grid_y * self.thumbnail_size
-
-                rect = pygame.Rect(x, y, self.thumbnail_size, self.thumbnail_size)
-                
-                if rect.collidepoint(mx, my):
-                    index = idx + self.page * self.cols * self.rows
+            index = self.get_asset_index(mx, my)
 
-                    if index < len(grid_list):
-                        set_selected_callback(index)
-                        return grid_list[index]
+            if index is not None and index < len(grid_list):
+                set_selected_callback(index)
+                return grid_list[index]
             return None
         
         return handle_grid_selection(
@@ -565,23 +485,25 @@ class ShopUI:
                 )
             )
     
+    def get_asset_index(self, mx, my):
+        """Returns the catalog index of the asset under the mouse on the current page"""
+        if not self.rect.collidepoint(mx, my):
+            return None
+
+        grid_x = int((mx - self.x) // self.thumbnail_size)
+        grid_y = int((my - self.y) // self.thumbnail_size)
+
+        return grid_x + grid_y * self.cols + self.page * self.cols * self.rows
+
     def handle_hover(self, mouse_pos):
         mx, my = mouse_pos
         self.hovered_asset = None
 
-        for idx, asset in enumerate(self.assets):
-            grid_x = idx % self.cols
-            grid_y = idx // self.cols
-            x = self.x + grid_x * self.thumbnail_size
-            y = self.y + grid_y * self.thumbnail_size
-            rect = pygame.Rect(x, y, self.thumbnail_size, self.thumbnail_size)
+        index = self.get_asset_index(mx, my)
 
-            if rect.collidepoint(mx, my):
-                index = idx + self.page * self.cols * self.rows
-
-                if index < len(self.assets):
-                    self.hovered_asset = asset
-                    return self.assets[index]
+        if index is not None and index < len(self.assets):
+            self.hovered_asset = self.assets[index]
+            return self.hovered_asset
     
     def attempt_purchase(self):
         asset = self.selected_asset
@@ -592,32 +514,18 @@ class ShopUI:
 
         self.total_balance -= price
 
-        inventory = inventory_abl.load_inventory()
         asset_type = asset.get('type')
 
         # Disallow re-buying floors/walls
         if asset_type in ['floor', 'wall']:
-            for existing in inventory[asset_type]:
-                if existing.get("id") == asset.get('id'):
-                    self.total_balance += price
-                    return False
-            inventory[asset_type].append(asset)
+            if not game_state_store.add_asset(asset_type, asset):
+                self.total_balance += price
+                return False
 
         else:
-            found = False
-            for existing in inventory['item']:
-                if existing.get('id') == asset.get('id'):
-                    existing['count'] = existing.get('count', 1) + 1
-                    found = True
-                    break
-
-            if not found:
-                # Copy asset and add count field
-                asset_copy = asset.copy()
-                asset_copy['count'] = 1
-                inventory['item'].append(asset_copy)
-
-        inventory_abl.save_inventory(inventory)
+            # Adds a copy of the asset with a count field
+            game_state_store.change_item_count(asset, 1)
+
         return True
 
 
@@ -0,0 +1,79 @@
+import pygame
+
+class DirtyRectTracker:
+    """
+    Collects changed screen regions so only those are pushed to the display.
+    Falls back to a full flip whenever the scene changes.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.rects = []
+        self.tracked = {}
+        self.scene = None
+
+        # First frame always needs a full flip
+        self.full_update = True
+        self.redraw_requested = True
+
+    def request_redraw(self):
+        """Something might have changed, the next frame has to be drawn"""
+        self.redraw_requested = True
+
+    def mark(self, rect):
+        """Marks a region as changed"""
+        if self.enabled and rect:
+            self.rects.append(pygame.Rect(rect))
+            self.redraw_requested = True
+
+    def mark_full(self):
+        """Forces a full flip on the next frame"""
+        self.full_update = True
+        self.redraw_requested = True
+
+    def track(self, key, rect, state=None):
+        """
+        Remembers the region and state of a screen element.
+        Both the old and the new region are marked when either of them changes.
+
+        Parameters:
+        -----------
+        key : hashable
+            identifies the tracked element
+        rect : pygame.Rect or None
+            current region of the element, None when it is hidden
+        state : any
+            anything that changes the look of the element without moving it
+        """
+        if not self.enabled:
+            return
+
+        rect = pygame.Rect(rect) if rect else None
+        previous = self.tracked.get(key)
+
+        if previous == (rect, state):
+            return
+
+        if previous and previous[0]:
+            self.rects.append(previous[0])
+        if rect:
+            self.rects.append(rect)
+
+        self.tracked[key] = (rect, state)
+
+    def check_scene(self, scene):
+        """Requests a full flip when the scene signature differs from the last one"""
+        if scene != self.scene:
+            self.scene = scene
+            self.mark_full()
+
+    def update_display(self):
+        """Pushes the changed regions (or the whole screen) to the display"""
+        if self.full_update:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+
+        self.rects = []
+        self.full_update = False
+        self.redraw_requested = False
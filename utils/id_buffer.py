@@ -0,0 +1,101 @@
+import pygame
+
+class IdBuffer:
+    """
+    Off-screen picking surface.
+    Every floor tile, wall face and placed object is drawn in a unique colour
+    through its alpha mask, so a mouse position resolves by reading one pixel.
+    """
+    FLOOR = 1
+    WALL = 2
+    OBJECT = 3
+
+    EAST = 0
+    NORTH = 1
+
+    def __init__(self, width, height, scale=0.5):
+        """
+        Parameters:
+        -----------
+        width, height : int
+            size of the screen
+        scale : float
+            resolution of the buffer relative to the screen
+        """
+        self.scale = scale
+        self.surface = pygame.Surface((max(1, int(width * scale)), max(1, int(height * scale))))
+        self.masks = {}
+
+    @staticmethod
+    def encode(kind, x, y, z, face=0):
+        """Packs an element into a 24-bit colour: kind, face, x, y, z"""
+        value = (kind << 22) | (face << 21) | (x << 13) | (y << 5) | z
+        return ((value >> 16) & 255, (value >> 8) & 255, value & 255)
+
+    @staticmethod
+    def decode(color):
+        """Unpacks a colour into (kind, x, y, z, face), None for empty pixels"""
+        value = (color[0] << 16) | (color[1] << 8) | color[2]
+        kind = value >> 22
+
+        if not kind:
+            return None
+        return kind, (value >> 13) & 255, (value >> 5) & 255, value & 31, (value >> 21) & 1
+
+    def clear(self):
+        self.surface.fill((0, 0, 0))
+        self.masks.clear()
+
+    def draw(self, image, rect, color, area=None):
+        """
+        Draws the opaque pixels of an image in a single colour
+
+        Parameters:
+        -----------
+        image : pygame.Surface
+            sprite as drawn on screen
+        rect : pygame.Rect
+            screen position of the sprite
+        color : tuple
+            colour from encode
+        area : pygame.Rect or None
+            part of the image to draw, in image coordinates
+        """
+        mask_surface = self._get_mask_surface(image)
+
+        if area is None:
+            area = image.get_rect()
+
+        scaled_area = pygame.Rect(
+            int(area.x * self.scale), int(area.y * self.scale),
+            int(area.right * self.scale) - int(area.x * self.scale),
+            int(area.bottom * self.scale) - int(area.y * self.scale)
+        )
+        position = (int((rect[0] + area.x) * self.scale), int((rect[1] + area.y) * self.scale))
+
+        # Colour a copy of the white mask, black stays transparent
+        tinted = mask_surface.subsurface(scaled_area.clip(mask_surface.get_rect())).copy()
+        tinted.fill(color, special_flags=pygame.BLEND_RGB_MIN)
+        tinted.set_colorkey((0, 0, 0))
+        self.surface.blit(tinted, position)
+
+    def pick(self, mx, my):
+        """Returns (kind, x, y, z, face) drawn at the screen position, None when nothing is there"""
+        px = int(mx * self.scale)
+        py = int(my * self.scale)
+
+        if not self.surface.get_rect().collidepoint(px, py):
+            return None
+        return self.decode(self.surface.get_at((px, py)))
+
+    def _get_mask_surface(self, image):
+        # Masks are shared by all tiles using the same sprite
+        mask_surface = self.masks.get(image)
+
+        if mask_surface is None:
+            size = (max(1, int(image.get_width() * self.scale)), max(1, int(image.get_height() * self.scale)))
+            mask = pygame.mask.from_surface(pygame.transform.scale(image, size))
+            mask_surface = mask.to_surface(pygame.Surface(size), setcolor=(255, 255, 255), unsetcolor=(0, 0, 0))
+            self.masks[image] = mask_surface
+
+        return mask_surface
@@ -1,6 +1,9 @@
 import pygame
+import math
 import os
 
+from collections import OrderedDict
+
 from .sprite_sheet import SpriteSheet
 from .path_utils import get_spritesheet_path
 
@@ -14,6 +17,11 @@ class IsometricUtils:
         self.half_tile_height = tile_height // 2
         self.sprites_loaded = False
 
+        # Vertical distance between z-levels in tile heights
+        self.render_z_spacing = 1.5 # Floors, walls and objects on screen
+        self.pick_z_spacing = 1.375 # Clickable areas of walls and objects
+        self.object_z_spacing = 1.3 # Object sprite rects
+
         self.ITEM_TAB = 0
         self.FLOOR_TAB = 1
         self.WALL_TAB = 2
@@ -24,6 +32,10 @@ class IsometricUtils:
         
         # Dictionary to store sprite sheets by object ID
         self.object_sheets = {}
+
+        # Finished object sprites keyed by (object_id, col, row, alpha, scale), least recently used first
+        self.sprite_cache = OrderedDict()
+        self.sprite_cache_size = 256
     
     def load_sprite_sheets(self, selected, type):
         if type == self.ITEM_TAB:
@@ -53,11 +65,166 @@ class IsometricUtils:
         
         return int(screen_x), int(screen_y)
     
-    def screen_to_grid(self, screen_x, screen_y):
-        """Convert screen coordinates to grid coordinates"""
+    def screen_to_grid(self, screen_x, screen_y, exact=False):
+        """Convert screen coordinates to grid coordinates, exact keeps the fractional part"""
         grid_x = (screen_x / self.half_tile_width + screen_y / self.half_tile_height) / 2
         grid_y = (screen_y / self.half_tile_height - screen_x / self.half_tile_width) / 2
+
+        if exact:
+            return grid_x, grid_y
         return int(grid_x), int(grid_y)
+
+    def get_z_offset(self, z, tile_spacing):
+        """Vertical screen offset of a z-level"""
+        return z * self.tile_height * tile_spacing
+
+    def get_cells_near(self, screen_x, screen_y, reach_x, reach_y):
+        """
+        Inverse projection for picking. Returns grid cells whose projected position
+        lies within reach of the screen point. Only a handful of cells are returned,
+        callers verify them with an exact hit test.
+
+        Parameters:
+        -----------
+        screen_x, screen_y : float
+            point relative to the projected grid origin
+        reach_x, reach_y : float
+            largest horizontal and vertical distance of a hit from the projected cell
+        """
+        cells = []
+
+        # Projected cell position is ((x - y) * half width, (x + y) * half height)
+        min_diff = math.floor((screen_x - reach_x) / self.half_tile_width)
+        max_diff = math.ceil((screen_x + reach_x) / self.half_tile_width)
+        min_sum = math.floor((screen_y - reach_y) / self.half_tile_height)
+        max_sum = math.ceil((screen_y + reach_y) / self.half_tile_height)
+
+        for diff in range(min_diff, max_diff + 1):
+            for total in range(min_sum, max_sum + 1):
+                if (total + diff) % 2 == 0:
+                    cells.append(((total + diff) // 2, (total - diff) // 2))
+
+        return cells
+
+    def is_point_in_diamond(self, px, py, cx, cy, w, h):
+        """Check if point is inside a diamond of the given size."""
+        dx = abs(px - cx)
+        dy = abs(py - cy)
+        return (dx / (w / 2) + dy / (h / 2)) <= 1
+
+    def point_in_polygon(self, px, py, polygon):
+        """Check if point is inside a polygon by using ray casting."""
+        inside = False
+        n = len(polygon)
+
+        for i in range(n):
+            x1, y1 = polygon[i]
+            x2, y2 = polygon[(i + 1) % n]
+
+            if ((y1 > py) != (y2 > py)) and \
+            (px < (x2 - x1) * (py - y1) / (y2 - y1 + 1e-9) + x1):
+                inside = not inside
+
+        return inside
+
+    def get_wall_quads(self, cx, cy, z):
+        """
+        Clickable east and north faces of a wall tile.
+        """
+        half_w = self.half_tile_width
+        half_h = self.half_tile_height
+        wall_height = self.tile_height * self.pick_z_spacing
+
+        wall_render_y = cy - (self.get_z_offset(z, self.pick_z_spacing) + half_h)
+
+        # Top seam of the wall
+        seam = (cx, wall_render_y)
+
+        # Bottom of the wall
+        bottom_center = (cx, wall_render_y + wall_height)
+
+        # Left sides of wall tiles
+        top_left = (seam[0] - half_w, seam[1] + half_h)
+        bottom_left = (bottom_center[0] - half_w, bottom_center[1] + half_h)
+        east_quad = [seam, top_left, bottom_left, bottom_center]
+
+        # Right sides of wall tiles
+        top_right = (seam[0] + half_w, seam[1] + half_h)
+        bottom_right = (bottom_center[0] + half_w, bottom_center[1] + half_h)
+        north_quad = [seam, top_right, bottom_right, bottom_center]
+
+        return east_quad, north_quad
+
+    def pick_tiles(self, mx, my, origin_x, origin_y, grid_width, grid_height, offset_y=0):
+        """
+        Returns (x, y) of all tiles whose diamond contains the mouse position, in grid order
+
+        Parameters:
+        -----------
+        mx, my : int
+            mouse position
+        origin_x, origin_y : float
+            screen position of the grid origin (camera offset)
+        offset_y : float
+            vertical offset of the diamond centers
+        """
+        hits = []
+        px = mx - origin_x
+        py = my - origin_y - offset_y
+
+        for x, y in self.get_cells_near(px, py, self.tile_width / 2, self.tile_height / 2):
+            if not (0 <= x < grid_width and 0 <= y < grid_height):
+                continue
+
+            screen_x, screen_y = self.grid_to_screen(x, y)
+            center_x = screen_x + origin_x
+            center_y = screen_y + origin_y + offset_y
+
+            if self.is_point_in_diamond(mx, my, center_x, center_y, self.tile_width, self.tile_height):
+                hits.append((x, y))
+
+        return sorted(hits)
+
+    def pick_wall_faces(self, mx, my, origin_x, origin_y, is_wall, grid_width, grid_height, grid_depth):
+        """
+        Returns (x, y, z, side) of all wall faces under the mouse, sorted front to back
+
+        Parameters:
+        -----------
+        is_wall : function
+            tells if there is a wall tile at (x, y, z)
+        """
+        hits = []
+        px = mx - origin_x
+        wall_height = self.tile_height * self.pick_z_spacing
+
+        for z in range(grid_depth):
+            # Faces span from the seam down to the bottom corners
+            seam_offset = self.get_z_offset(z, self.pick_z_spacing) + self.half_tile_height
+            py = my - origin_y + seam_offset - (wall_height + self.half_tile_height) / 2
+
+            for x, y in self.get_cells_near(px, py, self.half_tile_width, (wall_height + self.half_tile_height) / 2):
+                if not (0 <= x < grid_width and 0 <= y < grid_height) or not is_wall(x, y, z):
+                    continue
+
+                screen_x, screen_y = self.grid_to_screen(x, y)
+                screen_x += origin_x
+                screen_y += origin_y
+
+                east_quad, north_quad = self.get_wall_quads(screen_x, screen_y, z)
+
+                if self.point_in_polygon(mx, my, east_quad):
+                    side = "east"
+                elif self.point_in_polygon(mx, my, north_quad):
+                    side = "north"
+                else:
+                    continue
+
+                wall_screen_y = screen_y - self.half_tile_height - seam_offset
+                hits.append(((wall_screen_y, screen_x, z), (x, y, z, side)))
+
+        hits.sort(key=lambda hit: hit[0])
+        return [face for _, face in hits]
     
     def create_isometric_tile(self, color, height=1, with_sides=True):
         """Create an isometric tile sprite"""
@@ -154,10 +321,17 @@ class IsometricUtils:
             self.object_sheets[object_id] = SpriteSheet(spritesheets_path)
             self.sprites_loaded = True
     
-    def create_object_sprite(self, c=0, r=0, alpha=255, object_id=None):
-        """Create object sprite from sprite sheet"""
+    def create_object_sprite(self, c=0, r=0, alpha=255, object_id=None, scale=4):
+        """Create object sprite from sprite sheet or return it from the sprite cache"""
         col, row = c, r
 
+        cache_key = (object_id, col, row, alpha, scale)
+        cached_sprite = self.sprite_cache.get(cache_key)
+
+        if cached_sprite is not None:
+            self.sprite_cache.move_to_end(cache_key)
+            return cached_sprite
+
         # Load sprite sheet if not already loaded
         if object_id:
             self._load_object_spritesheet_by_id(object_id)
@@ -179,12 +353,17 @@ class IsometricUtils:
                 row * sprite_height,
                 sprite_width,
                 sprite_height,
-                scale=4
+                scale=scale
             )
 
         # Set opacity
         sprite.set_alpha(alpha)
 
+        # Remember the sprite and drop the least recently used one
+        self.sprite_cache[cache_key] = sprite
+        if len(self.sprite_cache) > self.sprite_cache_size:
+            self.sprite_cache.popitem(last=False)
+
         return sprite
     
     def get_render_order(self, entities):
@@ -0,0 +1,120 @@
+import os
+import pygame
+
+from .sprite_sheet import SpriteSheet
+from .path_utils import get_base_path, get_spritesheet_path
+
+class ThumbnailCache:
+    """
+    Shared icon service for the inventory and the shop.
+    Every spritesheet is decoded once and its first tile is scaled into an icon.
+    Icons are memoized and optionally baked to disk so later runs skip decoding the sheets.
+    Memoized icons remember the modification time of their sheet, an edited sheet is decoded again.
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        Parameters:
+        -----------
+        cache_dir : str or None
+            directory for baked icons, None keeps icons in memory only
+        """
+        self.cache_dir = cache_dir
+
+        # Sheet path -> (sheet mtime, decoded sheet)
+        self.sheets = {}
+        # (category, filename, width) -> (sheet mtime, icon)
+        self.thumbnails = {}
+
+    def get_thumbnail(self, category, filename, width):
+        """
+        Returns the first tile of a spritesheet scaled to the given width.
+
+        Parameters:
+        -----------
+        category : str
+            spritesheet category ('assets', 'floors', 'walls', 'items')
+        filename : str
+            spritesheet file name
+        width : float
+            width of the icon, height keeps the tile ratio
+        """
+        key = (category, filename, width)
+        sheet_path = get_spritesheet_path(category, filename)
+        mtime = self._get_mtime(sheet_path)
+
+        cached = self.thumbnails.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        baked_path = self._get_baked_path(category, filename, width)
+        thumbnail = self._load_baked(sheet_path, baked_path)
+
+        if thumbnail is None:
+            thumbnail = self._create_thumbnail(sheet_path, mtime, width)
+            self._save_baked(thumbnail, baked_path)
+
+        self.thumbnails[key] = (mtime, thumbnail)
+        return thumbnail
+
+    def clear(self):
+        """Forgets all decoded sheets and icons kept in memory"""
+        self.sheets.clear()
+        self.thumbnails.clear()
+
+    def _create_thumbnail(self, sheet_path, mtime, width):
+        cached = self.sheets.get(sheet_path)
+
+        if cached is not None and cached[0] == mtime:
+            sheet = cached[1]
+        else:
+            sheet = SpriteSheet(sheet_path)
+            self.sheets[sheet_path] = (mtime, sheet)
+
+        # Calculate tile size (10x10 grid)
+        tile_w = sheet.sheet.get_width() // 10
+        tile_h = sheet.sheet.get_height() // 10
+
+        # Extract the first tile
+        return sheet.get_sprite(0, 0, tile_w, tile_h, scale=width / tile_w)
+
+    @staticmethod
+    def _get_mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def _get_baked_path(self, category, filename, width):
+        if not self.cache_dir:
+            return None
+
+        name = os.path.splitext(filename)[0]
+        return os.path.join(self.cache_dir, f"{category}_{name}_{round(width, 3)}.png")
+
+    def _load_baked(self, sheet_path, baked_path):
+        if not baked_path or not os.path.exists(baked_path):
+            return None
+
+        # Spritesheet changed after the icon was baked
+        if os.path.getmtime(baked_path) < os.path.getmtime(sheet_path):
+            return None
+
+        try:
+            return pygame.image.load(baked_path)
+        except pygame.error as e:
+            print(f"Error loading baked thumbnail {baked_path}: {e}")
+            return None
+
+    def _save_baked(self, thumbnail, baked_path):
+        if not baked_path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(baked_path), exist_ok=True)
+            pygame.image.save(thumbnail, baked_path)
+        except (OSError, pygame.error) as e:
+            print(f"Error saving baked thumbnail {baked_path}: {e}")
+
+# Global instance
+thumbnail_cache = ThumbnailCache(cache_dir=os.path.join(get_base_path(), 'cache', 'thumbnails'))